@@ -1,14 +1,86 @@
+import asyncio
+import re
+import threading
+import time
+from collections.abc import Iterable
+from contextlib import aclosing, closing
 from dataclasses import dataclass
-from langchain_community.llms import Ollama
-from langchain_openai import ChatOpenAI
-from diskcache import Cache
-import platform
+from pathlib import Path
+from typing import Any
+from diskcache import Lock
+from diskcache.core import ENOVAL
 
-cache = Cache('.cache/llm')
-if platform.machine() == 'arm64':
-    llm = ChatOpenAI()
-else:
-    llm = Ollama(model="llama-2")
+from auto_sdlc import llm_backends, metrics
+from auto_sdlc.chunker import DEFAULT_CHUNK_TOKENS, chunk_python_source, estimate_tokens
+from auto_sdlc.file_ops import get_document
+from auto_sdlc.llm_cache import ResponseCache, make_key, model_tag
+from auto_sdlc.similarity_cache import ApproximateAnswer, SimilarityIndex, normalize_prompt
+from auto_sdlc.single_flight import SingleFlight
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 10
+SINGLE_FLIGHT_LOCK_EXPIRE_SECONDS = 600
+PROMPT_TEMPLATE_VERSION = 1
+YES_WORDS = frozenset({"y", "yes"})
+NO_WORDS = frozenset({"n", "no"})
+
+_LLM_REQUESTS = metrics.counter("auto_sdlc_llm_requests_total", "LLM requests, by mode (invoke or stream).")
+_LLM_SECONDS = metrics.histogram("auto_sdlc_llm_request_seconds", "Latency of LLM requests.")
+_LLM_CHARS = metrics.counter("auto_sdlc_llm_chars_total", "Characters sent to (prompt) and received from (response) the LLM.")
+_LLM_TOKENS = metrics.counter(
+    "auto_sdlc_llm_tokens_total",
+    "Tokens sent to (prompt) and received from (response) the LLM, as reported by the backend or estimated.",
+)
+_APPROXIMATE_LOOKUPS = metrics.counter(
+    "auto_sdlc_llm_cache_approximate_lookups_total", "Approximate response cache lookups, by result (hit or miss)."
+)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_UNSET: Any = object()
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+_similarity_index: SimilarityIndex | None = _UNSET
+_flights = SingleFlight()
+
+
+def get_cache() -> ResponseCache:
+    """Get the LLM response cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache.from_env()
+    return _cache
+
+
+def get_similarity_index() -> SimilarityIndex | None:
+    """Get the index of the approximate cache tier, or None if it is off (see `auto_sdlc.similarity_cache`)."""
+    global _similarity_index
+    if _similarity_index is _UNSET:
+        with _cache_lock:
+            if _similarity_index is _UNSET:
+                _similarity_index = SimilarityIndex.from_env()
+    return _similarity_index
+
+
+def use_similarity_index(index: SimilarityIndex | None) -> None:
+    """Answer from cached answers to similar questions with an index, or not at all with None."""
+    global _similarity_index
+    _similarity_index = index
+
+
+def get_llm() -> Any:
+    """Get the LLM client, creating it on first use."""
+    return llm_backends.get_llm()
+
+
+def __getattr__(name: str) -> Any:
+    """Create `cache` and `llm` lazily, on first access."""
+    if name == "cache":
+        return get_cache()
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -17,26 +89,551 @@ class LLMYesOrNoResponse():
     answer: bool
     full_response: str
     full_question: str
+    truncated: bool = False
 
     def __bool__(self) -> bool:
         """Return answer."""
         return self.answer
 
-@cache.memoize()
+def _format_prompt(input: str) -> str:
+    """Wrap a question in the prompt sent to the LLM."""
+    return f"Answer the following question: {input}. Answer:"
+
+
+def _response_text(response) -> str:
+    """Text of an LLM response (chat models return messages, LLMs return strings)."""
+    return str(getattr(response, "content", response))
+
+
+def _reported_token_counts(response) -> tuple[int, int] | None:
+    """Prompt and response token counts reported by the backend, if any."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return None
+
+
+def _record_llm_request(mode: str, prompt: str, response, text: str, seconds: float) -> None:
+    """Record latency, sizes and token counts of an LLM request."""
+    if not metrics.REGISTRY.enabled:
+        return
+    _LLM_REQUESTS.inc(mode=mode)
+    _LLM_SECONDS.observe(seconds, mode=mode)
+    _LLM_CHARS.inc(len(prompt), kind="prompt")
+    _LLM_CHARS.inc(len(text), kind="response")
+    token_counts = _reported_token_counts(response)
+    source = "backend"
+    if token_counts is None:
+        token_counts = len(_TOKEN.findall(prompt)), len(_TOKEN.findall(text))
+        source = "estimated"
+    _LLM_TOKENS.inc(token_counts[0], kind="prompt", source=source)
+    _LLM_TOKENS.inc(token_counts[1], kind="response", source=source)
+
+
+def _invoke_llm(input: str) -> str:
+    """Ask the LLM a question, recording the request in the metrics."""
+    prompt = _format_prompt(input)
+    started = time.perf_counter()
+    response = get_llm().invoke(prompt)
+    text = _response_text(response)
+    _record_llm_request("invoke", prompt, response, text, time.perf_counter() - started)
+    return text
+
+
+async def _ainvoke_prompt(prompt: str, *, mode: str = "invoke") -> str:
+    """Send a prompt to the LLM as is, recording the request in the metrics."""
+    started = time.perf_counter()
+    response = await get_llm().ainvoke(prompt)
+    text = _response_text(response)
+    _record_llm_request(mode, prompt, response, text, time.perf_counter() - started)
+    return text
+
+
+async def _ainvoke_llm(input: str) -> str:
+    """Ask the LLM a question, recording the request in the metrics."""
+    return await _ainvoke_prompt(_format_prompt(input))
+
+
+def _cache_key(input: str, **variant: str) -> str:
+    """Cache key of an answer from the selected backend and model.
+
+    Questions that differ only in whitespace share a key, and so share one
+    cached answer, one in-flight request and one process lock.
+    """
+    return make_key(
+        normalize_prompt(input),
+        template_version=PROMPT_TEMPLATE_VERSION,
+        **variant,
+        **llm_backends.backend_identity(),
+    )
+
+
+def _cached_answer(input: str):
+    """Get the cached answer to a question, or ENOVAL if there is none."""
+    return get_cache().get(_cache_key(input))
+
+
+def _approximate_answer(input: str) -> ApproximateAnswer | None:
+    """Cached answer to the most similar question above the threshold, if the approximate tier is on."""
+    index = get_similarity_index()
+    if index is None:
+        return None
+    for key, similarity in index.lookup(input, identity=_cache_key("")):
+        answer = get_cache().get(key)
+        if answer is not ENOVAL:
+            _APPROXIMATE_LOOKUPS.inc(result="hit")
+            return ApproximateAnswer(answer, similarity=similarity, cache_key=key)
+        # Evicted from the exact cache.
+        index.remove(key)
+    _APPROXIMATE_LOOKUPS.inc(result="miss")
+    return None
+
+
+def _remember_answer(input: str, key: str, answer: str) -> None:
+    """Cache an answer, and index its question for the approximate tier."""
+    get_cache().set(key, answer, tag=model_tag(llm_backends.backend_identity()))
+    index = get_similarity_index()
+    if index is not None:
+        index.add(input, key, identity=_cache_key(""))
+
+
+def _process_lock(key: str) -> Lock:
+    """Lock shared by every process using the cache, held while asking the LLM."""
+    return get_cache().lock(key, expire=SINGLE_FLIGHT_LOCK_EXPIRE_SECONDS)
+
+
+def _ask_llm(input: str) -> str:
+    """Ask the LLM and cache the answer, unless another process just did."""
+    key = _cache_key(input)
+    with _process_lock(key):
+        answer = get_cache().get(key)
+        if answer is ENOVAL:
+            answer = _invoke_llm(input)
+            _remember_answer(input, key, answer)
+    return answer
+
+
+async def _aacquire(lock: Lock) -> None:
+    """Acquire a process lock without blocking the event loop.
+
+    If the waiting task is cancelled, the lock is released as soon as the
+    worker thread gets it, instead of being held until it expires.
+    """
+    acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+    try:
+        await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        def release(acquired: asyncio.Future) -> None:
+            if not acquired.cancelled() and acquired.exception() is None:
+                lock.release()
+
+        acquiring.add_done_callback(release)
+        raise
+
+
+async def _aask_llm(input: str) -> str:
+    """Ask the LLM and cache the answer, unless another process just did."""
+    key = _cache_key(input)
+    lock = _process_lock(key)
+    await _aacquire(lock)
+    try:
+        answer = get_cache().get(key)
+        if answer is ENOVAL:
+            answer = await _ainvoke_llm(input)
+            _remember_answer(input, key, answer)
+    finally:
+        lock.release()
+    return answer
+
+
 def get_answer(input: str) -> str:
-    """Get answer from LLM."""
-    response = llm.invoke(f"Answer the following question: {input}. Answer:")
-    return str(response.content)
-
-def yes_or_no(question: str) -> LLMYesOrNoResponse:
-    """Get yes or no from LLM."""
-    str_answer = get_answer(question)
-    if str_answer.lower() in ["y", "yes"]:
-        bool_answer = True
-    else:
-        bool_answer = False
+    """Get answer from LLM.
+
+    Answers are cached, and concurrent callers asking the same question share
+    a single LLM request. With the approximate cache tier on, the cached answer
+    to a similar enough question is returned as an `ApproximateAnswer`.
+    """
+    answer = _cached_answer(input)
+    if answer is not ENOVAL:
+        return answer
+    approximate = _approximate_answer(input)
+    if approximate is not None:
+        return approximate
+
+    return _flights.do(_cache_key(input), lambda: _ask_llm(input))
+
+
+async def aget_answer(input: str) -> str:
+    """Get answer from LLM, without blocking the event loop.
+
+    Shares cached answers and in-flight requests with `get_answer`.
+    """
+    answer = _cached_answer(input)
+    if answer is not ENOVAL:
+        return answer
+    approximate = _approximate_answer(input)
+    if approximate is not None:
+        return approximate
+
+    return await _flights.ado(_cache_key(input), lambda: _aask_llm(input))
+
+
+async def aget_answers(
+    inputs: Iterable[str],
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[str]:
+    """Get answers from LLM concurrently, with at most `max_concurrency` requests in flight."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded_answer(input: str) -> str:
+        answer = _cached_answer(input)
+        if answer is not ENOVAL:
+            return answer
+        async with semaphore:
+            return await aget_answer(input)
+
+    return list(await asyncio.gather(*(bounded_answer(input) for input in inputs)))
+
+
+def get_answers(
+    inputs: Iterable[str],
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[str]:
+    """Get answers from LLM concurrently, in the same order as `inputs`.
+
+    Must not be called from a running event loop; use `aget_answers` there.
+    """
+    return asyncio.run(aget_answers(inputs, max_concurrency=max_concurrency))
+
+
+_FIRST_WORD = re.compile(r"[\W_]*([A-Za-z]+)")
+_WORD_CHARACTER = re.compile(r"[^\W_]")
+
+
+def parse_verdict(text: str, *, complete: bool = True) -> bool | None:
+    """Parse a yes or no verdict from the first word of an answer.
+
+    Returns None if the verdict cannot be decided yet: the answer is not
+    `complete` and has no first word, or its first word may still be growing.
+    An answer whose first word is not yes is a no, so a stream can stop as
+    soon as its first word is complete.
+    """
+    match = _FIRST_WORD.match(text)
+    if match is None:
+        # A first word that does not start with a letter is not yes either.
+        return False if complete or _WORD_CHARACTER.search(text) else None
+    if match.end() == len(text) and not complete:
+        return None
+    return match.group(1).lower() in YES_WORDS
+
+
+def _to_yes_or_no(question: str, str_answer: str, *, truncated: bool = False) -> LLMYesOrNoResponse:
+    """Interpret an LLM answer as yes or no."""
     return LLMYesOrNoResponse(
-        answer=bool_answer,
+        answer=bool(parse_verdict(str_answer)),
         full_response=str_answer,
         full_question=question,
+        truncated=truncated,
+    )
+
+
+def _stream_verdict(question: str) -> tuple[str, bool]:
+    """Stream an answer until a verdict can be parsed, then stop the generation."""
+    prompt = _format_prompt(question)
+    response = ""
+    started = time.perf_counter()
+    try:
+        with closing(iter(get_llm().stream(prompt))) as chunks:
+            for chunk in chunks:
+                response += _response_text(chunk)
+                if parse_verdict(response, complete=False) is not None:
+                    return response, True
+        return response, False
+    finally:
+        _record_llm_request("stream", prompt, None, response, time.perf_counter() - started)
+
+
+async def _astream_verdict(question: str) -> tuple[str, bool]:
+    """Stream an answer until a verdict can be parsed, then stop the generation."""
+    prompt = _format_prompt(question)
+    response = ""
+    started = time.perf_counter()
+    try:
+        async with aclosing(get_llm().astream(prompt)) as chunks:
+            async for chunk in chunks:
+                response += _response_text(chunk)
+                if parse_verdict(response, complete=False) is not None:
+                    return response, True
+        return response, False
+    finally:
+        _record_llm_request("stream", prompt, None, response, time.perf_counter() - started)
+
+
+def _cached_verdict(question: str) -> LLMYesOrNoResponse | None:
+    """Get the verdict of a cached full or early-exit answer, if there is one."""
+    answer = _cached_answer(question)
+    if answer is not ENOVAL:
+        return _to_yes_or_no(question, answer)
+    answer = get_cache().get(_cache_key(question, variant="verdict"))
+    if answer is not ENOVAL:
+        return _to_yes_or_no(question, answer, truncated=True)
+    return None
+
+
+def _store_verdict(question: str, response: str, truncated: bool) -> None:
+    """Cache a streamed answer; truncated answers are kept apart from full answers."""
+    if truncated:
+        get_cache().set(
+            _cache_key(question, variant="verdict"), response, tag=model_tag(llm_backends.backend_identity())
+        )
+    else:
+        _remember_answer(question, _cache_key(question), response)
+
+
+def _stream_yes_or_no(question: str) -> LLMYesOrNoResponse:
+    response, truncated = _stream_verdict(question)
+    _store_verdict(question, response, truncated)
+    return _to_yes_or_no(question, response, truncated=truncated)
+
+
+async def _astream_yes_or_no(question: str) -> LLMYesOrNoResponse:
+    response, truncated = await _astream_verdict(question)
+    _store_verdict(question, response, truncated)
+    return _to_yes_or_no(question, response, truncated=truncated)
+
+
+def yes_or_no(question: str, *, stream: bool = False) -> LLMYesOrNoResponse:
+    """Get yes or no from LLM.
+
+    With `stream`, the answer is streamed and the generation is stopped as
+    soon as a verdict can be parsed; `full_response` then holds the answer
+    up to that point.
+    """
+    if not stream:
+        return _to_yes_or_no(question, get_answer(question))
+
+    cached = _cached_verdict(question)
+    if cached is not None:
+        return cached
+    return _flights.do(_cache_key(question, variant="verdict"), lambda: _stream_yes_or_no(question))
+
+
+async def ayes_or_no(question: str, *, stream: bool = False) -> LLMYesOrNoResponse:
+    """Get yes or no from LLM, without blocking the event loop."""
+    if not stream:
+        return _to_yes_or_no(question, await aget_answer(question))
+
+    cached = _cached_verdict(question)
+    if cached is not None:
+        return cached
+    return await _flights.ado(_cache_key(question, variant="verdict"), lambda: _astream_yes_or_no(question))
+
+
+_BATCH_ANSWER = re.compile(r"^\W*(?:answer\s*)?(\d+)\s*[.):-]\s*(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+def _format_batch_prompt(questions: list[str]) -> str:
+    """Pack numbered questions into one prompt asking for one verdict per line."""
+    numbered = "\n\n".join(f"Question {number}:\n{question}" for number, question in enumerate(questions, 1))
+    return (
+        f"Answer each of the following {len(questions)} questions with yes or no.\n\n"
+        f"{numbered}\n\n"
+        "Reply with exactly one line per question, in the form `<question number>. <yes or no>`, "
+        "and nothing else. Answers:"
+    )
+
+
+def parse_batch_verdicts(text: str, count: int) -> list[str | None]:
+    """Parse the per-question answers of a batch prompt.
+
+    Returns the answer to each question, or None for questions whose answer
+    is missing, ambiguous, or not a yes or no.
+    """
+    answers: list[str | None] = [None] * count
+    seen: set[int] = set()
+    for match in _BATCH_ANSWER.finditer(text):
+        index = int(match.group(1)) - 1
+        if not 0 <= index < count:
+            continue
+        if index in seen:
+            answers[index] = None
+            continue
+        seen.add(index)
+        answer = match.group(2).strip()
+        first_word = _FIRST_WORD.match(answer)
+        if first_word is not None and first_word.group(1).lower() in YES_WORDS | NO_WORDS:
+            answers[index] = answer
+    return answers
+
+
+async def _aanswer_batch(questions: list[str]) -> list[str | None]:
+    """Ask a batch of questions in one request, caching every parsed answer per question."""
+    text = await _ainvoke_prompt(_format_batch_prompt(questions), mode="batch")
+    answers = parse_batch_verdicts(text, len(questions))
+    for question, answer in zip(questions, answers):
+        if answer is not None:
+            _remember_answer(question, _cache_key(question), answer)
+    return answers
+
+
+async def ayes_or_no_batch(
+    questions: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[LLMYesOrNoResponse]:
+    """Get yes or no from LLM for many questions, several questions per request.
+
+    Cached questions are answered from the cache. The others are packed
+    `batch_size` to a prompt, with at most `max_concurrency` prompts in
+    flight. Each parsed answer is cached per question, so a later `yes_or_no`
+    of the same question is a cache hit. Questions whose answer cannot be
+    parsed from the batch are asked one at a time.
+    """
+    questions = list(questions)
+    answers: dict[str, str] = {}
+    pending: list[str] = []
+    for question in dict.fromkeys(questions):
+        answer = _cached_answer(question)
+        if answer is ENOVAL:
+            pending.append(question)
+        else:
+            answers[question] = answer
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def answer_batch(batch: list[str]) -> None:
+        async with semaphore:
+            batch_answers = await _aanswer_batch(batch) if len(batch) > 1 else [None]
+        for question, answer in zip(batch, batch_answers):
+            if answer is None:
+                async with semaphore:
+                    answer = await aget_answer(question)
+            answers[question] = answer
+
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), max(batch_size, 1))]
+    await asyncio.gather(*(answer_batch(batch) for batch in batches))
+    return [_to_yes_or_no(question, answers[question]) for question in questions]
+
+
+def yes_or_no_batch(
+    questions: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[LLMYesOrNoResponse]:
+    """Get yes or no from LLM for many questions, in the same order as `questions`.
+
+    See `ayes_or_no_batch`. Must not be called from a running event loop.
+    """
+    return asyncio.run(ayes_or_no_batch(questions, batch_size=batch_size, max_concurrency=max_concurrency))
+
+
+_DOCSTRING_INSTRUCTIONS = (
+    "Write a docstring for the Python file below. Reply with just the docstring, with no other commentary, "
+    "starting and ending with three double quotes. The first line is a one-line summary of the file, "
+    "no longer than 60 characters. It is followed by a blank line, then a more detailed description."
+)
+_SEPARATOR = "------------"
+_QUOTED = re.compile(r'("""|\'\'\')(.*?)\1', re.DOTALL)
+
+
+def _as_docstring(answer: str) -> str:
+    """Extract a module docstring, with its quotes and a trailing newline, from an LLM answer."""
+    match = _QUOTED.search(answer)
+    body = match.group(2).strip() if match else answer.strip().strip('"').strip()
+    body = body.replace('"""', '\\"\\"\\"')
+    if "\n" in body:
+        return f'"""{body}\n"""\n'
+    return f'"""{body}"""\n'
+
+
+def _summary_question(text: str) -> str:
+    # Only the chunk text is in the question, so a chunk's cached summary is keyed by its content.
+    return (
+        "Summarize what this part of a Python file defines and does, in at most three sentences.\n"
+        f"{_SEPARATOR}\n{text}{_SEPARATOR}"
+    )
+
+
+def _combine_question(summaries: list[str]) -> str:
+    joined = "\n".join(f"- {summary.strip()}" for summary in summaries)
+    return (
+        "Combine these summaries of consecutive parts of a Python file into one summary "
+        f"of at most five sentences.\n{_SEPARATOR}\n{joined}\n{_SEPARATOR}"
+    )
+
+
+def _group_by_budget(texts: list[str], max_tokens: int) -> list[list[str]]:
+    """Group consecutive texts so that each group fits in `max_tokens`, with at least two texts per group."""
+    groups: list[list[str]] = []
+    tokens = 0
+    for text in texts:
+        size = estimate_tokens(text)
+        if groups and (len(groups[-1]) < 2 or tokens + size <= max_tokens):
+            groups[-1].append(text)
+            tokens += size
+        else:
+            groups.append([text])
+            tokens = size
+    return groups
+
+
+async def asuggest_docstring(
+    file_path: Path,
+    *,
+    max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> str:
+    """Write a module docstring for a Python file with the LLM.
+
+    A file that fits in `max_chunk_tokens` is sent whole. A larger file is
+    split into chunks on AST boundaries and summarized chunk by chunk,
+    concurrently (map); the summaries are then combined, in rounds if they do
+    not fit in one prompt, and turned into the docstring (reduce). Chunk
+    summaries are cached by chunk content, so after an edit only the changed
+    chunks are summarized again.
+
+    Returns the docstring with its quotes and a trailing newline.
+    """
+    file_path = Path(file_path)
+    source = get_document(file_path).text
+    chunks = chunk_python_source(source, max_tokens=max_chunk_tokens)
+    if len(chunks) <= 1:
+        return _as_docstring(await aget_answer(
+            f"{_DOCSTRING_INSTRUCTIONS}\n{_SEPARATOR}\n{file_path.name}\n{_SEPARATOR}\n{source}{_SEPARATOR}"
+        ))
+
+    summaries = await aget_answers(
+        [_summary_question(chunk.text) for chunk in chunks], max_concurrency=max_concurrency
     )
+    while estimate_tokens("\n".join(summaries)) > max_chunk_tokens and len(summaries) > 1:
+        summaries = await aget_answers(
+            [_combine_question(group) for group in _group_by_budget(summaries, max_chunk_tokens)],
+            max_concurrency=max_concurrency,
+        )
+    joined = "\n".join(f"- {summary.strip()}" for summary in summaries)
+    return _as_docstring(await aget_answer(
+        f"{_DOCSTRING_INSTRUCTIONS}\nThe file is too long to show; here are summaries of its parts, in order."
+        f"\n{_SEPARATOR}\n{file_path.name}\n{_SEPARATOR}\n{joined}\n{_SEPARATOR}"
+    ))
+
+
+def suggest_docstring(
+    file_path: Path,
+    *,
+    max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> str:
+    """Write a module docstring for a Python file with the LLM.
+
+    See `asuggest_docstring`. Must not be called from a running event loop.
+    """
+    return asyncio.run(asuggest_docstring(
+        file_path, max_chunk_tokens=max_chunk_tokens, max_concurrency=max_concurrency
+    ))
@@ -0,0 +1,252 @@
+"""Portable snapshots of the LLM response cache.
+
+A snapshot is one xz-compressed file of JSON lines, independent of diskcache
+and SQLite, so it can be moved between machines, for example to start
+ephemeral CI runners with a warm cache:
+
+    python -m auto_sdlc.llm_cache export llm-cache.snapshot --model ollama/llama3 --max-age-days 30
+    python -m auto_sdlc.llm_cache import llm-cache.snapshot
+    python -m auto_sdlc.llm_cache merge merged.snapshot runner-1.snapshot runner-2.snapshot
+
+Responses are content-addressed: each distinct response text is stored once,
+under its SHA-256, however many cache keys share it. Entries are written in
+key order, so the same cache contents always give the same snapshot, and its
+digest can key a CI cache. Merges and imports are deduplicated by cache key
+(the newest entry wins in a merge; entries already in the cache are kept on
+import). Exports, imports and merges can be restricted to some models (cache
+tags, see `llm_cache.model_tag`) and to entries stored recently enough.
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from auto_sdlc.llm_cache import LOCK_KEY_PREFIX, ResponseCache
+
+SNAPSHOT_FORMAT = "auto-sdlc-cache-snapshot"
+SNAPSHOT_VERSION = 1
+# Entries imported per cache transaction.
+IMPORT_BATCH_SIZE = 1000
+
+
+@dataclass
+class SnapshotEntry:
+    """A cached response in a snapshot, with the digest of its text."""
+    key: str
+    blob: str
+    tag: str | None = None
+    stored_at: float | None = None
+    expire_at: float | None = None
+
+
+@dataclass
+class SnapshotStats:
+    """What an export, import or merge did."""
+    entries: int = 0
+    blobs: int = 0
+    skipped: int = 0
+    digest: str | None = None
+
+
+def blob_digest(text: str) -> str:
+    """Content address of a response text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _matches(
+    entry: SnapshotEntry,
+    models: frozenset[str] | None,
+    max_age: float | None,
+    now: float,
+) -> bool:
+    if entry.expire_at is not None and entry.expire_at <= now:
+        return False
+    if max_age is not None and (entry.stored_at is None or now - entry.stored_at > max_age):
+        return False
+    if models is not None:
+        if entry.tag is None:
+            return False
+        # Either the full `backend/model` tag or just the model.
+        return entry.tag in models or entry.tag.partition("/")[2] in models
+    return True
+
+
+def iter_cache_entries(cache: ResponseCache) -> Iterator[tuple[SnapshotEntry, str]]:
+    """Cached text responses, in key order, without counting lookups or touching access times."""
+    disk = cache.raw.disk
+    connection = sqlite3.connect(f"file:{cache.directory / 'cache.db'}?mode=ro", uri=True, timeout=60)
+    try:
+        rows = connection.execute(
+            "SELECT key, store_time, expire_time, tag, mode, filename, value FROM Cache WHERE raw = 1 ORDER BY key"
+        )
+        for key, stored_at, expire_at, tag, mode, filename, value in rows:
+            if not isinstance(key, str) or key.startswith(LOCK_KEY_PREFIX):
+                continue
+            try:
+                text = disk.fetch(mode, filename, value, False)
+            except OSError:
+                # Evicted while we were reading.
+                continue
+            if isinstance(text, str):
+                yield SnapshotEntry(key, blob_digest(text), tag, stored_at, expire_at), text
+    finally:
+        connection.close()
+
+
+def iter_snapshot(path: str | Path) -> Iterator[tuple[SnapshotEntry, str]]:
+    """Entries of a snapshot file, with their texts, in the order they were written."""
+    blobs: dict[str, str] = {}
+    with lzma.open(path, "rt", encoding="utf-8") as snapshot:
+        header = json.loads(snapshot.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a cache snapshot.")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is a version {header.get('version')} snapshot; expected {SNAPSHOT_VERSION}.")
+        for line in snapshot:
+            record = json.loads(line)
+            if "text" in record:
+                blobs[record["blob"]] = record["text"]
+            else:
+                entry = SnapshotEntry(**record)
+                yield entry, blobs[entry.blob]
+
+
+def write_snapshot(path: str | Path, entries: Iterable[tuple[SnapshotEntry, str]]) -> SnapshotStats:
+    """Write entries to a snapshot file, each distinct text once, replacing the file atomically.
+
+    The digest of the stats is the SHA-256 of the uncompressed snapshot.
+    """
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    stats = SnapshotStats()
+    digest = hashlib.sha256()
+    written: set[str] = set()
+    try:
+        with lzma.open(temporary, "wt", encoding="utf-8") as snapshot:
+
+            def write(record: dict) -> None:
+                line = json.dumps(record, sort_keys=True) + "\n"
+                digest.update(line.encode())
+                snapshot.write(line)
+
+            write({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION})
+            for entry, text in entries:
+                if entry.blob not in written:
+                    write({"blob": entry.blob, "text": text})
+                    written.add(entry.blob)
+                    stats.blobs += 1
+                write(asdict(entry))
+                stats.entries += 1
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    stats.digest = digest.hexdigest()
+    return stats
+
+
+def _filtered(
+    entries: Iterable[tuple[SnapshotEntry, str]],
+    stats: SnapshotStats,
+    models: Iterable[str] | None,
+    max_age: float | None,
+) -> Iterator[tuple[SnapshotEntry, str]]:
+    wanted = frozenset(models) if models is not None else None
+    now = time.time()
+    for entry, text in entries:
+        if _matches(entry, wanted, max_age, now):
+            yield entry, text
+        else:
+            stats.skipped += 1
+
+
+def export_snapshot(
+    cache: ResponseCache,
+    path: str | Path,
+    *,
+    models: Iterable[str] | None = None,
+    max_age: float | None = None,
+) -> SnapshotStats:
+    """Write the cache's responses to a snapshot file.
+
+    Args:
+        cache: Cache to export.
+        path: Snapshot file to write.
+        models: Only export responses of these models (`backend/model`
+            tags, or model names). Untagged responses are then left out.
+        max_age: Only export responses stored at most this many seconds ago.
+    """
+    skipped = SnapshotStats()
+    stats = write_snapshot(path, _filtered(iter_cache_entries(cache), skipped, models, max_age))
+    stats.skipped = skipped.skipped
+    return stats
+
+
+def import_snapshot(
+    cache: ResponseCache,
+    path: str | Path,
+    *,
+    models: Iterable[str] | None = None,
+    max_age: float | None = None,
+    overwrite: bool = False,
+) -> SnapshotStats:
+    """Add the responses of a snapshot file to the cache.
+
+    Entries already in the cache are kept unless `overwrite`. Entries keep
+    the time they were first stored, so their age carries over to later
+    exports, and expiring entries keep their expiry time. See
+    `export_snapshot` for the filters.
+    """
+    stats = SnapshotStats()
+    blobs: set[str] = set()
+    now = time.time()
+    entries = _filtered(iter_snapshot(path), stats, models, max_age)
+    while True:
+        batch = [item for _, item in zip(range(IMPORT_BATCH_SIZE), entries)]
+        if not batch:
+            break
+        with cache.raw.transact(retry=True):
+            for entry, text in batch:
+                if not overwrite and entry.key in cache.raw:
+                    stats.skipped += 1
+                    continue
+                expire = entry.expire_at - now if entry.expire_at is not None else None
+                cache.raw.set(entry.key, text, expire=expire, tag=entry.tag, retry=True)
+                if entry.stored_at is not None:
+                    # diskcache stamps the entry with the time of this import.
+                    cache.raw._sql(
+                        "UPDATE Cache SET store_time = ? WHERE key = ? AND raw = 1", (entry.stored_at, entry.key)
+                    )
+                stats.entries += 1
+                blobs.add(entry.blob)
+    stats.blobs = len(blobs)
+    return stats
+
+
+def merge_snapshots(
+    paths: Iterable[str | Path],
+    output: str | Path,
+    *,
+    models: Iterable[str] | None = None,
+    max_age: float | None = None,
+) -> SnapshotStats:
+    """Merge snapshot files into one, keeping the newest entry of each key. See `export_snapshot` for the filters."""
+    stats = SnapshotStats()
+    newest: dict[str, SnapshotEntry] = {}
+    texts: dict[str, str] = {}
+    for path in paths:
+        for entry, text in _filtered(iter_snapshot(path), stats, models, max_age):
+            current = newest.get(entry.key)
+            if current is None or (entry.stored_at or 0) > (current.stored_at or 0):
+                newest[entry.key] = entry
+                texts.setdefault(entry.blob, text)
+            stats.skipped += current is not None
+    merged = write_snapshot(output, ((newest[key], texts[newest[key].blob]) for key in sorted(newest)))
+    merged.skipped = stats.skipped
+    return merged
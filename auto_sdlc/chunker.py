@@ -0,0 +1,141 @@
+"""Split Python source into chunks that fit a token budget, on AST boundaries.
+
+Top-level statements are packed greedily into chunks. A statement too big
+for the budget on its own, such as a large class, is split along the
+statements of its body, recursively; what still does not fit is split by
+lines. Comments and blank lines go with the statement that follows them.
+"""
+
+import ast
+import hashlib
+import io
+from dataclasses import dataclass
+from itertools import accumulate
+
+DEFAULT_CHUNK_TOKENS = 1500
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, for budgeting."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Consecutive lines of a source file (1-based, inclusive)."""
+    start_line: int
+    end_line: int
+    text: str
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the chunk's text."""
+        return hashlib.blake2b(self.text.encode(), digest_size=16).hexdigest()
+
+    @property
+    def tokens(self) -> int:
+        """Estimated token count of the chunk."""
+        return estimate_tokens(self.text)
+
+
+# (start line, end line, node or None for lines that are not a statement)
+_Span = tuple[int, int, ast.stmt | None]
+
+
+def _node_start(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", None)
+    return min([node.lineno, *(decorator.lineno for decorator in decorators)]) if decorators else node.lineno
+
+
+def _statement_spans(body: list[ast.stmt], start_line: int, end_line: int) -> list[_Span]:
+    """Spans of statements, each extended back to the end of the previous one, the last to `end_line`."""
+    spans: list[_Span] = []
+    previous_end = start_line - 1
+    for node in body:
+        end = node.end_lineno or node.lineno
+        if end <= previous_end:
+            # Shares a line with the previous statement (`a = 1; b = 2`).
+            continue
+        spans.append((previous_end + 1, end, node))
+        previous_end = end
+    if spans and previous_end < end_line:
+        start, _, node = spans[-1]
+        spans[-1] = (start, end_line, node)
+    return spans
+
+
+class _Chunker:
+    def __init__(self, lines: list[str], max_tokens: int) -> None:
+        self.lines = lines
+        self.max_tokens = max_tokens
+        self._offsets = [0, *accumulate(len(line) for line in lines)]
+        self.chunks: list[Chunk] = []
+
+    def tokens(self, start: int, end: int) -> int:
+        return -(-(self._offsets[end] - self._offsets[start - 1]) // CHARS_PER_TOKEN)
+
+    def emit(self, start: int, end: int) -> None:
+        self.chunks.append(Chunk(start, end, "".join(self.lines[start - 1:end])))
+
+    def split_lines(self, start: int, end: int) -> None:
+        chunk_start = start
+        for line in range(start, end + 1):
+            if line > chunk_start and self.tokens(chunk_start, line) > self.max_tokens:
+                self.emit(chunk_start, line - 1)
+                chunk_start = line
+        self.emit(chunk_start, end)
+
+    def split_statement(self, start: int, end: int, node: ast.stmt | None) -> None:
+        body = getattr(node, "body", None)
+        if not body or not isinstance(body, list):
+            self.split_lines(start, end)
+            return
+        body_start = _node_start(body[0])
+        if body_start <= start:
+            self.split_lines(start, end)
+            return
+        # The header (decorators and signature) becomes a span of its own.
+        spans: list[_Span] = [(start, body_start - 1, None)]
+        spans.extend(_statement_spans(body, body_start, end))
+        self.pack(spans)
+
+    def pack(self, spans: list[_Span]) -> None:
+        current: tuple[int, int] | None = None
+        for start, end, node in spans:
+            if self.tokens(start, end) > self.max_tokens:
+                if current is not None:
+                    self.emit(*current)
+                    current = None
+                self.split_statement(start, end, node)
+            elif current is not None and self.tokens(current[0], end) <= self.max_tokens:
+                current = (current[0], end)
+            else:
+                if current is not None:
+                    self.emit(*current)
+                current = (start, end)
+        if current is not None:
+            self.emit(*current)
+
+
+def chunk_python_source(source: str, *, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> list[Chunk]:
+    """Split Python source into chunks of at most `max_tokens` (estimated) tokens.
+
+    Chunks cover the whole source, in order. Only a single line longer than
+    the budget makes a chunk exceed it. Source that does not parse is split
+    by lines.
+    """
+    # Split lines the way `ast` numbers them (str.splitlines also splits on form feeds and such).
+    lines = io.StringIO(source, newline="").readlines()
+    if not lines:
+        return []
+    chunker = _Chunker(lines, max_tokens)
+    try:
+        body = ast.parse(source).body
+    except SyntaxError:
+        body = []
+    if body:
+        chunker.pack(_statement_spans(body, 1, len(lines)))
+    else:
+        chunker.split_lines(1, len(lines))
+    return chunker.chunks
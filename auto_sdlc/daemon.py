@@ -0,0 +1,244 @@
+"""Long-running review daemon, serving review, diff and apply requests over a Unix socket.
+
+The daemon keeps everything warm between requests: the LLM client and
+response cache, the symbol index, document buffers and stored reviews. A
+watcher thread polls the project and keeps the index current, so requests
+only pay for the files that changed.
+
+    python -m auto_sdlc.daemon --root .                  # serve
+    python -m auto_sdlc.daemon_client review module.py   # ask
+
+The protocol is one JSON object per line in each direction. Requests have a
+`command` (`review`, `diff`, `apply`, `status` or `stop`) and its parameters;
+responses are `{"ok": true, "result": ...}` or `{"ok": false, "error": ...}`.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from auto_sdlc import ask, file_ops
+from auto_sdlc.daemon_client import DEFAULT_SOCKET, default_socket_path
+from auto_sdlc.llm_scheduler import Priority
+from auto_sdlc.project_reviewer import FileReview, review_project
+from auto_sdlc.review_manifest import ReviewManifest
+from auto_sdlc.reviewer import apply_suggestions
+from auto_sdlc.symbol_index import SymbolIndex
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_STATE_DIRECTORY = ".cache"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                result = self.server.daemon.handle(request.pop("command"), **request)
+                response = {"ok": True, "result": result}
+            except Exception as ex:
+                response = {"ok": False, "error": f"{type(ex).__name__}: {ex}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: "ReviewDaemon") -> None:
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class ReviewDaemon:
+    """Warm review service for one project."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        socket_path: str | None = None,
+        state_directory: str | Path = DEFAULT_STATE_DIRECTORY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        llm_workers: int = 8,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.socket_path = socket_path or default_socket_path()
+        state_directory = Path(state_directory)
+        self.index = SymbolIndex(state_directory / "symbol-index.sqlite3")
+        self.manifest = ReviewManifest(state_directory / "review-manifest")
+        self.journal = state_directory / "write-journal"
+        self.poll_interval = poll_interval
+        self.llm_workers = llm_workers
+        self.started = time.time()
+        self.requests = 0
+        self._stopped = threading.Event()
+        self._closed = threading.Event()
+        self._server: _DaemonServer | None = None
+        self._threads: list[threading.Thread] = []
+        # Applies share the write journal, so they take turns.
+        self._apply_lock = threading.Lock()
+
+    def _files(self, files: list[str] | None) -> list[Path] | None:
+        return [Path(file) for file in files] if files else None
+
+    def review(self, files: list[str] | None = None, *, generate: bool = True) -> list[FileReview]:
+        """Review files (default: the whole project), reusing stored reviews of unchanged files."""
+        return list(review_project(
+            self.root,
+            files=self._files(files),
+            process_workers=0,
+            llm_workers=self.llm_workers,
+            generate=generate,
+            manifest=self.manifest,
+            symbol_index=self.index,
+            llm_priority=Priority.INTERACTIVE,
+        ))
+
+    def apply(self, files: list[str] | None = None) -> list[str]:
+        """Apply the suggestions for files; return the files changed."""
+        reviews = [review for review in self.review(files, generate=True) if review.error is None]
+        with self._apply_lock:
+            apply_suggestions(
+                (suggestion for review in reviews for suggestion in review.suggestions), journal=self.journal
+            )
+        changed = [review.file for review in reviews if review.suggestions]
+        self.index.update(changed)
+        return [str(file) for file in changed]
+
+    def status(self) -> dict[str, Any]:
+        """Uptime, request count and size of the warm state."""
+        return {
+            "root": str(self.root),
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "indexed_files": len(self.index),
+            "stored_reviews": len(self.manifest),
+        }
+
+    def handle(self, command: str, **params: Any) -> Any:
+        """Run one request."""
+        self.requests += 1
+        if command in ("review", "diff"):
+            reviews = self.review(params.get("files"), generate=params.get("generate", True))
+            return [review.to_json() for review in reviews]
+        if command == "apply":
+            return self.apply(params.get("files"))
+        if command == "status":
+            return self.status()
+        if command == "stop":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return None
+        raise ValueError(f"Unknown command: {command}")
+
+    def warm_up(self) -> None:
+        """Load what the first request would otherwise pay for."""
+        self.index.update_project(self.root)
+        ask.get_cache()
+        ask.get_llm()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.index.update_project(self.root, workers=0)
+            except Exception:
+                # A file changing mid-scan is picked up by the next poll.
+                continue
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self.socket_path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)
+                return
+        raise RuntimeError(f"A daemon is already listening on {self.socket_path}.")
+
+    def start(self) -> "ReviewDaemon":
+        """Listen on the socket and start watching the project, in background threads."""
+        self._remove_stale_socket()
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+        previous_umask = os.umask(0o177)  # Only the owner may connect.
+        try:
+            self._server = _DaemonServer(self.socket_path, self)
+        finally:
+            os.umask(previous_umask)
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="auto-sdlc-daemon", daemon=True),
+            threading.Thread(target=self._watch, name="auto-sdlc-watcher", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def wait(self) -> None:
+        """Block until the daemon has stopped and released the socket."""
+        self._closed.wait()
+
+    def stop(self) -> None:
+        """Stop serving, and release the socket and state."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.index.close()
+        self.manifest.close()
+        file_ops.clear_documents()
+        self._closed.set()
+
+    def __enter__(self) -> "ReviewDaemon":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the review daemon."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.daemon", description=main.__doc__)
+    parser.add_argument("--root", default=".", help="Project to review (default: the current directory).")
+    parser.add_argument("--socket", default=default_socket_path(), help=f"Socket to listen on (default: {DEFAULT_SOCKET}).")
+    parser.add_argument("--state-directory", default=DEFAULT_STATE_DIRECTORY, help="Where to keep the index and stored reviews.")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between scans for changes.")
+    parser.add_argument("--no-warm-up", action="store_true", help="Do not index the project and load the LLM client at start.")
+    args = parser.parse_args(argv)
+
+    daemon = ReviewDaemon(
+        Path(args.root),
+        socket_path=args.socket,
+        state_directory=args.state_directory,
+        poll_interval=args.poll_interval,
+    )
+    if not args.no_warm_up:
+        daemon.warm_up()
+    daemon.start()
+    print(f"Review daemon for {daemon.root} listening on {daemon.socket_path}")
+    try:
+        daemon.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Thin client of the review daemon (`auto_sdlc.daemon`).
+
+Imports only the standard library, so it starts in milliseconds; all the
+work happens in the daemon's warm process. Suitable for editor integrations
+and pre-commit hooks:
+
+    python -m auto_sdlc.daemon_client review src/module.py   # exits 1 if there are suggestions
+    python -m auto_sdlc.daemon_client diff src/module.py
+    python -m auto_sdlc.daemon_client apply src/module.py
+    python -m auto_sdlc.daemon_client status
+    python -m auto_sdlc.daemon_client stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any
+
+SOCKET_ENV_VAR = "AUTO_SDLC_SOCKET"
+DEFAULT_SOCKET = ".cache/auto-sdlc.sock"
+COMMANDS = ("review", "diff", "apply", "status", "stop")
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon cannot be reached or a request fails."""
+
+
+def default_socket_path() -> str:
+    """Socket path from the environment, or the default."""
+    return os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET
+
+
+def request(command: str, *, socket_path: str | None = None, timeout: float | None = None, **params: Any) -> Any:
+    """Send a request to the daemon and return its result."""
+    socket_path = socket_path or default_socket_path()
+    payload = json.dumps({"command": command, **params}).encode() + b"\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as ex:
+            raise DaemonError(f"No review daemon listening on {socket_path}; start it with python -m auto_sdlc.daemon.") from ex
+        try:
+            connection.sendall(payload)
+            with connection.makefile("rb") as reader:
+                line = reader.readline()
+        except OSError as ex:
+            raise DaemonError(f"Lost the connection to the review daemon: {ex}") from ex
+    if not line:
+        raise DaemonError("The review daemon closed the connection without answering.")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error") or "Request failed.")
+    return response.get("result")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Ask the review daemon to review, diff or apply suggestions."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.daemon_client", description=main.__doc__)
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("files", nargs="*", help="Files to review (default: the daemon's whole project).")
+    parser.add_argument("--socket", default=default_socket_path(), help=f"Daemon socket (default: ${SOCKET_ENV_VAR} or {DEFAULT_SOCKET}).")
+    parser.add_argument("--no-generate", action="store_true", help="Find suggestions without generating text with the LLM.")
+    args = parser.parse_args(argv)
+
+    params: dict[str, Any] = {}
+    if args.command in ("review", "diff", "apply"):
+        params["files"] = [os.path.abspath(file) for file in args.files] or None
+        params["generate"] = not args.no_generate
+    try:
+        result = request(args.command, socket_path=args.socket, **params)
+    except DaemonError as ex:
+        print(ex, file=sys.stderr)
+        sys.exit(2)
+
+    if args.command == "review":
+        print(json.dumps(result, indent=2))
+        if any(review["suggestions"] for review in result):
+            sys.exit(1)
+    elif args.command == "diff":
+        sys.stdout.write("".join(diff for review in result for diff in review["diffs"]))
+    elif args.command == "apply":
+        for file in result:
+            print(f"Applied suggestions to {file}")
+    elif args.command == "status":
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
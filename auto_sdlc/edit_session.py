@@ -0,0 +1,255 @@
+"""Batched, transactional edits against a single file.
+
+An `EditSession` snapshots a file, queues many edits expressed in the
+snapshot's line numbers, and writes the result once on commit. Because every
+edit is anchored to the original snapshot, later edits never see stale line
+numbers from earlier ones, and applying the queue is a single pass over the
+file's lines.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from auto_sdlc.file_ops import DocumentBuffer, FilePosition, FileRange, get_document
+
+
+class EditConflictError(ValueError):
+    """Raised when an edit overlaps an edit already queued in the session."""
+
+
+@dataclass(order=True)
+class _RangeEdit:
+    start: int
+    end: int
+    order: int
+    lines: list[str] = field(compare=False)
+
+
+@dataclass(order=True)
+class _StringInsert:
+    line: int
+    column: int
+    order: int
+    string: str = field(compare=False)
+
+
+@dataclass(order=True)
+class _LinesInsert:
+    after_line: int
+    order: int
+    text: str = field(compare=False)
+
+
+class EditSession:
+    """Queue edits against one file and write them in a single commit.
+
+    Line numbers are 1-based and always refer to the file as it was when the
+    session was opened. Use the session as a context manager to commit on
+    success and discard the queue on error.
+    """
+
+    def __init__(self, file: Path) -> None:
+        self.file = Path(file)
+        self._snapshot()
+        self._range_edits: list[_RangeEdit] = []
+        self._string_inserts: list[_StringInsert] = []
+        self._lines_inserts: list[_LinesInsert] = []
+        self._edit_count = 0
+
+    def __enter__(self) -> "EditSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def __len__(self) -> int:
+        return self._edit_count
+
+    @property
+    def original_text(self) -> str:
+        """Text of the file when the session was opened."""
+        return self._text
+
+    def _next_order(self) -> int:
+        self._edit_count += 1
+        return self._edit_count
+
+    def _range_covering(self, line: int, *, inclusive: bool = True) -> _RangeEdit | None:
+        """Queued range edit that contains `line`, if any."""
+        index = bisect_right(self._range_edits, line, key=lambda edit: edit.start)
+        if index == 0:
+            return None
+        candidate = self._range_edits[index - 1]
+        if line < candidate.end or (inclusive and line == candidate.end):
+            return candidate
+        return None
+
+    def replace_lines(self, start: int, end: int, text: str) -> None:
+        """Replace lines `start` through `end` (inclusive) with `text`."""
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid line range: {start}-{end}")
+
+        index = bisect_left(self._range_edits, start, key=lambda edit: edit.start)
+        if index > 0 and self._range_edits[index - 1].end >= start:
+            edit = self._range_edits[index - 1]
+        elif index < len(self._range_edits) and self._range_edits[index].start <= end:
+            edit = self._range_edits[index]
+        else:
+            edit = None
+        if edit is not None:
+            raise EditConflictError(
+                f"Lines {start}-{end} overlap queued edit of lines {edit.start}-{edit.end} in {self.file}."
+            )
+
+        index = bisect_left(self._string_inserts, start, key=lambda insert: insert.line)
+        if index < len(self._string_inserts) and self._string_inserts[index].line <= end:
+            raise EditConflictError(
+                f"Lines {start}-{end} overlap a queued insert on line "
+                f"{self._string_inserts[index].line} in {self.file}."
+            )
+
+        index = bisect_left(self._lines_inserts, start, key=lambda insert: insert.after_line)
+        if index < len(self._lines_inserts) and self._lines_inserts[index].after_line < end:
+            raise EditConflictError(
+                f"Lines {start}-{end} overlap lines queued after line "
+                f"{self._lines_inserts[index].after_line} in {self.file}."
+            )
+
+        insort(self._range_edits, _RangeEdit(start, end, self._next_order(), text.splitlines()))
+
+    def insert_string(self, line: int, column: int, string: str) -> None:
+        """Insert `string` at a line and column."""
+        if not 1 <= line <= len(self._lines):
+            raise ValueError(f"Line {line} is out of range for {self.file}.")
+        covering = self._range_covering(line)
+        if covering is not None:
+            raise EditConflictError(
+                f"Insert at {line}:{column} falls inside queued edit of lines "
+                f"{covering.start}-{covering.end} in {self.file}."
+            )
+        insort(self._string_inserts, _StringInsert(line, column, self._next_order(), string))
+
+    def insert_lines(self, at_line: int, text: str) -> None:
+        """Insert `text` as new lines after line `at_line` (0 for the top of the file)."""
+        covering = self._range_covering(at_line, inclusive=False)
+        if covering is not None:
+            raise EditConflictError(
+                f"Lines inserted after line {at_line} fall inside queued edit of lines "
+                f"{covering.start}-{covering.end} in {self.file}."
+            )
+        insort(self._lines_inserts, _LinesInsert(at_line, self._next_order(), text))
+
+    def replace_range(self, file_range: FileRange, text: str) -> None:
+        """Queue the equivalent of setting `file_range.text`."""
+        self._check_file(file_range.file)
+        self.replace_lines(file_range.start, file_range.end, text)
+
+    def insert_at(self, position: FilePosition, string: str) -> None:
+        """Queue the equivalent of `position.insert_string`."""
+        self._check_file(position.file)
+        self.insert_string(position.line, position.column, string)
+
+    def _check_file(self, file: Path) -> None:
+        if Path(file) != self.file:
+            raise ValueError(f"Edit targets {file}, but this session edits {self.file}.")
+
+    def map_line(self, line: int) -> int:
+        """Map a line number in the original file to its number after all queued edits.
+
+        Lines that are replaced by a range edit map to the first line of the
+        replacement.
+        """
+        shift = 0
+        for lines_insert in self._lines_inserts:
+            if lines_insert.after_line >= line:
+                break
+            shift += lines_insert.text.count("\n") + 1
+        for range_edit in self._range_edits:
+            if range_edit.start > line:
+                break
+            if range_edit.end >= line:
+                return range_edit.start + shift
+            shift += len(range_edit.lines) - (range_edit.end - range_edit.start + 1)
+        return line + shift
+
+    def render_lines(self) -> list[str]:
+        """Lines of the file with every queued edit applied."""
+        lines = self._lines
+        output: list[str] = []
+        lines_inserts = iter(self._lines_inserts)
+        next_lines_insert = next(lines_inserts, None)
+        range_edits = iter(self._range_edits)
+        next_range = next(range_edits, None)
+        string_inserts = self._string_inserts
+        insert_index = 0
+
+        line_number = 1
+        while line_number <= len(lines):
+            while next_lines_insert is not None and next_lines_insert.after_line < line_number:
+                output.append(next_lines_insert.text)
+                next_lines_insert = next(lines_inserts, None)
+
+            if next_range is not None and next_range.start == line_number:
+                output.extend(next_range.lines)
+                line_number = next_range.end + 1
+                next_range = next(range_edits, None)
+                continue
+
+            line_text = lines[line_number - 1]
+            pending: list[_StringInsert] = []
+            while insert_index < len(string_inserts) and string_inserts[insert_index].line == line_number:
+                pending.append(string_inserts[insert_index])
+                insert_index += 1
+            if pending:
+                pieces = []
+                last_column = 0
+                for insert in pending:
+                    pieces.append(line_text[last_column:insert.column])
+                    pieces.append(insert.string)
+                    last_column = max(last_column, insert.column)
+                pieces.append(line_text[last_column:])
+                line_text = "".join(pieces)
+            output.append(line_text)
+            line_number += 1
+
+        if next_lines_insert is not None:
+            output.append(next_lines_insert.text)
+            output.extend(edit.text for edit in lines_inserts)
+        if next_range is not None:
+            output.extend(next_range.lines)
+            for edit in range_edits:
+                output.extend(edit.lines)
+        return output
+
+    def render(self) -> str:
+        """Text of the file with every queued edit applied."""
+        text = "\n".join(self.render_lines())
+        if text and not text.endswith("\n"):
+            text += "\n"
+        return text
+
+    def commit(self) -> None:
+        """Write all queued edits to the file in a single write."""
+        if not self._edit_count:
+            return
+        current = get_document(self.file)
+        if current.signature != self._signature:
+            raise EditConflictError(f"{self.file} changed on disk since the edit session was opened.")
+        current.write_text(self.render())
+        self.discard()
+
+    def discard(self) -> None:
+        """Drop all queued edits and re-snapshot the file."""
+        self._range_edits.clear()
+        self._string_inserts.clear()
+        self._lines_inserts.clear()
+        self._edit_count = 0
+        self._snapshot()
+
+    def _snapshot(self) -> None:
+        document: DocumentBuffer = get_document(self.file)
+        self._text = document.text
+        self._lines = list(document.lines)
+        self._signature = document.signature
@@ -1,28 +1,200 @@
 
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
 from pathlib import Path
+from threading import Lock
 from pydantic import BaseModel
 
+from auto_sdlc import file_writer, metrics
+from auto_sdlc.spans import LineSpan, Position, SpanArray
+
+
+MAX_OPEN_DOCUMENTS = 256
+
+_FILE_OPERATIONS = metrics.counter("auto_sdlc_file_operations_total", "Files read and written, by operation.")
+_FILE_BYTES = metrics.counter("auto_sdlc_file_bytes_total", "Bytes of files read and written, by operation.")
+
+
+class DocumentBuffer:
+    """Cached text of a file, with a precomputed line offset table.
+
+    The buffer is checked against the file's mtime and size on each access and
+    re-read only when the file changed on disk. Offsets follow the convention
+    used throughout this module: every line counts as its length plus one
+    newline character.
+    """
+
+    def __init__(self, file: Path) -> None:
+        self.file = file
+        self._signature: tuple[int, int] | None = None
+        self._text = ""
+        self._lines: list[str] = []
+        self._line_starts: list[int] = []
+        self._end_index = 0
+        self._lines_with_endings: list[str] | None = None
+
+    def _load(self, text: str, signature: tuple[int, int]) -> None:
+        self._text = text
+        self._lines = text.splitlines()
+        self._line_starts = [0, *accumulate(len(line) + 1 for line in self._lines)]
+        self._end_index = self._line_starts.pop()
+        self._lines_with_endings = None
+        self._signature = signature
+
+    def seed(self, text: str, signature: tuple[int, int]) -> None:
+        """Load text read elsewhere, such as in another process, for the file as it was at `signature`.
+
+        The file is not read again until it changes on disk.
+        """
+        if signature != self._signature:
+            self._load(text, signature)
+
+    def _stat_signature(self) -> tuple[int, int]:
+        stat = self.file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self) -> "DocumentBuffer":
+        """Re-read the file if it changed on disk since it was last loaded.
+
+        Inside a `file_writer.write_behind()` block, text queued for the file
+        takes precedence over the file on disk.
+        """
+        writer = file_writer.active_writer()
+        pending = writer.pending(self.file) if writer is not None else None
+        if pending is not None:
+            text, token = pending
+            if self._signature != (-1, token):
+                self._load(text, (-1, token))
+            return self
+        signature = self._stat_signature()
+        if signature != self._signature:
+            self._load(self.file.read_text(), signature)
+            _FILE_OPERATIONS.inc(operation="read")
+            _FILE_BYTES.inc(signature[1], operation="read")
+        return self
+
+    @property
+    def signature(self) -> tuple[int, int] | None:
+        """The (mtime, size) of the file when it was last loaded or written."""
+        return self._signature
+
+    @property
+    def text(self) -> str:
+        """Full text of the file."""
+        return self._text
+
+    @property
+    def lines(self) -> list[str]:
+        """Lines of the file, without line endings."""
+        return self._lines
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the file."""
+        return len(self._lines)
+
+    @property
+    def lines_with_endings(self) -> list[str]:
+        """Lines of the file, including line endings."""
+        if self._lines_with_endings is None:
+            self._lines_with_endings = self._text.splitlines(keepends=True)
+        return self._lines_with_endings
+
+    def line_start_index(self, line: int) -> int:
+        """Index of the first character of a (1-based) line."""
+        if line <= len(self._line_starts):
+            return self._line_starts[line - 1]
+        return self._end_index
+
+    def index_of(self, line: int, column: int) -> int:
+        """Index of a line and column."""
+        return self.line_start_index(line) + column
+
+    def line_and_column_of(self, index: int) -> tuple[int, int] | tuple[None, None]:
+        """Line and column of an index, or (None, None) if out of range."""
+        if not self._lines or index >= self._end_index:
+            return None, None
+        line_number = max(bisect_right(self._line_starts, index), 1)
+        return line_number, index - self._line_starts[line_number - 1]
+
+    def write_text(self, text: str) -> None:
+        """Write text to the file atomically and keep the buffer in sync.
+
+        Inside a `file_writer.write_behind()` block, the write is queued, and
+        the buffer holds the queued text until it is flushed.
+        """
+        writer = file_writer.active_writer()
+        if writer is None:
+            file_writer.atomic_write_text(self.file, text)
+            self._load(text, self._stat_signature())
+        else:
+            token = writer.write(self.file, text, on_flush=self._flushed)
+            self._load(text, (-1, token))
+        _FILE_OPERATIONS.inc(operation="write")
+        _FILE_BYTES.inc(len(text.encode()), operation="write")
+
+    def _flushed(self, token: int, signature: tuple[int, int] | None) -> None:
+        # The queued text is on disk now: track the file again, unless the buffer moved on.
+        if self._signature == (-1, token):
+            self._signature = signature
+
+
+_documents: OrderedDict[Path, DocumentBuffer] = OrderedDict()
+_documents_lock = Lock()
+
+
+def _shared_document(file: Path) -> DocumentBuffer:
+    file = Path(file)
+    with _documents_lock:
+        document = _documents.get(file)
+        if document is None:
+            document = _documents[file] = DocumentBuffer(file)
+            if len(_documents) > MAX_OPEN_DOCUMENTS:
+                _documents.popitem(last=False)
+        else:
+            _documents.move_to_end(file)
+    return document
+
+
+def get_document(file: Path) -> DocumentBuffer:
+    """Get the shared, up-to-date document buffer for a file."""
+    return _shared_document(file).refresh()
+
+
+def seed_document(file: Path, text: str, signature: tuple[int, int]) -> None:
+    """Share text already read for a file, so the shared buffer does not read it again while it is unchanged."""
+    _shared_document(file).seed(text, signature)
+
+
+def clear_documents() -> None:
+    """Drop all cached document buffers."""
+    with _documents_lock:
+        _documents.clear()
+
 
 def find_line_and_column_from_index(file, index) -> tuple[int, int] | tuple[None, None]:
     """Find the line and column from the index of a file."""
-    file_text = file.read_text()
-    lines = file_text.splitlines()
-    chars_left = index
-    for line_number, line in enumerate(lines):
-        if len(line) + 1 > chars_left:
-            return line_number + 1, chars_left
-        else:
-            chars_left -= len(line) + 1
-    return None, None  # return None if index is out of range
+    return get_document(file).line_and_column_of(index)
+
+
+def read_spans(spans: SpanArray) -> list[str]:
+    """Texts of a batch of line spans, in order. Each file's document is fetched once."""
+    files_lines = [get_document(file).lines for file in spans.files]
+    texts = []
+    for file_id, start, end in zip(spans.file_ids, spans.starts, spans.ends):
+        lines = files_lines[file_id][start - 1:end] if start <= end else []
+        texts.append("\n".join(lines) + "\n" if lines else "")
+    return texts
 
 
 def insert_lines(file_path: Path, text: str, at_line: int) -> None:
     """Insert lines into a file."""
-    file_text = file_path.read_text()
-    lines = file_text.splitlines()
+    document = get_document(file_path)
+    lines = list(document.lines)
     lines.insert(at_line, text)
-    file_path.write_text("\n".join(lines))
+    document.write_text("\n".join(lines))
 
 
 class FilePlace(ABC, BaseModel):
@@ -38,10 +210,15 @@ class FilePlace(ABC, BaseModel):
         """Next lines."""
         ...
 
+    @property
+    def document(self) -> DocumentBuffer:
+        """Shared document buffer of the file."""
+        return get_document(self.file)
+
     @property
     def file_line_count(self) -> int:
         """Number of lines in the file."""
-        return len(self.file.read_text().splitlines())
+        return self.document.line_count
 
     @property
     def parent_file_range(self) -> "FileRange":
@@ -65,7 +242,7 @@ class FilePosition(FilePlace):
 
         To calculate, we need to add the number of characters in each line before the current line.
         """
-        return sum(len(line) + 1 for line in self.file.read_text().splitlines()[:self.line - 1]) + self.column
+        return self.document.index_of(self.line, self.column)
 
     @index.setter
     def index(self, value) -> None:
@@ -84,6 +261,15 @@ class FilePosition(FilePlace):
         """String representation of the file position."""
         return f"{self.file.name}:{self.line}:{self.column}"
 
+    def to_position(self) -> Position:
+        """Lightweight copy, for internal use in hot loops."""
+        return Position(self.file, self.line, self.column)
+
+    @classmethod
+    def from_position(cls, position: Position) -> "FilePosition":
+        """Model of a lightweight position."""
+        return cls(file=position.file, line=position.line, column=position.column)
+
     @property
     def line_start_position(self) -> "FilePosition":
         """Line start position."""
@@ -99,30 +285,31 @@ class FilePosition(FilePlace):
         return FilePosition(
             file=self.file,
             line=self.line,
-            column=len(self.file.read_text().splitlines()[self.line -1]),
+            column=len(self.document.lines[self.line - 1]),
         )
 
     def read_line(self, *, from_start: bool = False) -> str:
         """Text of the file position."""
+        line_text = self.document.lines[self.line - 1]
         if from_start:
-            return self.file.read_text().splitlines()[self.line - 1]
+            return line_text
 
-        return self.file.read_text().splitlines()[self.line - 1][self.column - 1:]
+        return line_text[self.column - 1:]
 
     def read_lines(self, lines: int, *, from_start: bool = False) -> str:
         first_line = self.read_line(from_start=from_start)
         if lines == 1:
             return first_line
 
-        addl_lines = self.file.read_text().splitlines()[self.line:self.line + lines]
+        addl_lines = self.document.lines[self.line:self.line + lines]
         return "\n".join([first_line] + addl_lines)
 
     def insert_string(self, string: str) -> None:
         """Insert string into the file position."""
-        file_text = self.file.read_text()
-        lines = file_text.splitlines()
+        document = self.document
+        lines = list(document.lines)
         lines[self.line - 1] = lines[self.line -1][:self.column] + string + lines[self.line - 1][self.column:]
-        self.file.write_text("\n".join(lines) + "\n")
+        document.write_text("\n".join(lines) + "\n")
 
     @classmethod
     def from_search(
@@ -132,15 +319,28 @@ class FilePosition(FilePlace):
         *,
         file_path: Path,
     ) -> "FilePosition | None":
-        """Get file position from search."""
-        file_text = file_path.read_text()
-        if search not in file_text:
-            return None
+        """Get file position from search.
 
-        return FilePosition.from_index(
-            file=file_path,
-            index=file_text.index(search) + 1,
-        )
+        Large files are searched memory-mapped, without loading their text,
+        unless the search spans lines: the text has its line endings
+        translated, the raw bytes do not.
+        """
+        from auto_sdlc.search import MMAP_THRESHOLD, find_first
+
+        writer = file_writer.active_writer()
+        queued = writer is not None and writer.pending(Path(file_path)) is not None
+        single_line = "\n" not in search and "\r" not in search
+        if single_line and not queued and Path(file_path).stat().st_size >= MMAP_THRESHOLD:
+            match = find_first(file_path, search)
+            if match is None:
+                return None
+            # The position `from_index` gives for the index after the start of the match.
+            return FilePosition(file=file_path, line=match.line, column=match.column + 1)
+
+        index = get_document(file_path).text.find(search)
+        if index < 0:
+            return None
+        return FilePosition.from_index(file=file_path, index=index + 1)
 
     @classmethod
     def from_index(cls, file: Path, index: int) -> "FilePosition":
@@ -157,21 +357,17 @@ class FilePosition(FilePlace):
 
     def find_next(self, search: str) -> "FilePosition | None":
         """Find after."""
-        file_text = self.file.read_text()
-        if search not in file_text:
+        index = self.document.text.find(search, self.index + 1)
+        if index < 0:
             return None
-
-        return FilePosition.from_index(
-            file=self.file,
-            index=file_text.index(search, self.index + 1) + 1,
-        )
+        return FilePosition.from_index(file=self.file, index=index + 1)
 
     def previous_lines(self, lines: int) -> "FileRange":
         """Previous lines."""
         return FileRange(
             file=self.file,
             start=max(1, self.line - lines),
-            end=self.start,
+            end=self.line - 1,
         )
     
     def current_line(self) -> "FileRange":
@@ -187,7 +383,7 @@ class FilePosition(FilePlace):
         return FileRange(
             file=self.file,
             start=self.line + 1,
-            end=min(self.end + lines, self.file_line_count),
+            end=min(self.line + lines, self.file_line_count),
         )
 
 
@@ -201,6 +397,15 @@ class FileRange(FilePlace):
         """String representation of the file range."""
         return f"{self.file}:{self.start}-{self.end}"
 
+    def to_span(self) -> LineSpan:
+        """Lightweight copy, for internal use in hot loops."""
+        return LineSpan(self.file, self.start, self.end)
+
+    @classmethod
+    def from_span(cls, span: LineSpan) -> "FileRange":
+        """Model of a lightweight span."""
+        return cls(file=span.file, start=span.start, end=span.end)
+
     @property
     def start_position(self) -> FilePosition:
         """Start position."""
@@ -216,30 +421,32 @@ class FileRange(FilePlace):
         return FilePosition(
             file=self.file,
             line=self.end,
-            column=len(self.file.read_text().splitlines(keepends=1)[self.end - 1]),
+            column=len(self.document.lines_with_endings[self.end - 1]),
         )
 
     @property
     def text(self) -> str:
-        """Text of the file range."""
-        return "\n".join(self.file.read_text().splitlines()[self.start - 1:self.end]) + "\n"
+        """Text of the file range. Empty for an empty range."""
+        if self.end < self.start:
+            return ""
+        return "\n".join(self.document.lines[self.start - 1:self.end]) + "\n"
 
     @text.setter
     def text(self, value) -> None:
         """Set text of the file range."""
-        file_text = self.file.read_text()
-        lines = file_text.splitlines()
+        document = self.document
+        lines = document.lines
         lines_before = lines[:self.start - 1]
         lines_after = lines[self.end:]
         new_text = "\n".join(lines_before + value.splitlines() + lines_after) + "\n"
-        self.file.write_text(new_text)
+        document.write_text(new_text)
 
     def previous_lines(self, lines: int) -> "FileRange":
         """Previous lines."""
         return FileRange(
             file=self.file,
             start=max(1, self.start - lines),
-            end=self.start,
+            end=self.start - 1,
         )
 
     def next_lines(self, lines: int) -> "FileRange":
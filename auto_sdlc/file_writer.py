@@ -0,0 +1,404 @@
+"""Crash-safe file writes: atomic replacement, write-behind batching and a recovery journal.
+
+Every write replaces the file atomically (write a temporary file next to it,
+then rename it over the original), so readers and crashes never see a
+half-written file.
+
+Inside a `write_behind()` block, writes are queued instead: repeated writes
+to the same file within the flush window are coalesced into one, and queued
+files are flushed in parallel by a bounded thread pool, every flush window
+and when the block exits. `file_ops` reads queued text back, so code in the
+block sees its own writes.
+
+With a journal, the original of every file is saved, and the text about to
+be written is recorded, before the file is replaced. If the process dies in
+the middle of a bulk apply, the batch can be rolled back to the originals or
+resumed to the intended contents:
+
+    with write_behind(journal=".cache/write-journal"):
+        apply_suggestions(suggestions)
+
+    python -m auto_sdlc.file_writer {status,rollback,resume} --journal .cache/write-journal
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import stat
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+DEFAULT_FLUSH_WINDOW = 0.05
+DEFAULT_FLUSH_WORKERS = 4
+DEFAULT_JOURNAL = ".cache/write-journal"
+
+# The files a journal writes; anything else in its directory is left alone.
+_JOURNAL_FILE = re.compile(r"journal\.jsonl|\d+\.(orig|new)")
+
+# Read once, so new files get the same permissions `open` would give them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_active_writer: ContextVar["WriteBehindWriter | None"] = ContextVar("auto_sdlc_write_behind", default=None)
+_tokens = itertools.count(1)
+
+
+class JournalError(RuntimeError):
+    """Raised when a journal holds an unfinished batch, or cannot be recovered."""
+
+
+def _fsync_directory(directory: Path) -> None:
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _replace_atomically(path: Path, mode: str, write: Callable[[IO], object], *, durable: bool) -> None:
+    path = Path(path)
+    if path.is_symlink():
+        path = path.resolve()
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, mode) as file:
+            write(file)
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+        try:
+            permissions = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            permissions = 0o666 & ~_UMASK
+        os.chmod(temporary, permissions)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+    if durable:
+        _fsync_directory(path.parent)
+
+
+def atomic_write_text(path: Path, text: str, *, durable: bool = False) -> None:
+    """Replace a file's text atomically; with `durable`, also sync it to disk."""
+    _replace_atomically(path, "w", lambda file: file.write(text), durable=durable)
+
+
+def atomic_write_bytes(path: Path, data: bytes, *, durable: bool = False) -> None:
+    """Replace a file's bytes atomically; with `durable`, also sync it to disk."""
+    _replace_atomically(path, "wb", lambda file: file.write(data), durable=durable)
+
+
+@dataclass
+class JournalEntry:
+    """What the journal knows about one file of a batch."""
+    path: Path
+    original: Path | None
+    target: Path
+    done: bool
+
+
+class Journal:
+    """Originals and intended contents of the files written by a batch."""
+
+    def __init__(self, directory: str | Path = DEFAULT_JOURNAL, *, durable: bool = False) -> None:
+        self.directory = Path(directory)
+        self.durable = durable
+        self._log = self.directory / "journal.jsonl"
+        self._lock = threading.Lock()
+        self._originals: dict[str, str | None] = {}
+        self._names = itertools.count()
+
+    def entries(self) -> list[JournalEntry]:
+        """Files of the unfinished batch, with their latest intended contents."""
+        if not self._log.exists():
+            return []
+        entries: dict[str, JournalEntry] = {}
+        with open(self._log) as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A record torn by a crash; its write never started.
+                    break
+                path = record["path"]
+                if "target" in record:
+                    original = entries[path].original if path in entries else (
+                        self.directory / record["original"] if record["original"] else None
+                    )
+                    entries[path] = JournalEntry(Path(path), original, self.directory / record["target"], False)
+                elif path in entries and entries[path].target.name == record["done"]:
+                    entries[path].done = True
+        return list(entries.values())
+
+    def begin(self) -> None:
+        """Start a batch; refuses if an unfinished one is in the journal."""
+        if self.entries():
+            raise JournalError(
+                f"{self.directory} holds an unfinished batch of writes; "
+                f"roll it back or resume it with python -m auto_sdlc.file_writer."
+            )
+        self._clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, name: str, data: bytes) -> None:
+        with open(self.directory / name, "wb") as file:
+            file.write(data)
+            if self.durable:
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _append(self, record: dict) -> None:
+        with open(self._log, "a") as log:
+            log.write(json.dumps(record) + "\n")
+            if self.durable:
+                log.flush()
+                os.fsync(log.fileno())
+
+    def record(self, path: Path, text: str) -> str:
+        """Save a file's original (once per batch) and the text about to replace it; return the record's name."""
+        key = os.path.abspath(path)
+        with self._lock:
+            number = next(self._names)
+            if key not in self._originals:
+                try:
+                    original = Path(key).read_bytes()
+                except FileNotFoundError:
+                    self._originals[key] = None
+                else:
+                    self._originals[key] = f"{number}.orig"
+                    self._write(f"{number}.orig", original)
+            target = f"{number}.new"
+            with open(self.directory / target, "w") as file:
+                file.write(text)
+                if self.durable:
+                    file.flush()
+                    os.fsync(file.fileno())
+            self._append({"path": key, "original": self._originals[key], "target": target})
+        return target
+
+    def done(self, path: Path, target: str) -> None:
+        """Mark a recorded write as finished."""
+        with self._lock:
+            self._append({"path": os.path.abspath(path), "done": target})
+
+    def commit(self) -> None:
+        """Finish the batch: its writes are kept, and the journal is emptied."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._originals.clear()
+        if self.directory.exists():
+            for file in self.directory.iterdir():
+                if _JOURNAL_FILE.fullmatch(file.name):
+                    file.unlink()
+
+    def rollback(self) -> list[Path]:
+        """Restore every file of the unfinished batch to its original; return the files restored."""
+        entries = self.entries()
+        for entry in entries:
+            if entry.original is None:
+                entry.path.unlink(missing_ok=True)
+            else:
+                atomic_write_bytes(entry.path, entry.original.read_bytes(), durable=self.durable)
+        self.commit()
+        return [entry.path for entry in entries]
+
+    def resume(self) -> list[Path]:
+        """Finish the writes of the unfinished batch; return the files written."""
+        pending = [entry for entry in self.entries() if not entry.done]
+        for entry in pending:
+            atomic_write_bytes(entry.path, entry.target.read_bytes(), durable=self.durable)
+        self.commit()
+        return [entry.path for entry in pending]
+
+
+@dataclass
+class _QueuedWrite:
+    text: str
+    token: int
+    on_flush: list[Callable[[int, tuple[int, int] | None], None]]
+
+
+class WriteBehindWriter:
+    """Queue of file writes, coalesced per file and flushed in parallel."""
+
+    def __init__(
+        self,
+        *,
+        flush_window: float = DEFAULT_FLUSH_WINDOW,
+        max_workers: int = DEFAULT_FLUSH_WORKERS,
+        journal: Journal | None = None,
+        durable: bool = False,
+    ) -> None:
+        self.flush_window = flush_window
+        self.journal = journal
+        self.durable = durable
+        self._queued: dict[Path, _QueuedWrite] = {}
+        self._flushing: dict[Path, _QueuedWrite] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="auto-sdlc-writer")
+        self._closed = threading.Event()
+        self._errors: list[BaseException] = []
+        self.writes = 0
+        self.flushed = 0
+        self._ticker = threading.Thread(target=self._tick, name="auto-sdlc-writer-flush", daemon=True)
+        self._ticker.start()
+
+    def write(
+        self,
+        path: Path,
+        text: str,
+        *,
+        on_flush: Callable[[int, tuple[int, int] | None], None] | None = None,
+    ) -> int:
+        """Queue a file's new text, replacing text queued earlier; return a token identifying this write.
+
+        `on_flush` is called with the token of the write that was flushed and
+        the file's (mtime, size) once the text is on disk, or None if writing
+        it failed.
+        """
+        path = Path(path)
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("The writer is closed.")
+            previous = self._queued.get(path)
+            callbacks = previous.on_flush if previous is not None else []
+            if on_flush is not None:
+                callbacks.append(on_flush)
+            token = next(_tokens)
+            self._queued[path] = _QueuedWrite(text, token, callbacks)
+            self.writes += 1
+        return token
+
+    def pending(self, path: Path) -> tuple[str, int] | None:
+        """Text and token of a file's queued or in-flight write, if any."""
+        path = Path(path)
+        with self._lock:
+            queued = self._queued.get(path) or self._flushing.get(path)
+        return (queued.text, queued.token) if queued is not None else None
+
+    def _write_one(self, path: Path, queued: _QueuedWrite) -> None:
+        signature = None
+        try:
+            if self.journal is None:
+                atomic_write_text(path, queued.text, durable=self.durable)
+            else:
+                target = self.journal.record(path, queued.text)
+                atomic_write_text(path, queued.text, durable=self.durable)
+                self.journal.done(path, target)
+            file_stat = os.stat(path)
+            signature = file_stat.st_mtime_ns, file_stat.st_size
+        finally:
+            with self._lock:
+                if self._flushing.get(path) is queued:
+                    del self._flushing[path]
+            for callback in queued.on_flush:
+                callback(queued.token, signature)
+
+    def flush(self) -> None:
+        """Write every queued file now, in parallel; raise the first error of any flush so far."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._queued = self._queued, {}
+                self._flushing.update(batch)
+            futures = [self._pool.submit(self._write_one, path, queued) for path, queued in batch.items()]
+            for future in futures:
+                try:
+                    future.result()
+                except BaseException as ex:
+                    self._errors.append(ex)
+            self.flushed += len(batch)
+        if self._errors:
+            raise self._errors[0]
+
+    def _tick(self) -> None:
+        while not self._closed.wait(self.flush_window):
+            try:
+                self.flush()
+            except BaseException:
+                # Kept in `_errors`, and raised by the next explicit flush or close.
+                pass
+
+    def close(self) -> None:
+        """Flush what is queued and stop."""
+        self._closed.set()
+        self._ticker.join()
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown(wait=True)
+
+
+def active_writer() -> WriteBehindWriter | None:
+    """Writer of the enclosing `write_behind()` block, if any."""
+    return _active_writer.get()
+
+
+@contextmanager
+def write_behind(
+    *,
+    flush_window: float = DEFAULT_FLUSH_WINDOW,
+    max_workers: int = DEFAULT_FLUSH_WORKERS,
+    journal: str | Path | None = None,
+    durable: bool = False,
+) -> Iterator[WriteBehindWriter]:
+    """Queue the file writes made in the block, flushing them every `flush_window` seconds and at the end.
+
+    With a `journal` directory, the batch can be rolled back or resumed if
+    the process dies before the block ends. If the block raises, queued
+    writes are still flushed, and the journal is kept so the batch can be
+    rolled back.
+    """
+    batch_journal = Journal(journal, durable=durable) if journal is not None else None
+    if batch_journal is not None:
+        batch_journal.begin()
+    writer = WriteBehindWriter(flush_window=flush_window, max_workers=max_workers, journal=batch_journal, durable=durable)
+    context_token = _active_writer.set(writer)
+    try:
+        yield writer
+    except BaseException:
+        _active_writer.reset(context_token)
+        writer.close()
+        raise
+    _active_writer.reset(context_token)
+    writer.close()
+    if batch_journal is not None:
+        batch_journal.commit()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Inspect, roll back or resume an unfinished batch of writes."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.file_writer", description=main.__doc__)
+    parser.add_argument("command", choices=("status", "rollback", "resume"))
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL, help=f"Journal directory (default: {DEFAULT_JOURNAL}).")
+    args = parser.parse_args(argv)
+
+    journal = Journal(args.journal, durable=True)
+    if args.command == "status":
+        entries = journal.entries()
+        print(json.dumps([{"path": str(entry.path), "done": entry.done} for entry in entries], indent=2))
+    elif args.command == "rollback":
+        for path in journal.rollback():
+            print(f"Restored {path}")
+    elif args.command == "resume":
+        for path in journal.resume():
+            print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
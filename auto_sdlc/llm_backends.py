@@ -0,0 +1,186 @@
+"""Registry of LLM backends, constructed lazily on first use.
+
+Backends are selected by name, either with `use_backend` or the
+`AUTO_SDLC_LLM_BACKEND` environment variable. The model can be overridden with
+`AUTO_SDLC_LLM_MODEL`. Backend factories import their client libraries
+(langchain and friends) only when they are called, so importing this module
+is cheap.
+"""
+
+import os
+import platform
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from auto_sdlc.llm_scheduler import RequestScheduler
+
+BACKEND_ENV_VAR = "AUTO_SDLC_LLM_BACKEND"
+MODEL_ENV_VAR = "AUTO_SDLC_LLM_MODEL"
+CASSETTE_ENV_VAR = "AUTO_SDLC_LLM_CASSETTE"
+
+# Backend options that do not affect answers, left out of `backend_identity`.
+NON_IDENTITY_OPTIONS = frozenset({
+    "api_key",
+    "base_url",
+    "jitter",
+    "latency",
+    "max_retries",
+    "openai_api_key",
+    "request_timeout",
+    "seed",
+    "timeout",
+})
+
+BackendFactory = Callable[..., Any]
+
+_factories: dict[str, BackendFactory] = {}
+_default_models: dict[str, str | None] = {}
+_selected: tuple[str, dict[str, Any]] | None = None
+_llm: Any = None
+_lock = threading.Lock()
+_UNSET = object()
+_scheduler: Any = _UNSET
+
+
+def register_backend(
+    name: str,
+    *,
+    default_model: str | None = None,
+) -> Callable[[BackendFactory], BackendFactory]:
+    """Register a factory that builds the LLM client for a backend name."""
+    def decorator(factory: BackendFactory) -> BackendFactory:
+        _factories[name] = factory
+        _default_models[name] = default_model
+        return factory
+    return decorator
+
+
+def available_backends() -> list[str]:
+    """Names of all registered backends."""
+    return sorted(_factories)
+
+
+def default_backend_name() -> str:
+    """Backend from the environment, or the platform default."""
+    if os.environ.get(BACKEND_ENV_VAR):
+        return os.environ[BACKEND_ENV_VAR]
+    return "openai" if platform.machine() == "arm64" else "ollama"
+
+
+def use_backend(name: str, **options: Any) -> None:
+    """Select the backend (and its options) used by the next `get_llm` call."""
+    global _selected, _llm
+    if name not in _factories:
+        raise ValueError(f"Unknown LLM backend: {name}. Available: {', '.join(available_backends())}")
+    with _lock:
+        _selected = (name, options)
+        _llm = None
+
+
+def backend_name() -> str:
+    """Name of the selected backend."""
+    return _selected[0] if _selected is not None else default_backend_name()
+
+
+def backend_options() -> dict[str, Any]:
+    """Options passed to the selected backend's factory."""
+    return dict(_selected[1]) if _selected is not None else {}
+
+
+def backend_identity() -> dict[str, Any]:
+    """Everything about the selected backend that affects its answers.
+
+    Computed from configuration alone, without creating the client.
+    """
+    name = backend_name()
+    options = backend_options()
+    model = options.pop("model", None) or os.environ.get(MODEL_ENV_VAR) or _default_models.get(name)
+    params = {key: value for key, value in options.items() if key not in NON_IDENTITY_OPTIONS}
+    return {"backend": name, "model": model, "params": params}
+
+
+def create_llm(name: str, **options: Any) -> Any:
+    """Create a new client of a backend, regardless of the selected backend."""
+    if name not in _factories:
+        raise ValueError(f"Unknown LLM backend: {name}. Available: {', '.join(available_backends())}")
+    return _factories[name](**options)
+
+
+def get_scheduler() -> "RequestScheduler | None":
+    """Get the scheduler of outbound LLM requests, configured from the environment on first use."""
+    global _scheduler
+    if _scheduler is _UNSET:
+        with _lock:
+            if _scheduler is _UNSET:
+                from auto_sdlc.llm_scheduler import RequestScheduler
+
+                _scheduler = RequestScheduler.from_env()
+    return _scheduler
+
+
+def use_scheduler(scheduler: "RequestScheduler | None") -> None:
+    """Send the requests of the next `get_llm` client through a scheduler (None for no scheduling)."""
+    global _scheduler, _llm
+    with _lock:
+        _scheduler = scheduler
+        _llm = None
+
+
+def get_llm() -> Any:
+    """Get the LLM client of the selected backend, creating it on first use.
+
+    Requests made through the client go through the scheduler, if any.
+    """
+    global _llm
+    if _llm is None:
+        scheduler = get_scheduler()
+        with _lock:
+            if _llm is None:
+                llm = create_llm(backend_name(), **backend_options())
+                _llm = scheduler.wrap(llm) if scheduler is not None else llm
+    return _llm
+
+
+def reset() -> None:
+    """Forget the selected backend, its client and the scheduler."""
+    global _selected, _llm, _scheduler
+    with _lock:
+        _selected = None
+        _llm = None
+        _scheduler = _UNSET
+
+
+@register_backend("ollama", default_model="llama-2")
+def _ollama(model: str | None = None, **options: Any) -> Any:
+    from langchain_community.llms import Ollama
+
+    return Ollama(model=model or os.environ.get(MODEL_ENV_VAR) or "llama-2", **options)
+
+
+@register_backend("openai", default_model="gpt-3.5-turbo")
+def _openai(model: str | None = None, **options: Any) -> Any:
+    from langchain_openai import ChatOpenAI
+
+    model = model or os.environ.get(MODEL_ENV_VAR)
+    if model:
+        options["model"] = model
+    return ChatOpenAI(**options)
+
+
+@register_backend("replay")
+def _replay(cassette: str | None = None, **options: Any) -> Any:
+    from auto_sdlc.llm_replay import CassetteLLM
+
+    cassette = cassette or os.environ.get(CASSETTE_ENV_VAR)
+    if not cassette:
+        raise ValueError(f"The replay backend needs a cassette (cassette=... or ${CASSETTE_ENV_VAR}).")
+    return CassetteLLM(cassette, **options)
+
+
+@register_backend("deterministic")
+def _deterministic(**options: Any) -> Any:
+    from auto_sdlc.llm_replay import DeterministicLLM
+
+    return DeterministicLLM(**options)
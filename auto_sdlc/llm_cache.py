@@ -0,0 +1,287 @@
+"""Size-bounded, model-aware cache of LLM responses.
+
+Responses are keyed by a hash of the prompt together with everything that
+affects the answer: backend, model, prompt template version and sampling
+parameters. The cache is a diskcache directory with a size limit, an eviction
+policy and optional per-entry TTL.
+
+The cache can be inspected and maintained from the command line:
+
+    python -m auto_sdlc.llm_cache stats
+    python -m auto_sdlc.llm_cache prune
+    python -m auto_sdlc.llm_cache compact
+    python -m auto_sdlc.llm_cache clear
+
+and exported to, imported from and merged as portable snapshot files (see
+`auto_sdlc.cache_snapshot`):
+
+    python -m auto_sdlc.llm_cache export llm-cache.snapshot
+    python -m auto_sdlc.llm_cache import llm-cache.snapshot
+    python -m auto_sdlc.llm_cache merge merged.snapshot a.snapshot b.snapshot
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from diskcache import Cache, Lock
+from diskcache.core import ENOVAL
+
+from auto_sdlc import metrics
+
+DIRECTORY_ENV_VAR = "AUTO_SDLC_CACHE_DIR"
+SIZE_LIMIT_ENV_VAR = "AUTO_SDLC_CACHE_SIZE_LIMIT"
+EVICTION_POLICY_ENV_VAR = "AUTO_SDLC_CACHE_EVICTION_POLICY"
+TTL_ENV_VAR = "AUTO_SDLC_CACHE_TTL"
+
+DEFAULT_DIRECTORY = ".cache/llm"
+DEFAULT_SIZE_LIMIT = 2 ** 30  # 1 GiB
+DEFAULT_EVICTION_POLICY = "least-recently-used"
+EVICTION_POLICIES = (
+    "least-recently-used",
+    "least-frequently-used",
+    "least-recently-stored",
+)
+LOCK_KEY_PREFIX = "lock:"
+LOCKS_SUBDIRECTORY = "locks"
+
+_LOOKUPS = metrics.counter("auto_sdlc_llm_cache_lookups_total", "Response cache lookups, by result (hit or miss).")
+_BYTES = metrics.counter("auto_sdlc_llm_cache_bytes_total", "Bytes of responses read from and written to the cache.")
+
+
+def make_key(prompt: str, **identity: Any) -> str:
+    """Cache key of a prompt, for an identity (backend, model, template version, params)."""
+    payload = json.dumps({"identity": identity, "prompt": prompt}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def model_tag(identity: dict[str, Any]) -> str:
+    """Tag of the responses of a backend identity: `backend/model`."""
+    return f"{identity.get('backend')}/{identity.get('model')}"
+
+
+@dataclass
+class CacheStats:
+    """Counters of a response cache."""
+    hits: int = 0
+    misses: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    entries: int = 0
+    volume_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """Size-bounded cache of LLM responses, with TTL and hit/miss/byte counters.
+
+    Hit and miss counts are also recorded in the cache directory, so `stats`
+    includes lookups made by every process sharing it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_DIRECTORY,
+        *,
+        size_limit: int | None = DEFAULT_SIZE_LIMIT,
+        eviction_policy: str | None = DEFAULT_EVICTION_POLICY,
+        ttl: float | None = None,
+    ) -> None:
+        """Open a cache directory.
+
+        A `size_limit` or `eviction_policy` of None keeps the directory's
+        current setting.
+        """
+        settings: dict[str, Any] = {"statistics": True}
+        if size_limit is not None:
+            settings["size_limit"] = size_limit
+        if eviction_policy is not None:
+            if eviction_policy not in EVICTION_POLICIES:
+                raise ValueError(
+                    f"Unknown eviction policy: {eviction_policy}. Choose from {', '.join(EVICTION_POLICIES)}."
+                )
+            settings["eviction_policy"] = eviction_policy
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self._cache = Cache(str(self.directory), **settings)
+        # Locks live apart from responses, where they are never evicted or counted; opened on first use.
+        self._locks: Cache | None = None
+        self._counters_lock = threading.Lock()
+        self._bytes_read = 0
+        self._bytes_written = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Create a cache configured by the AUTO_SDLC_CACHE_* environment variables."""
+        ttl = os.environ.get(TTL_ENV_VAR)
+        return cls(
+            os.environ.get(DIRECTORY_ENV_VAR) or DEFAULT_DIRECTORY,
+            size_limit=int(os.environ.get(SIZE_LIMIT_ENV_VAR) or DEFAULT_SIZE_LIMIT),
+            eviction_policy=os.environ.get(EVICTION_POLICY_ENV_VAR) or DEFAULT_EVICTION_POLICY,
+            ttl=float(ttl) if ttl else None,
+        )
+
+    @property
+    def raw(self) -> Cache:
+        """The underlying diskcache `Cache`."""
+        return self._cache
+
+    def get(self, key: str, default: Any = ENOVAL) -> Any:
+        """Get a cached response, or `default` if it is missing or expired."""
+        value = self._cache.get(key, default=ENOVAL, retry=True)
+        if value is ENOVAL:
+            _LOOKUPS.inc(result="miss")
+            return default
+        _LOOKUPS.inc(result="hit")
+        if isinstance(value, str):
+            size = len(value.encode())
+            _BYTES.inc(size, direction="read")
+            with self._counters_lock:
+                self._bytes_read += size
+        return value
+
+    def set(self, key: str, value: Any, *, ttl: float | None = None, tag: str | None = None) -> None:
+        """Cache a response, expiring after `ttl` seconds (default: the cache's TTL).
+
+        The `tag` names the model that gave the response (see `model_tag`), so
+        snapshots can be filtered by model.
+        """
+        self._cache.set(key, value, expire=ttl if ttl is not None else self.ttl, tag=tag, retry=True)
+        if isinstance(value, str):
+            size = len(value.encode())
+            _BYTES.inc(size, direction="write")
+            with self._counters_lock:
+                self._bytes_written += size
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
+    def lock(self, key: str, *, expire: float | None = None) -> Lock:
+        """Lock on a key, shared by every process using the cache."""
+        if self._locks is None:
+            with self._counters_lock:
+                if self._locks is None:
+                    self._locks = Cache(str(self.directory / LOCKS_SUBDIRECTORY), eviction_policy="none")
+        return Lock(self._locks, LOCK_KEY_PREFIX + key, expire=expire)
+
+    def stats(self) -> CacheStats:
+        """Current counters of the cache."""
+        hits, misses = self._cache.stats()
+        return CacheStats(
+            hits=hits,
+            misses=misses,
+            bytes_read=self._bytes_read,
+            bytes_written=self._bytes_written,
+            entries=len(self._cache),
+            volume_bytes=self._cache.volume(),
+        )
+
+    def reset_stats(self) -> None:
+        """Reset hit, miss and byte counters."""
+        self._cache.stats(reset=True)
+        with self._counters_lock:
+            self._bytes_read = 0
+            self._bytes_written = 0
+
+    def prune(self) -> int:
+        """Remove expired entries and evict entries over the size limit; return the count removed."""
+        return self._cache.expire(retry=True) + self._cache.cull(retry=True)
+
+    def compact(self) -> int:
+        """Prune, drop orphaned files and reclaim free space on disk; return the count removed."""
+        removed = self.prune()
+        self._cache.check(fix=True, retry=True)
+        connection = sqlite3.connect(self.directory / "cache.db", timeout=60)
+        try:
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry; return the count removed."""
+        return self._cache.clear(retry=True)
+
+    def close(self) -> None:
+        """Close the cache."""
+        self._cache.close()
+        if self._locks is not None:
+            self._locks.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Inspect and maintain the LLM response cache."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.llm_cache", description=main.__doc__)
+    parser.add_argument(
+        "--directory",
+        default=os.environ.get(DIRECTORY_ENV_VAR) or DEFAULT_DIRECTORY,
+        help=f"Cache directory (default: ${DIRECTORY_ENV_VAR} or {DEFAULT_DIRECTORY}).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show entry count, size and hit/miss counters.")
+    commands.add_parser("prune", help="Remove expired entries and enforce the size limit.")
+    commands.add_parser("compact", help="Prune, then reclaim free space on disk.")
+    commands.add_parser("clear", help="Remove every entry.")
+    snapshot_filters = argparse.ArgumentParser(add_help=False)
+    snapshot_filters.add_argument(
+        "--model", action="append", dest="models", help="Only entries of this model, or backend/model (repeatable)."
+    )
+    snapshot_filters.add_argument("--max-age-days", type=float, help="Only entries stored at most this many days ago.")
+    export_parser = commands.add_parser("export", parents=[snapshot_filters], help="Write the cache to a snapshot file.")
+    export_parser.add_argument("snapshot")
+    import_parser = commands.add_parser("import", parents=[snapshot_filters], help="Add a snapshot's entries to the cache.")
+    import_parser.add_argument("snapshot")
+    import_parser.add_argument("--overwrite", action="store_true", help="Replace entries already in the cache.")
+    merge_parser = commands.add_parser("merge", parents=[snapshot_filters], help="Merge snapshots into one.")
+    merge_parser.add_argument("output")
+    merge_parser.add_argument("snapshots", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command in ("export", "import", "merge"):
+        from auto_sdlc import cache_snapshot
+
+        filters = {
+            "models": args.models,
+            "max_age": args.max_age_days * 86400 if args.max_age_days is not None else None,
+        }
+        if args.command == "merge":
+            print(json.dumps(asdict(cache_snapshot.merge_snapshots(args.snapshots, args.output, **filters)), indent=2))
+            return
+
+    cache = ResponseCache(args.directory, size_limit=None, eviction_policy=None)
+    try:
+        if args.command == "stats":
+            cache_stats = cache.stats()
+            stats = asdict(cache_stats)
+            stats["hit_rate"] = round(cache_stats.hit_rate, 4)
+            stats["size_limit"] = cache.raw.size_limit
+            stats["eviction_policy"] = cache.raw.eviction_policy
+            print(json.dumps(stats, indent=2))
+        elif args.command == "prune":
+            print(f"Removed {cache.prune()} entries.")
+        elif args.command == "compact":
+            print(f"Removed {cache.compact()} entries.")
+        elif args.command == "clear":
+            print(f"Removed {cache.clear()} entries.")
+        elif args.command == "export":
+            print(json.dumps(asdict(cache_snapshot.export_snapshot(cache, args.snapshot, **filters)), indent=2))
+        elif args.command == "import":
+            import_stats = cache_snapshot.import_snapshot(cache, args.snapshot, overwrite=args.overwrite, **filters)
+            print(json.dumps(asdict(import_stats), indent=2))
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Offline LLM backends: record/replay cassettes and a deterministic stand-in.
+
+`CassetteLLM` records the responses of a real backend to a cassette file, or
+replays them without any network access. `DeterministicLLM` answers every
+prompt with a response derived from the prompt alone. Both can add synthetic
+latency, which makes them useful for load testing concurrency and caching.
+
+Select them like any other backend:
+
+    llm_backends.use_backend("replay", cassette="tests/cassettes/review.jsonl")
+    llm_backends.use_backend("replay", cassette="...", mode="record", record_from="ollama")
+    llm_backends.use_backend("deterministic", latency=0.05)
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+
+from auto_sdlc import llm_backends
+
+REPLAY_MODES = ("replay", "record", "auto")
+
+
+class CassetteMissError(KeyError):
+    """Raised when replaying a prompt that is not in the cassette."""
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+def _response_text(response: Any) -> str:
+    return str(getattr(response, "content", response))
+
+
+def stream_chunks(text: str) -> list[str]:
+    """Split a response into word-sized streaming chunks."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + [words[-1]]
+
+
+class Cassette:
+    """Recorded prompt/response pairs, stored as JSON lines."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._responses: dict[str, str] = {}
+        if self.path.exists():
+            with self.path.open() as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[_prompt_key(entry["prompt"])] = entry["response"]
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def __contains__(self, prompt: str) -> bool:
+        return _prompt_key(prompt) in self._responses
+
+    def get(self, prompt: str) -> str:
+        """Recorded response to a prompt."""
+        try:
+            return self._responses[_prompt_key(prompt)]
+        except KeyError:
+            raise CassetteMissError(f"No recorded response for prompt: {prompt[:80]!r}") from None
+
+    def record(self, prompt: str, response: str) -> None:
+        """Record a response, appending it to the cassette file."""
+        with self._lock:
+            self._responses[_prompt_key(prompt)] = response
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as file:
+                file.write(json.dumps({"prompt": prompt, "response": response}) + "\n")
+
+
+class _SyntheticLatencyLLM:
+    """Base of offline LLMs: invoke/stream in sync and async flavours, with synthetic latency."""
+
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.0, seed: int | None = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        if self.jitter:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        return self.latency
+
+    def _respond(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def invoke(self, prompt: str) -> str:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._respond(prompt)
+
+    async def ainvoke(self, prompt: str) -> str:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        yield from stream_chunks(self._respond(prompt))
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        for chunk in stream_chunks(self._respond(prompt)):
+            yield chunk
+
+
+class DeterministicLLM(_SyntheticLatencyLLM):
+    """LLM stand-in whose response depends only on the prompt.
+
+    Answers `reply` to every prompt if it is given, otherwise a short text
+    derived from a hash of the prompt.
+    """
+
+    def __init__(self, *, reply: str | None = None, **latency_options: Any) -> None:
+        super().__init__(**latency_options)
+        self.reply = reply
+
+    def _respond(self, prompt: str) -> str:
+        if self.reply is not None:
+            return self.reply
+        return f"Response {_prompt_key(prompt)[:16]}"
+
+
+class CassetteLLM(_SyntheticLatencyLLM):
+    """LLM that replays recorded responses, or records those of another backend.
+
+    Modes:
+        replay: answer from the cassette only; unknown prompts raise `CassetteMissError`.
+        record: ask the `record_from` backend and record every response.
+        auto: replay known prompts, record unknown ones.
+    """
+
+    def __init__(
+        self,
+        cassette: str | Path,
+        *,
+        mode: str = "replay",
+        record_from: str | None = None,
+        record_options: dict[str, Any] | None = None,
+        **latency_options: Any,
+    ) -> None:
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode: {mode}. Choose from {', '.join(REPLAY_MODES)}.")
+        if mode != "replay" and record_from is None:
+            raise ValueError(f"Mode {mode!r} needs a backend to record from (record_from=...).")
+        super().__init__(**latency_options)
+        self.cassette = Cassette(cassette)
+        self.mode = mode
+        self._inner = llm_backends.create_llm(record_from, **(record_options or {})) if record_from else None
+
+    def _replays(self, prompt: str) -> bool:
+        return self.mode == "replay" or (self.mode == "auto" and prompt in self.cassette)
+
+    def _respond(self, prompt: str) -> str:
+        return self.cassette.get(prompt)
+
+    def invoke(self, prompt: str) -> str:
+        if self._replays(prompt):
+            return super().invoke(prompt)
+        response = _response_text(self._inner.invoke(prompt))
+        self.cassette.record(prompt, response)
+        return response
+
+    async def ainvoke(self, prompt: str) -> str:
+        if self._replays(prompt):
+            return await super().ainvoke(prompt)
+        response = _response_text(await self._inner.ainvoke(prompt))
+        self.cassette.record(prompt, response)
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        if self._replays(prompt):
+            yield from super().stream(prompt)
+            return
+        # Record the full response, even if the caller stops reading early.
+        response = _response_text(self._inner.invoke(prompt))
+        self.cassette.record(prompt, response)
+        yield from stream_chunks(response)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        if self._replays(prompt):
+            async for chunk in super().astream(prompt):
+                yield chunk
+            return
+        response = _response_text(await self._inner.ainvoke(prompt))
+        self.cassette.record(prompt, response)
+        for chunk in stream_chunks(response):
+            yield chunk
@@ -0,0 +1,485 @@
+"""Scheduler for outbound LLM requests: rate limits, adaptive concurrency, retries and priorities.
+
+Every request made through a `ScheduledLLM` waits for:
+
+- a free concurrency slot. The limit adapts AIMD-style: it grows by one
+  slot per window of fast, successful requests, and is cut in half on a
+  throttling signal (HTTP 429, timeouts) or when latency exceeds the target.
+- tokens from the request and token buckets, when rate limits are set.
+
+Waiting requests are served by priority lane first, then in arrival order.
+Interactive work can jump ahead of bulk scans:
+
+    with llm_scheduler.priority(Priority.BULK):
+        ...  # requests made here wait behind INTERACTIVE and NORMAL ones
+
+Throttled and timed-out requests are retried with jittered exponential
+backoff, honouring `Retry-After` when the backend sends one.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import aclosing, closing, contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+from auto_sdlc import metrics
+
+SCHEDULER_ENV_VAR = "AUTO_SDLC_LLM_SCHEDULER"
+REQUESTS_PER_SECOND_ENV_VAR = "AUTO_SDLC_LLM_REQUESTS_PER_SECOND"
+TOKENS_PER_MINUTE_ENV_VAR = "AUTO_SDLC_LLM_TOKENS_PER_MINUTE"
+MAX_CONCURRENCY_ENV_VAR = "AUTO_SDLC_LLM_MAX_CONCURRENCY"
+
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_TARGET_LATENCY = 30.0
+DEFAULT_RESPONSE_TOKENS = 256
+CHARS_PER_TOKEN = 4
+
+_THROTTLED = metrics.counter("auto_sdlc_llm_throttled_total", "LLM requests rejected as throttled or timed out.")
+_RETRIES = metrics.counter("auto_sdlc_llm_retries_total", "LLM requests retried.")
+_QUEUE_SECONDS = metrics.histogram("auto_sdlc_llm_queue_seconds", "Time LLM requests waited in the scheduler.")
+_CONCURRENCY_LIMIT = metrics.histogram(
+    "auto_sdlc_llm_concurrency_limit",
+    "Adaptive concurrency limit, sampled at every adjustment.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+class Priority(IntEnum):
+    """Priority lanes; lower values are served first."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar("llm_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def priority(lane: Priority) -> Iterator[None]:
+    """Make LLM requests in this block (thread or task) use a priority lane."""
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Priority lane of LLM requests made in the current context."""
+    return _priority.get()
+
+
+class TokenBucket:
+    """Token bucket refilling at `rate` tokens per second, holding at most `capacity`.
+
+    `reserve` always succeeds and returns how long to wait before using the
+    tokens; the bucket may go into debt, which later reservations wait out.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take `amount` tokens; return the seconds to wait until they are available."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take (or with a negative amount, give back) tokens after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit with additive increase and multiplicative decrease (AIMD)."""
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_CONCURRENCY,
+        *,
+        minimum: int = 1,
+        maximum: int = DEFAULT_MAX_CONCURRENCY,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        backoff: float = 0.5,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def on_success(self, latency: float) -> None:
+        """Grow the limit after a fast request, or shrink it after a slow one."""
+        if latency > self.target_latency:
+            self.on_throttle()
+            return
+        with self._lock:
+            # One more slot per `limit` successes: a window of requests.
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+        _CONCURRENCY_LIMIT.observe(self.limit)
+
+    def on_throttle(self) -> None:
+        """Shrink the limit, at most once per target latency (one decrease per congestion event)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < min(self.target_latency, 1.0):
+                return
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.backoff)
+        _CONCURRENCY_LIMIT.observe(self.limit)
+
+
+_RETRYABLE_MESSAGE = re.compile(r"\b(429|503)\b|rate.?limit|too many requests|timed? ?out|overloaded", re.IGNORECASE)
+
+
+def _status_code(ex: BaseException) -> int | None:
+    for candidate in (ex, getattr(ex, "response", None)):
+        status = getattr(candidate, "status_code", None) or getattr(candidate, "status", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_throttled(ex: BaseException) -> bool:
+    """Return True if an error means the backend is throttling or overloaded."""
+    status = _status_code(ex)
+    if status is not None:
+        return status in (429, 503)
+    if isinstance(ex, TimeoutError) or "Timeout" in type(ex).__name__ or "RateLimit" in type(ex).__name__:
+        return True
+    return bool(_RETRYABLE_MESSAGE.search(str(ex)))
+
+
+def retry_after(ex: BaseException) -> float | None:
+    """Seconds the backend asked to wait before retrying, if it said so."""
+    headers = getattr(getattr(ex, "response", None), "headers", None) or getattr(ex, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Retries of throttled requests, with full-jitter exponential backoff."""
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, ex: BaseException | None = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        requested = retry_after(ex) if ex is not None else None
+        if requested is not None:
+            return min(requested, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class _Waiter:
+    __slots__ = ("grant",)
+
+    def __init__(self, grant: Any) -> None:
+        self.grant = grant
+
+
+class RequestScheduler:
+    """Admission control for LLM requests, shared by every thread and event loop."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: float | None = None,
+        tokens_per_minute: float | None = None,
+        concurrency: AdaptiveConcurrencyLimit | None = None,
+        retry: RetryPolicy | None = None,
+        response_tokens: int = DEFAULT_RESPONSE_TOKENS,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_second) if requests_per_second else None
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = concurrency or AdaptiveConcurrencyLimit()
+        self.retry = retry or RetryPolicy()
+        self.response_tokens = response_tokens
+        self._lock = threading.Lock()
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestScheduler | None":
+        """Create a scheduler configured by the AUTO_SDLC_LLM_* environment variables.
+
+        Returns None if `AUTO_SDLC_LLM_SCHEDULER=0`.
+        """
+        if os.environ.get(SCHEDULER_ENV_VAR, "1") == "0":
+            return None
+        requests_per_second = os.environ.get(REQUESTS_PER_SECOND_ENV_VAR)
+        tokens_per_minute = os.environ.get(TOKENS_PER_MINUTE_ENV_VAR)
+        max_concurrency = int(os.environ.get(MAX_CONCURRENCY_ENV_VAR) or DEFAULT_MAX_CONCURRENCY)
+        return cls(
+            requests_per_second=float(requests_per_second) if requests_per_second else None,
+            tokens_per_minute=float(tokens_per_minute) if tokens_per_minute else None,
+            concurrency=AdaptiveConcurrencyLimit(
+                min(DEFAULT_INITIAL_CONCURRENCY, max_concurrency), maximum=max_concurrency
+            ),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests holding a slot."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._queue)
+
+    def estimate_tokens(self, prompt: str) -> int:
+        """Tokens reserved for a request before its response size is known."""
+        return len(prompt) // CHARS_PER_TOKEN + self.response_tokens
+
+    def _enqueue(self, grant: Any) -> bool:
+        """Take a slot now (True), or queue `grant` to be called when one frees up (False)."""
+        with self._lock:
+            if not self._queue and self._in_flight < self.concurrency.limit:
+                self._in_flight += 1
+                return True
+            heapq.heappush(self._queue, (current_priority(), next(self._sequence), _Waiter(grant)))
+        return False
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            granted = []
+            while self._queue and self._in_flight < self.concurrency.limit:
+                granted.append(heapq.heappop(self._queue)[2])
+                self._in_flight += 1
+        for waiter in granted:
+            waiter.grant()
+
+    def _rate_delay(self, prompt: str) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve())
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(self.estimate_tokens(prompt)))
+        return delay
+
+    def _charge_response(self, prompt: str, response: str) -> None:
+        if self.tokens is not None:
+            self.tokens.adjust(len(response) // CHARS_PER_TOKEN - self.response_tokens)
+
+    def _acquire(self, prompt: str) -> None:
+        started = time.perf_counter()
+        event = threading.Event()
+        if not self._enqueue(event.set):
+            event.wait()
+        delay = self._rate_delay(prompt)
+        if delay:
+            time.sleep(delay)
+        _QUEUE_SECONDS.observe(time.perf_counter() - started, priority=current_priority().name.lower())
+
+    async def _aacquire(self, prompt: str) -> None:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        if not self._enqueue(grant):
+            try:
+                await future
+            except asyncio.CancelledError:
+                # The slot may have been granted just as we were cancelled.
+                if future.done() and not future.cancelled():
+                    self._release()
+                else:
+                    self._cancel(grant)
+                raise
+        delay = self._rate_delay(prompt)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # The slot is ours until `arun` takes over; hand it back.
+                self._release()
+                raise
+        _QUEUE_SECONDS.observe(time.perf_counter() - started, priority=current_priority().name.lower())
+
+    def _cancel(self, grant: Any) -> None:
+        with self._lock:
+            for index, (_, _, waiter) in enumerate(self._queue):
+                if waiter.grant is grant:
+                    self._queue.pop(index)
+                    heapq.heapify(self._queue)
+                    return
+        # Granted while being cancelled: hand the slot back.
+        self._release()
+
+    def _record(self, started: float, ex: BaseException | None) -> bool:
+        """Feed the outcome of an attempt to the concurrency limit; return True to retry."""
+        if ex is None:
+            self.concurrency.on_success(time.perf_counter() - started)
+            return False
+        if is_throttled(ex):
+            _THROTTLED.inc()
+            self.concurrency.on_throttle()
+            return True
+        return False
+
+    def run(self, prompt: str, call: Any) -> Any:
+        """Call `call()` under the scheduler's limits, retrying throttled attempts."""
+        for attempt in itertools.count(1):
+            self._acquire(prompt)
+            started = time.perf_counter()
+            try:
+                result = call()
+            except Exception as ex:
+                retry = self._record(started, ex) and attempt < self.retry.max_attempts
+                if not retry:
+                    raise
+                delay = self.retry.delay(attempt, ex)
+            else:
+                self._record(started, None)
+                self._charge_response(prompt, str(getattr(result, "content", result)))
+                return result
+            finally:
+                self._release()
+            _RETRIES.inc()
+            time.sleep(delay)
+
+    async def arun(self, prompt: str, call: Any) -> Any:
+        """Await `call()` under the scheduler's limits, retrying throttled attempts."""
+        for attempt in itertools.count(1):
+            await self._aacquire(prompt)
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as ex:
+                retry = self._record(started, ex) and attempt < self.retry.max_attempts
+                if not retry:
+                    raise
+                delay = self.retry.delay(attempt, ex)
+            else:
+                self._record(started, None)
+                self._charge_response(prompt, str(getattr(result, "content", result)))
+                return result
+            finally:
+                self._release()
+            _RETRIES.inc()
+            await asyncio.sleep(delay)
+
+    def wrap(self, llm: Any) -> "ScheduledLLM":
+        """Wrap an LLM client so that its requests go through this scheduler."""
+        return ScheduledLLM(llm, self)
+
+
+class ScheduledLLM:
+    """LLM client whose requests go through a `RequestScheduler`.
+
+    Streams hold their slot until they are closed; they are retried only if
+    they fail before the first chunk. A stream closed early closes the
+    backend's stream before giving up its slot, and counts as a successful
+    request with the partial response.
+    """
+
+    def __init__(self, llm: Any, scheduler: RequestScheduler) -> None:
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def invoke(self, prompt: str) -> Any:
+        return self.scheduler.run(prompt, lambda: self.llm.invoke(prompt))
+
+    async def ainvoke(self, prompt: str) -> Any:
+        return await self.scheduler.arun(prompt, lambda: self.llm.ainvoke(prompt))
+
+    def stream(self, prompt: str) -> Iterator[Any]:
+        scheduler = self.scheduler
+        for attempt in itertools.count(1):
+            scheduler._acquire(prompt)
+            started = time.perf_counter()
+            received = ""
+            try:
+                with closing(iter(self.llm.stream(prompt))) as chunks:
+                    for chunk in chunks:
+                        received += str(getattr(chunk, "content", chunk))
+                        yield chunk
+            except GeneratorExit:
+                scheduler._record(started, None)
+                scheduler._charge_response(prompt, received)
+                raise
+            except Exception as ex:
+                retry = not received and scheduler._record(started, ex) and attempt < scheduler.retry.max_attempts
+                if not retry:
+                    raise
+                delay = scheduler.retry.delay(attempt, ex)
+            else:
+                scheduler._record(started, None)
+                scheduler._charge_response(prompt, received)
+                return
+            finally:
+                scheduler._release()
+            _RETRIES.inc()
+            time.sleep(delay)
+
+    async def astream(self, prompt: str) -> AsyncIterator[Any]:
+        scheduler = self.scheduler
+        for attempt in itertools.count(1):
+            await scheduler._aacquire(prompt)
+            started = time.perf_counter()
+            received = ""
+            try:
+                async with aclosing(self.llm.astream(prompt)) as chunks:
+                    async for chunk in chunks:
+                        received += str(getattr(chunk, "content", chunk))
+                        yield chunk
+            except GeneratorExit:
+                scheduler._record(started, None)
+                scheduler._charge_response(prompt, received)
+                raise
+            except Exception as ex:
+                retry = not received and scheduler._record(started, ex) and attempt < scheduler.retry.max_attempts
+                if not retry:
+                    raise
+                delay = scheduler.retry.delay(attempt, ex)
+            else:
+                scheduler._record(started, None)
+                scheduler._charge_response(prompt, received)
+                return
+            finally:
+                scheduler._release()
+            _RETRIES.inc()
+            await asyncio.sleep(delay)
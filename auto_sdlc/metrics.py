@@ -0,0 +1,309 @@
+"""In-process metrics for LLM calls, the response cache, file I/O and reviews.
+
+Counters and histograms are kept in a `MetricsRegistry`; recording a value
+takes a lock and a dict update, cheap enough to leave on. Export the default
+registry with `to_json` or `to_prometheus`.
+
+Set `AUTO_SDLC_METRICS=0` to turn recording off, and `AUTO_SDLC_PROFILE_DIR`
+to dump a cProfile of every `profile_stage` block into that directory, for
+example:
+
+    AUTO_SDLC_PROFILE_DIR=.cache/profiles python -m ...
+    python -m pstats .cache/profiles/review.generate-1234-1.prof
+
+Metrics are per process: work done in a process pool is not counted in the
+parent's registry.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+from typing import Any
+
+METRICS_ENV_VAR = "AUTO_SDLC_METRICS"
+PROFILE_DIR_ENV_VAR = "AUTO_SDLC_PROFILE_DIR"
+
+# Upper bounds, in seconds, of latency histogram buckets.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, registry: "MetricsRegistry") -> None:
+        self.name = name
+        self.help = help
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Add `amount` to the counter."""
+        if not self._registry.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current value of the counter."""
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def to_json(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in self._values.items()]
+
+    def to_prometheus(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class _HistogramSeries:
+    __slots__ = ("bucket_counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: int) -> None:
+        self.bucket_counts = [0] * (buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets, with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        registry: "MetricsRegistry",
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._series: dict[LabelKey, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record a value."""
+        if not self._registry.enabled:
+            return
+        key = _label_key(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.bucket_counts[bucket] += 1
+            series.count += 1
+            series.sum += value
+            series.min = min(series.min, value)
+            series.max = max(series.max, value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of a block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Number of values observed."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series.count if series else 0
+
+    def sum(self, **labels: Any) -> float:
+        """Sum of values observed."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series.sum if series else 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def to_json(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "labels": dict(key),
+                    "count": series.count,
+                    "sum": series.sum,
+                    "mean": series.sum / series.count,
+                    "min": series.min,
+                    "max": series.max,
+                    "buckets": dict(zip([*map(str, self.buckets), "+Inf"], series.bucket_counts)),
+                }
+                for key, series in self._series.items()
+            ]
+
+    def to_prometheus(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], series.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', bound),))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters and histograms, exportable as JSON or Prometheus text."""
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def _get_or_create(self, cls: type, name: str, help: str, **options: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, self, **options)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", *, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def reset(self) -> None:
+        """Reset every metric to zero, keeping the metrics registered."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_json(self) -> dict[str, Any]:
+        """Summary of every metric, as JSON-serializable data."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {
+            name: {"type": metric.kind, "help": metric.help, "values": metric.to_json()}
+            for name, metric in metrics
+        }
+
+    def to_prometheus(self) -> str:
+        """Every metric, in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.to_prometheus())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get(METRICS_ENV_VAR, "1") != "0")
+
+
+def counter(name: str, help: str = "") -> Counter:
+    """Get or create a counter in the default registry."""
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name: str, help: str = "", *, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Get or create a histogram in the default registry."""
+    return REGISTRY.histogram(name, help, buckets=buckets)
+
+
+def to_json() -> dict[str, Any]:
+    """Summary of the default registry, as JSON-serializable data."""
+    return REGISTRY.to_json()
+
+
+def to_prometheus() -> str:
+    """The default registry, in the Prometheus text exposition format."""
+    return REGISTRY.to_prometheus()
+
+
+def write_metrics(path: str | Path) -> None:
+    """Write the default registry to a file: Prometheus text for `.prom` files, JSON otherwise."""
+    path = Path(path)
+    if path.suffix == ".prom":
+        path.write_text(to_prometheus())
+    else:
+        path.write_text(json.dumps(to_json(), indent=2))
+
+
+_profiling = threading.local()
+_profile_numbers = count(1)
+
+
+@contextmanager
+def profile_stage(stage: str) -> Iterator[None]:
+    """Profile a block with cProfile if `AUTO_SDLC_PROFILE_DIR` is set.
+
+    The profile is dumped to `<dir>/<stage>-<pid>-<n>.prof`. Blocks nested in
+    a profiled block are included in the outer profile.
+    """
+    directory = os.environ.get(PROFILE_DIR_ENV_VAR)
+    if not directory or getattr(_profiling, "active", False):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    _profiling.active = True
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler (for example one started outside this module) is active.
+        _profiling.active = False
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _profiling.active = False
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(Path(directory) / f"{stage}-{os.getpid()}-{next(_profile_numbers)}.prof")
@@ -0,0 +1,296 @@
+"""Local HTTP stand-in for an Ollama server.
+
+Serves the parts of the Ollama API used by the langchain Ollama client
+(`/api/generate`, `/api/chat` and `/api/tags`), answering from any
+offline LLM, such as a replayed cassette or `DeterministicLLM`. Point the
+`ollama` backend at it to load-test the review pipeline without a model:
+
+    python -m auto_sdlc.ollama_server --port 11435 --latency 0.05
+    AUTO_SDLC_LLM_BACKEND=ollama ...  # with use_backend("ollama", base_url="http://127.0.0.1:11435")
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from auto_sdlc.llm_replay import CassetteLLM, DeterministicLLM, stream_chunks
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 11435
+DEFAULT_MODEL = "llama-2"
+
+
+class _OllamaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_OllamaHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _start_stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, body: dict[str, Any] | None) -> None:
+        payload = (json.dumps(body) + "\n").encode() if body is not None else b""
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+
+    def _read_json(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.model, "model": self.server.model}]})
+        elif self.path == "/":
+            payload = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path not in ("/api/generate", "/api/chat"):
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        request = self._read_json()
+        chat = self.path == "/api/chat"
+        if chat:
+            prompt = "\n".join(message.get("content", "") for message in request.get("messages", []))
+        else:
+            prompt = request.get("prompt", "")
+
+        if not self.server.admit():
+            self._send_json(429, {"error": "Too many requests"}, {"Retry-After": "1"})
+            return
+        try:
+            self._answer(request, chat, prompt)
+        finally:
+            self.server.finish()
+
+    def _answer(self, request: dict[str, Any], chat: bool, prompt: str) -> None:
+        started = time.perf_counter_ns()
+        try:
+            reply = self.server.llm.invoke(prompt)
+        except KeyError as ex:
+            self._send_json(404, {"error": str(ex)})
+            return
+        self.server.count_request()
+        response = str(getattr(reply, "content", reply))
+
+        model = request.get("model") or self.server.model
+
+        def message(text: str, done: bool) -> dict[str, Any]:
+            body: dict[str, Any] = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+            }
+            if chat:
+                body["message"] = {"role": "assistant", "content": text}
+            else:
+                body["response"] = text
+            if done:
+                body["total_duration"] = time.perf_counter_ns() - started
+                body["prompt_eval_count"] = len(prompt.split())
+                body["eval_count"] = len(response.split())
+            return body
+
+        if not request.get("stream", True):
+            self._send_json(200, message(response, done=True))
+            return
+
+        self._start_stream()
+        for chunk in stream_chunks(response):
+            self._write_chunk(message(chunk, done=False))
+        self._write_chunk(message("", done=True))
+        self._write_chunk(None)
+
+
+class _OllamaHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        llm: Any,
+        model: str,
+        verbose: bool,
+        max_concurrency: int | None = None,
+        requests_per_second: float | None = None,
+    ) -> None:
+        super().__init__(address, _OllamaRequestHandler)
+        self.llm = llm
+        self.model = model
+        self.verbose = verbose
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.request_count = 0
+        self.throttled_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._admitted: deque[float] = deque()
+        self._count_lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.request_count += 1
+
+    def admit(self) -> bool:
+        """Admit a request, unless it would exceed the concurrency or rate limit."""
+        with self._count_lock:
+            now = time.monotonic()
+            while self._admitted and now - self._admitted[0] >= 1.0:
+                self._admitted.popleft()
+            if (self.max_concurrency is not None and self.in_flight >= self.max_concurrency) or (
+                self.requests_per_second is not None and len(self._admitted) >= self.requests_per_second
+            ):
+                self.throttled_count += 1
+                return False
+            self._admitted.append(now)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def finish(self) -> None:
+        with self._count_lock:
+            self.in_flight -= 1
+
+
+class OllamaStandInServer:
+    """Stand-in Ollama server, running in a background thread.
+
+    Use as a context manager, or call `start` and `stop`. Port 0 picks a free
+    port; read the actual address from `url`. To simulate a throttling
+    server, set `max_concurrency` or `requests_per_second`: requests over
+    either limit get HTTP 429 with `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        llm: Any = None,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        model: str = DEFAULT_MODEL,
+        verbose: bool = False,
+        max_concurrency: int | None = None,
+        requests_per_second: float | None = None,
+    ) -> None:
+        self._server = _OllamaHTTPServer(
+            (host, port),
+            llm or DeterministicLLM(),
+            model,
+            verbose,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+        )
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, to pass as `base_url` to the Ollama client."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        """Number of generate/chat requests answered."""
+        return self._server.request_count
+
+    @property
+    def throttled_count(self) -> int:
+        """Number of requests rejected with HTTP 429."""
+        return self._server.throttled_count
+
+    @property
+    def max_in_flight(self) -> int:
+        """Highest number of requests answered at once."""
+        return self._server.max_in_flight
+
+    def start(self) -> "OllamaStandInServer":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ollama-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "OllamaStandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a stand-in Ollama server."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.ollama_server", description=main.__doc__)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--cassette", help="Replay responses from this cassette instead of deterministic ones.")
+    parser.add_argument("--reply", help="Answer every prompt with this text.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Synthetic latency per request, in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random latency jitter, in seconds.")
+    parser.add_argument("--max-concurrency", type=int, help="Answer HTTP 429 beyond this many requests at once.")
+    parser.add_argument("--requests-per-second", type=float, help="Answer HTTP 429 beyond this request rate.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    latency = {"latency": args.latency, "jitter": args.jitter}
+    if args.cassette:
+        llm = CassetteLLM(args.cassette, **latency)
+    else:
+        llm = DeterministicLLM(reply=args.reply, **latency)
+    server = OllamaStandInServer(
+        llm,
+        host=args.host,
+        port=args.port,
+        model=args.model,
+        verbose=args.verbose,
+        max_concurrency=args.max_concurrency,
+        requests_per_second=args.requests_per_second,
+    )
+    print(f"Stand-in Ollama server listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Dry run: one merged patch per file, and one for the whole project.
+
+Instead of a diff per suggestion, all the suggestions for a file are staged
+in one in-memory `EditSession` and diffed against the file's text once. Each
+file is read once, by the analysis, and its text is passed on to generation
+and patching; the working tree is never written. Files are patched in a
+process pool, and the patches stream out in order as they are ready, so
+the combined project patch can be written to stdout or a `.patch` file while
+the rest of the project is still being patched:
+
+    python -m auto_sdlc.patch . -o review.patch
+    git apply review.patch
+"""
+
+import argparse
+import difflib
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from auto_sdlc.edit_session import EditSession
+from auto_sdlc.file_ops import seed_document
+from auto_sdlc.project_reviewer import DEFAULT_LLM_WORKERS, FileReview, _InlineExecutor, review_project
+from auto_sdlc.reviewer import DIFF_CONTEXT_LINES, SuggestionBase
+
+_NO_NEWLINE = "\\ No newline at end of file\n"
+
+
+@dataclass
+class FilePatch:
+    """Merged patch of every suggestion for one file; empty if nothing changes."""
+    file: Path
+    patch: str = ""
+    error: str | None = None
+
+
+def _patch_path(file_path: Path, root: Path | None) -> str:
+    if root is not None:
+        try:
+            return Path(os.path.relpath(file_path, root)).as_posix()
+        except ValueError:
+            pass
+    return Path(file_path).as_posix().lstrip("/")
+
+
+def unified_patch(before: str, after: str, path: str, *, context_lines: int = DIFF_CONTEXT_LINES) -> str:
+    """Unified diff of two texts of a file, with `a/` and `b/` headers that `git apply` and `patch -p1` accept."""
+    lines = difflib.unified_diff(
+        before.splitlines(keepends=True),
+        after.splitlines(keepends=True),
+        f"a/{path}",
+        f"b/{path}",
+        n=context_lines,
+    )
+    return "".join(line if line.endswith("\n") else line + "\n" + _NO_NEWLINE for line in lines)
+
+
+def build_file_patch(
+    file_path: Path,
+    suggestions: Iterable[SuggestionBase],
+    *,
+    root: Path | None = None,
+    context_lines: int = DIFF_CONTEXT_LINES,
+) -> FilePatch:
+    """Stage every suggestion for a file in memory and diff the result against the file, without writing it."""
+    file_path = Path(file_path)
+    try:
+        session = EditSession(file_path)
+        for suggestion in suggestions:
+            suggestion.stage(session)
+        patch = unified_patch(
+            session.original_text, session.render(), _patch_path(file_path, root), context_lines=context_lines
+        )
+    except Exception as ex:
+        return FilePatch(file_path, error=f"{type(ex).__name__}: {ex}")
+    return FilePatch(file_path, patch)
+
+
+def _build_file_patch(review: FileReview, root: Path | None, context_lines: int) -> FilePatch:
+    """Build a file's patch from the text it was reviewed at, if any (local work, runs in a worker process)."""
+    if review.text is not None and review.text_signature is not None:
+        seed_document(review.file, review.text, review.text_signature)
+    return build_file_patch(review.file, review.suggestions, root=root, context_lines=context_lines)
+
+
+def iter_file_patches(
+    reviews: Iterable[FileReview],
+    *,
+    root: Path | None = None,
+    workers: int | None = None,
+    context_lines: int = DIFF_CONTEXT_LINES,
+) -> Iterator[FilePatch]:
+    """Patch the files of reviews in a pool of `workers` processes, yielding patches in review order.
+
+    Reviews are consumed lazily, and at most a few per worker are in flight.
+    Reviews without suggestions are skipped, and failed reviews are passed
+    through as patches with an error. A review's text, if it has one, is
+    patched instead of reading the file again. `workers=0` patches in-process.
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    pool: Executor = _InlineExecutor() if workers == 0 else ProcessPoolExecutor(workers)
+    in_flight: deque[Future] = deque()
+    limit = 2 * max(workers, 1)
+    try:
+        for review in reviews:
+            if review.error is not None:
+                done: Future = Future()
+                done.set_result(FilePatch(review.file, error=review.error))
+                in_flight.append(done)
+            elif review.suggestions:
+                in_flight.append(pool.submit(_build_file_patch, review, root, context_lines))
+            while len(in_flight) > limit or (in_flight and in_flight[0].done()):
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def write_patch(patches: Iterable[FilePatch], output: IO[str], *, errors: IO[str] | None = None) -> int:
+    """Write the patches as one project patch, flushing after each file; return the number of files patched.
+
+    Errors are reported to `errors` (default: stderr), and their files left out.
+    """
+    errors = errors if errors is not None else sys.stderr
+    patched = 0
+    for file_patch in patches:
+        if file_patch.error is not None:
+            errors.write(f"{file_patch.file}: {file_patch.error}\n")
+        elif file_patch.patch:
+            output.write(file_patch.patch)
+            output.flush()
+            patched += 1
+    return patched
+
+
+def project_patch(reviews: Iterable[FileReview], **options) -> str:
+    """One patch of every file of reviews; see `iter_file_patches` for the options. Failed files are left out."""
+    return "".join(file_patch.patch for file_patch in iter_file_patches(reviews, **options) if file_patch.error is None)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Review a project and write the suggested changes as one patch, without touching the files."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.patch", description=main.__doc__)
+    parser.add_argument("root", nargs="?", default=".", help="Project to review (default: the current directory).")
+    parser.add_argument("--output", "-o", help="Write the patch to this file instead of stdout.")
+    parser.add_argument("--diff-range", help="Only review files changed in this git diff range, such as main...HEAD.")
+    parser.add_argument("--process-workers", type=int, help="Processes for analysis and patches (default: CPUs).")
+    parser.add_argument("--llm-workers", type=int, default=DEFAULT_LLM_WORKERS, help="Files with LLM requests in flight.")
+    parser.add_argument("--context", type=int, default=DIFF_CONTEXT_LINES, help="Lines of context around changes.")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root)
+    reviews = review_project(
+        root,
+        process_workers=args.process_workers,
+        llm_workers=args.llm_workers,
+        diff_range=args.diff_range,
+        diffs=False,
+        texts=True,
+    )
+    patches = iter_file_patches(reviews, root=root, workers=args.process_workers, context_lines=args.context)
+    if args.output:
+        with open(args.output, "w") as output:
+            write_patch(patches, output)
+    else:
+        write_patch(patches, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
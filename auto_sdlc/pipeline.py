@@ -0,0 +1,236 @@
+"""Streaming review pipeline: scan, detect, generate, diff and apply, with backpressure.
+
+Each stage runs its own pool of workers and hands files to the next stage
+through a bounded queue:
+
+    scan ─▶ detect ─▶ generate ─▶ diff ─▶ apply ─▶ results
+    (thread) (processes) (async LLM) (processes) (thread)
+
+A stage that gets ahead blocks on the full queue in front of it, so the
+number of files in flight, and with it memory, is bounded by the queue sizes
+however large the project is. Reviews stream out in completion order as soon
+as each file is through, so the first results arrive while the rest of the
+project is still being scanned.
+
+    python -m auto_sdlc.pipeline . > reviews.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+from collections.abc import AsyncGenerator, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable
+
+from auto_sdlc.llm_scheduler import Priority, priority
+from auto_sdlc.project_reviewer import (
+    DEFAULT_LLM_WORKERS,
+    FileReview,
+    _analyze_file,
+    _build_diffs,
+    _InlineExecutor,
+    _needs_generation,
+    iter_python_files,
+)
+from auto_sdlc.reviewer import MissingDocstringSuggestion, apply_suggestions
+
+DEFAULT_QUEUE_SIZE = 64
+
+# Marks the end of a stage's input.
+_DONE: Any = object()
+
+
+async def _run_stage(
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    workers: int,
+    process: Callable[[Any], Awaitable[FileReview]],
+) -> None:
+    """Process items from `inbox` into `outbox` with `workers` concurrent workers."""
+
+    async def worker() -> None:
+        while (item := await inbox.get()) is not _DONE:
+            await outbox.put(await process(item))
+        # Let the other workers see the end of the input too.
+        await inbox.put(_DONE)
+
+    await asyncio.gather(*(worker() for _ in range(max(workers, 1))))
+    await outbox.put(_DONE)
+
+
+def _fail(review: FileReview, ex: Exception) -> FileReview:
+    review.error = f"{type(ex).__name__}: {ex}"
+    return review
+
+
+async def astream_reviews(
+    root: Path,
+    *,
+    files: Iterable[Path] | None = None,
+    process_workers: int | None = None,
+    llm_workers: int = DEFAULT_LLM_WORKERS,
+    generate: bool = True,
+    apply: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    llm_priority: Priority = Priority.BULK,
+) -> AsyncGenerator[FileReview, None]:
+    """Review every Python file under `root`, yielding each `FileReview` as soon as it is done.
+
+    Args:
+        root: Directory to review.
+        files: Files to review, instead of every Python file under `root`.
+            Consumed lazily.
+        process_workers: Size of the process pool used for detection and
+            diffs. Defaults to the number of CPUs; 0 runs them in-process.
+        llm_workers: Maximum number of files with LLM requests in flight.
+        generate: Whether to generate suggested text with the LLM.
+        apply: Whether to apply the suggestions of each file once it is
+            diffed (only with `generate`).
+        queue_size: Capacity of the queue in front of each stage.
+        llm_priority: Priority lane of the LLM requests.
+    """
+    loop = asyncio.get_running_loop()
+    cpu_workers = process_workers if process_workers is not None else os.cpu_count() or 1
+    processes: Executor = _InlineExecutor() if process_workers == 0 else ProcessPoolExecutor(cpu_workers)
+    paths: Iterator[Path] = iter(files) if files is not None else iter_python_files(root)
+    scanned: asyncio.Queue = asyncio.Queue(queue_size)
+    detected: asyncio.Queue = asyncio.Queue(queue_size)
+    generated: asyncio.Queue = asyncio.Queue(queue_size)
+    diffed: asyncio.Queue = asyncio.Queue(queue_size)
+    results: asyncio.Queue = asyncio.Queue(queue_size)
+
+    async def scan() -> None:
+        try:
+            while (file_path := await loop.run_in_executor(None, next, paths, None)) is not None:
+                await scanned.put(file_path)
+        finally:
+            # On failure too, so the stages drain; the error is raised once they are done.
+            await scanned.put(_DONE)
+
+    async def detect(file_path: Path) -> FileReview:
+        review = FileReview(file=file_path)
+        try:
+            review.suggestions = (await loop.run_in_executor(processes, _analyze_file, file_path)).suggestions
+        except Exception as ex:
+            _fail(review, ex)
+        return review
+
+    async def generate_text(review: FileReview) -> FileReview:
+        if not generate or review.error is not None:
+            return review
+        try:
+            with priority(llm_priority):
+                for suggestion in review.suggestions:
+                    if isinstance(suggestion, MissingDocstringSuggestion) and _needs_generation(suggestion):
+                        await suggestion.agenerate_text()
+        except Exception as ex:
+            _fail(review, ex)
+        return review
+
+    async def diff(review: FileReview) -> FileReview:
+        if not review.suggestions or review.error is not None:
+            return review
+        if not generate and any(_needs_generation(suggestion) for suggestion in review.suggestions):
+            return review
+        try:
+            review.diffs = await loop.run_in_executor(processes, _build_diffs, review.suggestions)
+        except Exception as ex:
+            _fail(review, ex)
+        return review
+
+    async def apply_edits(review: FileReview) -> FileReview:
+        if not (apply and generate and review.suggestions) or review.error is not None:
+            return review
+        try:
+            await asyncio.to_thread(apply_suggestions, review.suggestions)
+            review.applied = True
+        except Exception as ex:
+            _fail(review, ex)
+        return review
+
+    tasks = [
+        asyncio.ensure_future(scan()),
+        asyncio.ensure_future(_run_stage(scanned, detected, cpu_workers, detect)),
+        asyncio.ensure_future(_run_stage(detected, generated, llm_workers, generate_text)),
+        asyncio.ensure_future(_run_stage(generated, diffed, cpu_workers, diff)),
+        # Applying is cheap file I/O; one worker keeps the writes sequential.
+        asyncio.ensure_future(_run_stage(diffed, results, 1, apply_edits)),
+    ]
+    try:
+        while (review := await results.get()) is not _DONE:
+            yield review
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        processes.shutdown(wait=True, cancel_futures=True)
+
+
+def stream_reviews(root: Path, **options: Any) -> Iterator[FileReview]:
+    """Review every Python file under `root`, yielding each `FileReview` as soon as it is done.
+
+    Runs `astream_reviews` on an event loop in a background thread; see it for
+    the options. The pipeline only runs ahead of the caller by the queue sizes.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="auto-sdlc-pipeline", daemon=True)
+    thread.start()
+    reviews = astream_reviews(root, **options)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(anext(reviews), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(reviews.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def write_jsonl(reviews: Iterable[FileReview], output: IO[str]) -> int:
+    """Write one JSON line per review, flushing each; return the number of reviews with suggestions or errors."""
+    flagged = 0
+    for review in reviews:
+        output.write(json.dumps(review.to_json()) + "\n")
+        output.flush()
+        flagged += bool(review)
+    return flagged
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Review a project, streaming one JSON line per file to stdout as results become ready."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.pipeline", description=main.__doc__)
+    parser.add_argument("root", nargs="?", default=".", help="Project to review (default: the current directory).")
+    parser.add_argument("--output", "-o", help="Write the JSON lines to this file instead of stdout.")
+    parser.add_argument("--apply", action="store_true", help="Apply the suggestions as each file is reviewed.")
+    parser.add_argument("--no-generate", action="store_true", help="Find suggestions without generating text with the LLM.")
+    parser.add_argument("--process-workers", type=int, help="Processes for detection and diffs (default: CPUs).")
+    parser.add_argument("--llm-workers", type=int, default=DEFAULT_LLM_WORKERS, help="Files with LLM requests in flight.")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Capacity of each stage's queue.")
+    args = parser.parse_args(argv)
+
+    reviews = stream_reviews(
+        Path(args.root),
+        process_workers=args.process_workers,
+        llm_workers=args.llm_workers,
+        generate=not args.no_generate,
+        apply=args.apply,
+        queue_size=args.queue_size,
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            flagged = write_jsonl(reviews, output)
+    else:
+        flagged = write_jsonl(reviews, sys.stdout)
+    sys.exit(1 if flagged and not args.apply else 0)
+
+
+if __name__ == "__main__":
+    main()
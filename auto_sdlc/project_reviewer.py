@@ -0,0 +1,280 @@
+"""Review every Python file in a project concurrently.
+
+Local analysis (finding suggestions and building their diffs) runs in a
+process pool, while LLM-bound work (generating suggested text) runs in a
+bounded thread pool. Results stream back as soon as they are ready.
+"""
+
+import os
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from auto_sdlc.file_ops import get_document, seed_document
+from auto_sdlc.llm_scheduler import Priority, priority
+from auto_sdlc.metrics import profile_stage
+from auto_sdlc.review_manifest import FileFingerprint, ReviewManifest, git_changed_files
+from auto_sdlc.reviewer import MissingDocstringSuggestion, SuggestionBase, get_file_suggestions, preview_diffs
+from auto_sdlc.symbol_index import SymbolIndex
+
+
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    ".git",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".nox",
+    "node_modules",
+})
+DEFAULT_LLM_WORKERS = 8
+
+
+@dataclass
+class FileReview:
+    """Suggestions and diffs produced for one file."""
+    file: Path
+    suggestions: list[SuggestionBase] = field(default_factory=list)
+    diffs: list[str] = field(default_factory=list)
+    error: str | None = None
+    cached: bool = False
+    applied: bool = False
+    text: str | None = field(default=None, repr=False)
+    text_signature: tuple[int, int] | None = None
+
+    def __bool__(self) -> bool:
+        """Return True if the review found anything to report."""
+        return bool(self.suggestions) or self.error is not None
+
+    def to_json(self) -> dict[str, Any]:
+        """JSON-serializable form of the review."""
+        return {
+            "file": str(self.file),
+            "suggestions": [
+                {
+                    "kind": type(suggestion).__name__,
+                    "description": suggestion.description,
+                    "suggested_text": suggestion.suggested_text,
+                    "target": suggestion.target.model_dump(mode="json"),
+                }
+                for suggestion in self.suggestions
+            ],
+            "diffs": self.diffs,
+            "error": self.error,
+            "cached": self.cached,
+            "applied": self.applied,
+        }
+
+
+def iter_python_files(
+    root: Path,
+    *,
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+) -> Iterator[Path]:
+    """Find Python files under a directory lazily, in a deterministic (sorted) order."""
+    excluded_dirs = set(excluded_dirs)
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(name for name in dir_names if name not in excluded_dirs)
+        for name in sorted(file_names):
+            if name.endswith(".py"):
+                yield Path(dir_path) / name
+
+
+def find_python_files(
+    root: Path,
+    *,
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+) -> list[Path]:
+    """Find Python files under a directory, in a deterministic (sorted) order."""
+    return list(iter_python_files(root, excluded_dirs=excluded_dirs))
+
+
+def _analyze_file(file_path: Path, index: SymbolIndex | None = None, *, text: bool = False) -> FileReview:
+    """Find suggestions for a file (local work, runs in a worker process, or in-process with an index).
+
+    With `text`, a file with suggestions is returned with the text it was
+    analyzed at, so the files are not read again for the work that follows.
+    """
+    with profile_stage("review.analyze"):
+        review = FileReview(file=file_path, suggestions=list(get_file_suggestions(file_path, index=index)))
+    if text and review.suggestions:
+        document = get_document(file_path)
+        review.text, review.text_signature = document.text, document.signature
+    return review
+
+
+def _needs_generation(suggestion: SuggestionBase) -> bool:
+    return isinstance(suggestion, MissingDocstringSuggestion) and suggestion.suggested_text is None
+
+
+def _generate_text(suggestions: list[SuggestionBase]) -> list[SuggestionBase]:
+    """Fill in LLM-generated text (LLM-bound work, runs in the thread pool)."""
+    with profile_stage("review.generate"):
+        for suggestion in suggestions:
+            if _needs_generation(suggestion):
+                suggestion.generate_text()
+    return suggestions
+
+
+def _build_diffs(suggestions: list[SuggestionBase]) -> list[str]:
+    """Build preview diffs for suggestions (local work, runs in a worker process)."""
+    with profile_stage("review.diff"):
+        return preview_diffs(suggestions)
+
+
+class _InlineExecutor(Executor):
+    """Executor that runs each task immediately in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as ex:
+            future.set_exception(ex)
+        return future
+
+
+def review_project(
+    root: Path,
+    *,
+    process_workers: int | None = None,
+    llm_workers: int = DEFAULT_LLM_WORKERS,
+    generate: bool = True,
+    ordered: bool = True,
+    files: Iterable[Path] | None = None,
+    manifest: ReviewManifest | None = None,
+    diff_range: str | None = None,
+    llm_priority: Priority = Priority.BULK,
+    symbol_index: SymbolIndex | None = None,
+    diffs: bool = True,
+    texts: bool = False,
+) -> Iterator[FileReview]:
+    """Review every Python file under `root`, streaming a `FileReview` per file.
+
+    Args:
+        root: Directory to review.
+        process_workers: Size of the process pool used for local analysis.
+            Defaults to the number of CPUs; 0 runs local analysis in-process.
+        llm_workers: Maximum number of files with LLM requests in flight.
+        generate: Whether to generate suggested text with the LLM.
+        ordered: Yield reviews in file order (deterministic) rather than in
+            completion order. Reviews are still yielded as soon as every file
+            before them is done.
+        files: Files to review, instead of every Python file under `root`.
+        manifest: Manifest of stored reviews. Files that are unchanged since
+            their stored review are not reviewed again; their stored review
+            is yielded instead (with `cached` set).
+        diff_range: Only review Python files changed in this git diff range,
+            such as `main...HEAD`.
+        llm_priority: Priority lane of the review's LLM requests. Use
+            `Priority.INTERACTIVE` for reviews someone is waiting on.
+        symbol_index: Symbol index to analyze files with. It is brought up to date
+            first (re-parsing only changed files), then queried in-process
+            instead of scanning every file in the process pool.
+        diffs: Whether to build a preview diff per suggestion. `patch` builds
+            one patch per file instead, and turns this off.
+        texts: Whether to keep the text each file was analyzed at on its
+            review. `patch` builds its patches from it, without reading the
+            files again.
+    """
+    if files is not None:
+        file_list = list(files)
+    elif diff_range is not None:
+        file_list = git_changed_files(root, diff_range)
+    else:
+        file_list = find_python_files(root)
+    if not file_list:
+        return
+
+    results: queue.Queue[tuple[int, FileReview]] = queue.Queue()
+    processes: Executor = (
+        _InlineExecutor() if process_workers == 0 else ProcessPoolExecutor(process_workers)
+    )
+    threads = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="auto-sdlc-llm")
+    if symbol_index is not None:
+        symbol_index.update(file_list)
+    analysis: Executor = _InlineExecutor() if symbol_index is not None else processes
+
+    fingerprints: dict[int, FileFingerprint] = {}
+    # Set when the consumer stops early: the pools' callbacks then drop their work.
+    closing = threading.Event()
+
+    def finish(index: int, review: FileReview, diffs_future: Future | None = None) -> None:
+        if closing.is_set():
+            return
+        if diffs_future is not None:
+            try:
+                review.diffs = diffs_future.result()
+            except Exception as ex:
+                review.error = f"{type(ex).__name__}: {ex}"
+        if manifest is not None and index in fingerprints and review.error is None:
+            manifest.record(review, fingerprints[index], generated=generate)
+        results.put((index, review))
+
+    def generate_and_diff(index: int, review: FileReview) -> None:
+        if closing.is_set():
+            return
+        try:
+            if generate:
+                with priority(llm_priority):
+                    _generate_text(review.suggestions)
+            if diffs and (generate or not any(_needs_generation(s) for s in review.suggestions)):
+                diffs_future = processes.submit(_build_diffs, review.suggestions)
+                diffs_future.add_done_callback(lambda future: finish(index, review, future))
+                return
+        except Exception as ex:
+            review.error = f"{type(ex).__name__}: {ex}"
+        finish(index, review)
+
+    def on_analyzed(index: int, file_path: Path, future: Future) -> None:
+        if closing.is_set():
+            return
+        try:
+            review = future.result()
+        except Exception as ex:
+            review = FileReview(file=file_path, error=f"{type(ex).__name__}: {ex}")
+        if review.text is not None and review.text_signature is not None:
+            # Generation reads the file through the shared document buffer.
+            seed_document(file_path, review.text, review.text_signature)
+            if not texts:
+                review.text = review.text_signature = None
+        if not review.suggestions:
+            finish(index, review)
+        else:
+            threads.submit(generate_and_diff, index, review)
+
+    try:
+        for index, file_path in enumerate(file_list):
+            if manifest is not None:
+                fingerprint = fingerprints[index] = manifest.fingerprint(file_path)
+                stored = manifest.lookup(file_path, fingerprint, generated=generate)
+                if stored is not None:
+                    results.put((index, stored))
+                    continue
+            future = analysis.submit(_analyze_file, file_path, symbol_index, text=texts or generate)
+            future.add_done_callback(
+                lambda future, index=index, file_path=file_path: on_analyzed(index, file_path, future)
+            )
+
+        pending: dict[int, FileReview] = {}
+        next_index = 0
+        for _ in range(len(file_list)):
+            index, review = results.get()
+            if not ordered:
+                yield review
+                continue
+            pending[index] = review
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        closing.set()
+        processes.shutdown(wait=True, cancel_futures=True)
+        threads.shutdown(wait=True, cancel_futures=True)
@@ -1,25 +1,153 @@
+import ast
+import hashlib
+import io
+import threading
+import tokenize
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
 
-from auto_sdlc.file_ops import insert_lines, FileRange, FilePosition
+# FilePosition is re-exported: callers import it from here.
+from auto_sdlc.file_ops import get_document, insert_lines, FileRange, FilePosition  # noqa: F401
 
+MAX_CACHED_PARSES = 1024
 
-def get_docstring_range(file_path: Path) -> FileRange | None:
-    """Get docstring from a file."""
-    start_position = FilePosition.from_search(
-        '"""',
-        file_path=file_path,
-    )
-    if not start_position:
-        return None
-    end_position = start_position.find_next('"""')
-    if not end_position:
+
+@dataclass(frozen=True, slots=True)
+class DocstringSpan:
+    """Location of a module, class or function docstring.
+
+    Lines are 1-based and columns are 0-based character offsets; the end
+    column is exclusive.
+    """
+    kind: str
+    name: str
+    start_line: int
+    start_column: int
+    end_line: int
+    end_column: int
+
+    def file_range(self, file_path: Path) -> FileRange:
+        """Lines of the file spanned by the docstring."""
+        return FileRange(file=file_path, start=self.start_line, end=self.end_line)
+
+
+_parse_cache: OrderedDict[bytes, tuple[DocstringSpan, ...]] = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def _char_column(lines: list[bytes], line: int, byte_column: int) -> int:
+    """Convert a UTF-8 byte offset within a line (as reported by `ast`) to a character offset."""
+    return len(lines[line - 1][:byte_column].decode("utf-8", errors="replace"))
+
+
+def _docstring_node(node: ast.AST) -> ast.Constant | None:
+    body = getattr(node, "body", None)
+    if not body or not isinstance(body[0], ast.Expr):
         return None
+    value = body[0].value
+    if isinstance(value, ast.Constant) and isinstance(value.value, str):
+        return value
+    return None
+
+
+def _child_definitions(node: ast.AST) -> Iterator[ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef]:
+    """Classes and functions defined directly in a node's body, including inside if/try/with blocks."""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield child
+        elif not isinstance(child, ast.expr):
+            yield from _child_definitions(child)
+
+
+def _find_docstrings_with_ast(tree: ast.Module, source: str) -> list[DocstringSpan]:
+    lines = [line.encode() for line in source.splitlines(keepends=True)]
+    spans: list[DocstringSpan] = []
 
-    return FileRange(
-        file=file_path,
-        start=start_position.line,
-        end=end_position.line,
-    )
+    def visit(node: ast.AST, kind: str, name: str) -> None:
+        docstring = _docstring_node(node)
+        if docstring is not None:
+            # `ast.parse` sets end positions; only hand-built nodes lack them.
+            end_line = docstring.end_lineno if docstring.end_lineno is not None else docstring.lineno
+            end_offset = docstring.end_col_offset if docstring.end_col_offset is not None else docstring.col_offset
+            spans.append(DocstringSpan(
+                kind=kind,
+                name=name,
+                start_line=docstring.lineno,
+                start_column=_char_column(lines, docstring.lineno, docstring.col_offset),
+                end_line=end_line,
+                end_column=_char_column(lines, end_line, end_offset),
+            ))
+        for child in _child_definitions(node):
+            kind = "class" if isinstance(child, ast.ClassDef) else "function"
+            visit(child, kind, f"{name}.{child.name}" if name else child.name)
+
+    visit(tree, "module", "")
+    return spans
+
+
+def _find_module_docstring_with_tokenize(source: str) -> list[DocstringSpan]:
+    """Find the module docstring of a file that does not parse."""
+    skipped = {tokenize.ENCODING, tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT}
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+        first = next(token for token in tokens if token.type not in skipped)
+        if first.type != tokenize.STRING:
+            return []
+        following = next(token for token in tokens if token.type not in {tokenize.NL, tokenize.COMMENT})
+    except (tokenize.TokenError, SyntaxError, StopIteration):
+        return []
+    if following.type not in {tokenize.NEWLINE, tokenize.ENDMARKER}:
+        return []
+    return [DocstringSpan(
+        kind="module",
+        name="",
+        start_line=first.start[0],
+        start_column=first.start[1],
+        end_line=first.end[0],
+        end_column=first.end[1],
+    )]
+
+
+def find_docstrings(source: str) -> tuple[DocstringSpan, ...]:
+    """Find the module, class and function docstrings of Python source, in one pass.
+
+    Results are cached by content hash. Source that does not parse only has
+    its module docstring located, with `tokenize`.
+    """
+    digest = hashlib.blake2b(source.encode(), digest_size=16).digest()
+    with _parse_cache_lock:
+        spans = _parse_cache.get(digest)
+        if spans is not None:
+            _parse_cache.move_to_end(digest)
+            return spans
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        spans = tuple(_find_module_docstring_with_tokenize(source))
+    else:
+        spans = tuple(_find_docstrings_with_ast(tree, source))
+
+    with _parse_cache_lock:
+        _parse_cache[digest] = spans
+        if len(_parse_cache) > MAX_CACHED_PARSES:
+            _parse_cache.popitem(last=False)
+    return spans
+
+
+def get_docstrings(file_path: Path) -> tuple[DocstringSpan, ...]:
+    """Get the module, class and function docstrings of a file."""
+    return find_docstrings(get_document(file_path).text)
+
+
+def get_docstring_range(file_path: Path) -> FileRange | None:
+    """Get docstring from a file."""
+    for span in get_docstrings(file_path):
+        if span.kind == "module":
+            return span.file_range(file_path)
+    return None
 
 
 def get_docstring(file_path: Path) -> str | None:
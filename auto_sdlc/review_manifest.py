@@ -0,0 +1,136 @@
+"""Persistent manifest of per-file review results, for incremental reviews.
+
+For every reviewed file the manifest records a content hash, the analyzer
+and prompt versions, and the review produced. A later run reuses the stored
+review of any file whose content and versions are unchanged.
+"""
+
+import hashlib
+import os
+import subprocess
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from diskcache import Cache
+
+from auto_sdlc import ask
+from auto_sdlc.reviewer import ANALYZER_VERSION
+
+if TYPE_CHECKING:
+    from auto_sdlc.project_reviewer import FileReview
+
+DEFAULT_DIRECTORY = ".cache/review-manifest"
+
+
+def content_hash(file_path: Path) -> str:
+    """Hash of a file's contents."""
+    return hashlib.blake2b(Path(file_path).read_bytes(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """What a stored review depends on: file contents and analyzer/prompt versions."""
+    mtime_ns: int
+    size: int
+    content_hash: str
+    analyzer_version: int = ANALYZER_VERSION
+    prompt_version: int = ask.PROMPT_TEMPLATE_VERSION
+
+    def matches(self, other: "FileFingerprint") -> bool:
+        """Return True if a review made for `other` is still valid for this fingerprint."""
+        return (
+            self.content_hash == other.content_hash
+            and self.analyzer_version == other.analyzer_version
+            and self.prompt_version == other.prompt_version
+        )
+
+
+class ReviewManifest:
+    """Stored reviews, keyed by file path."""
+
+    def __init__(self, directory: str | Path = DEFAULT_DIRECTORY) -> None:
+        self.directory = Path(directory)
+        self._cache = Cache(str(self.directory))
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return os.path.abspath(file_path)
+
+    def fingerprint(self, file_path: Path) -> FileFingerprint:
+        """Fingerprint of a file, hashing it only if its mtime or size changed."""
+        stat = Path(file_path).stat()
+        entry = self._cache.get(self._key(file_path), retry=True)
+        if entry is not None:
+            stored: FileFingerprint = entry["fingerprint"]
+            if (stored.mtime_ns, stored.size) == (stat.st_mtime_ns, stat.st_size):
+                return replace(stored, analyzer_version=ANALYZER_VERSION, prompt_version=ask.PROMPT_TEMPLATE_VERSION)
+        return FileFingerprint(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            content_hash=content_hash(file_path),
+        )
+
+    def lookup(self, file_path: Path, fingerprint: FileFingerprint, *, generated: bool) -> "FileReview | None":
+        """Get the stored review of a file, if it is still valid.
+
+        Reviews stored without generated text are not reused when `generated`
+        is requested.
+        """
+        entry = self._cache.get(self._key(file_path), retry=True)
+        if entry is None or not fingerprint.matches(entry["fingerprint"]):
+            return None
+        if generated and not entry["generated"]:
+            return None
+        return replace(entry["review"], file=Path(file_path), cached=True)
+
+    def record(self, review: "FileReview", fingerprint: FileFingerprint, *, generated: bool) -> None:
+        """Store the review of a file."""
+        self._cache.set(
+            self._key(review.file),
+            {"fingerprint": fingerprint, "generated": generated, "review": replace(review, cached=False, text=None, text_signature=None)},
+            retry=True,
+        )
+
+    def forget(self, file_path: Path) -> None:
+        """Drop the stored review of a file."""
+        self._cache.delete(self._key(file_path), retry=True)
+
+    def clear(self) -> int:
+        """Drop every stored review; return the count removed."""
+        return self._cache.clear(retry=True)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def close(self) -> None:
+        """Close the manifest."""
+        self._cache.close()
+
+
+def git_changed_files(root: Path, diff_range: str) -> list[Path]:
+    """Python files under `root` changed in a git diff range (for example `main...HEAD`).
+
+    Deleted files are left out.
+    """
+    output = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=d", diff_range, "--", "*.py"],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    top_level = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    root = Path(root).resolve()
+    files = []
+    for name in sorted(output.splitlines()):
+        file_path = Path(top_level) / name
+        if file_path.is_file() and file_path.resolve().is_relative_to(root):
+            files.append(file_path)
+    return files
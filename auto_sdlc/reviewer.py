@@ -1,17 +1,30 @@
 """An automated code reviewer."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterator
-from functools import lru_cache
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
-from auto_sdlc import ask
+from auto_sdlc import ask, file_writer, metrics
+from auto_sdlc.edit_session import EditSession
 from auto_sdlc.python_developer import get_docstring, set_docstring
-from auto_sdlc.file_ops import FilePlace, FileRange, FilePosition
+from auto_sdlc.file_ops import FilePlace, FileRange, FilePosition, get_document, read_spans
+from auto_sdlc.spans import LineSpan, SpanArray
 
 import difflib
 
+if TYPE_CHECKING:
+    from auto_sdlc.symbol_index import SymbolIndex
+
+# Bump when get_file_suggestions changes what it finds, to invalidate stored reviews.
+ANALYZER_VERSION = 1
+DIFF_CONTEXT_LINES = 3
+
+_REVIEW_SECONDS = metrics.histogram(
+    "auto_sdlc_review_seconds", "Time spent per suggestion, by stage (analyze, generate, diff, apply)."
+)
+
 def _generate_diff(before: str, after: str) -> str:
     before_lines = before.splitlines(keepends=True)
     after_lines = after.splitlines(keepends=True)
@@ -25,18 +38,36 @@ class SuggestionBase(ABC, BaseModel):
     suggested_text: str
     description: str
 
+    @property
+    def file(self) -> Path:
+        """File targeted by the suggestion."""
+        return self.target.file
+
     @abstractmethod
     def apply(self) -> None:
         """Apply suggestion."""
         raise NotImplementedError
 
     @abstractmethod
+    def stage(self, session: EditSession) -> None:
+        """Queue suggestion in an edit session."""
+        raise NotImplementedError
+
     @property
+    @abstractmethod
     def diff(self) -> str:
         """Preview diff."""
         raise NotImplementedError
 
-class EditSuggestion(BaseModel):
+    def _diff_spans(self, line_count: int) -> tuple[LineSpan, LineSpan, LineSpan] | None:
+        """Lines before, at and after the target that the diff is built from, if it is built from lines."""
+        return None
+
+    def _diff_of(self, before: str, text: str, after: str) -> str:
+        """Preview diff, given the text of the `_diff_spans`."""
+        raise NotImplementedError
+
+class EditSuggestion(SuggestionBase):
 
     target: FileRange
     suggested_text: str
@@ -44,19 +75,27 @@ class EditSuggestion(BaseModel):
 
     def apply(self) -> None:
         """Apply suggestion."""
-        self.file_range.text = self.suggestion_text
+        self.target.text = self.suggested_text
+
+    def stage(self, session: EditSession) -> None:
+        """Queue suggestion in an edit session."""
+        session.replace_range(self.target, self.suggested_text)
 
     @property
     def diff(self) -> str:
         """Preview diff."""
-        previous_3_lines = self.target.previous_lines(3)
-        next_3_lines = self.target.next_lines(3)
-        return _generate_diff(
-            previous_3_lines.text + self.target.text + next_3_lines.text,
-            previous_3_lines.text + self.suggested_text + next_3_lines.text,
-        )
+        lines = self.target.document.lines
+        spans = self._diff_spans(len(lines))
+        return self._diff_of(*(span.text(lines) for span in spans))
 
-class InsertSuggestion(BaseModel):
+    def _diff_spans(self, line_count: int) -> tuple[LineSpan, LineSpan, LineSpan]:
+        span = self.target.to_span()
+        return span.previous_lines(DIFF_CONTEXT_LINES), span, span.next_lines(DIFF_CONTEXT_LINES, line_count)
+
+    def _diff_of(self, before: str, text: str, after: str) -> str:
+        return _generate_diff(before + text + after, before + self.suggested_text + after)
+
+class InsertSuggestion(SuggestionBase):
 
     target: FilePosition
     suggested_text: str
@@ -66,40 +105,141 @@ class InsertSuggestion(BaseModel):
         """Apply suggestion."""
         self.target.insert_string(self.suggested_text)
 
+    def stage(self, session: EditSession) -> None:
+        """Queue suggestion in an edit session."""
+        session.insert_at(self.target, self.suggested_text)
+
     @property
     def diff(self) -> str:
         """Preview diff."""
-        previous_3_lines = self.target.previous_lines(3)
-        next_3_lines = self.target.next_lines(3)
-        curr_line_before = self.target.current_line[:self.target.column]
-        curr_line_after = self.target.current_line[self.target.column:]
-        new_curr_line = curr_line_before + self.suggested_text + curr_line_after
+        lines = self.target.document.lines
+        spans = self._line_spans(len(lines))
+        return self._diff_of(*(span.text(lines) for span in spans))
+
+    def _line_spans(self, line_count: int) -> tuple[LineSpan, LineSpan, LineSpan]:
+        position = self.target.to_position()
+        return (
+            position.previous_lines(DIFF_CONTEXT_LINES),
+            position.current_line(),
+            position.next_lines(DIFF_CONTEXT_LINES, line_count),
+        )
+
+    def _diff_spans(self, line_count: int) -> tuple[LineSpan, LineSpan, LineSpan] | None:
+        return self._line_spans(line_count)
+
+    def _diff_of(self, before: str, text: str, after: str) -> str:
+        column = self.target.column
         return _generate_diff(
-            previous_3_lines.text + self.current_line.text + next_3_lines.text,
-            previous_3_lines.text + new_curr_line  + next_3_lines.text,
+            before + text + after,
+            before + text[:column] + self.suggested_text + text[column:] + after,
         )
 
 class MissingDocstringSuggestion(InsertSuggestion):
 
     description: str = "Missing docstring in this file."
-    file: Path
-    
-    @property
-    def target(self) -> FilePosition:
-        """Get target."""
-        return FilePosition.from_index(self.file, 0)
-
-    @lru_cache
-    @property
-    def suggested_text(self) -> None:
-        """Initialize."""
-        return ask.suggest_docstring(self.file)
+    suggested_text: str | None = None
+
+    @classmethod
+    def for_file(cls, file_path: Path) -> "MissingDocstringSuggestion":
+        """Create a suggestion targeting the top of a file."""
+        return cls(target=FilePosition(file=file_path, line=1, column=0))
+
+    def generate_text(self) -> str:
+        """Generate the docstring with the LLM, if not already generated."""
+        if self.suggested_text is None:
+            with _REVIEW_SECONDS.time(stage="generate", suggestion=type(self).__name__):
+                self.suggested_text = ask.suggest_docstring(self.file)
+        return self.suggested_text
+
+    async def agenerate_text(self) -> str:
+        """Generate the docstring with the LLM, if not already generated, without blocking the event loop."""
+        if self.suggested_text is None:
+            with _REVIEW_SECONDS.time(stage="generate", suggestion=type(self).__name__):
+                self.suggested_text = await ask.asuggest_docstring(self.file)
+        return self.suggested_text
 
     def apply(self) -> None:
         """Apply suggestion."""
-        set_docstring(self.file_range.file, self.docstring)
+        set_docstring(self.file, self.generate_text())
+
+    def stage(self, session: EditSession) -> None:
+        """Queue suggestion in an edit session."""
+        session.insert_lines(0, self.generate_text())
 
-def get_file_suggestions(file_path: Path) -> Iterator[SuggestionBase]:
-    """Get file suggestions."""
-    if get_docstring(file_path) is None:
-        yield MissingDocstringSuggestion(FileRange(file_path, 0, 0))
+    @property
+    def diff(self) -> str:
+        """Preview diff."""
+        with _REVIEW_SECONDS.time(stage="diff", suggestion=type(self).__name__):
+            session = EditSession(self.file)
+            self.stage(session)
+            return _generate_diff(session.original_text, session.render())
+
+    def _diff_spans(self, line_count: int) -> None:
+        # The diff is built from an edit session: see `diff`.
+        return None
+
+def preview_diffs(suggestions: Sequence[SuggestionBase]) -> list[str]:
+    """Preview diffs of many suggestions, in order.
+
+    The context lines of every suggestion are gathered in one `SpanArray`
+    and read with one document lookup per file, instead of three per
+    suggestion.
+    """
+    line_counts: dict[Path, int] = {}
+    spans = SpanArray()
+    batched: list[bool] = []
+    for suggestion in suggestions:
+        line_count = line_counts.get(suggestion.file)
+        if line_count is None:
+            line_count = line_counts[suggestion.file] = get_document(suggestion.file).line_count
+        diff_spans = suggestion._diff_spans(line_count)
+        if diff_spans is not None:
+            spans.extend(diff_spans)
+        batched.append(diff_spans is not None)
+
+    texts = iter(read_spans(spans))
+    return [
+        suggestion._diff_of(next(texts), next(texts), next(texts)) if in_batch else suggestion.diff
+        for suggestion, in_batch in zip(suggestions, batched)
+    ]
+
+
+def get_file_suggestions(file_path: Path, *, index: "SymbolIndex | None" = None) -> Iterator[SuggestionBase]:
+    """Get file suggestions.
+
+    With a symbol index, what the index knows about the file is used instead
+    of reading it (the file's entry is refreshed first if it changed).
+    """
+    with _REVIEW_SECONDS.time(stage="analyze", suggestion=MissingDocstringSuggestion.__name__):
+        has_docstring = index.has_module_docstring(file_path) if index is not None else None
+        if has_docstring is None:
+            has_docstring = get_docstring(file_path) is not None
+        missing_docstring = not has_docstring
+    if missing_docstring:
+        yield MissingDocstringSuggestion.for_file(file_path)
+
+
+def apply_suggestions(suggestions: Iterable[SuggestionBase], *, journal: str | Path | None = None) -> None:
+    """Apply many suggestions with one edit session, and one write, per file.
+
+    All suggestions for a file are staged before anything is written, so
+    conflicting suggestions are rejected before the file is touched. The
+    files are then written behind, in parallel; with a `journal` directory,
+    an apply interrupted by a crash can be rolled back or resumed (see
+    `file_writer`).
+    """
+    sessions: dict[Path, EditSession] = {}
+    for suggestion in suggestions:
+        session = sessions.get(suggestion.file)
+        if session is None:
+            session = sessions[suggestion.file] = EditSession(suggestion.file)
+        with _REVIEW_SECONDS.time(stage="apply", suggestion=type(suggestion).__name__):
+            suggestion.stage(session)
+    if file_writer.active_writer() is not None:
+        # Already part of a larger batch of writes.
+        for session in sessions.values():
+            session.commit()
+        return
+    with file_writer.write_behind(journal=journal):
+        for session in sessions.values():
+            session.commit()
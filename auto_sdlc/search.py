@@ -0,0 +1,266 @@
+"""Multi-pattern literal search over files and project trees.
+
+A few patterns are searched with one `find` cursor each (memchr-fast),
+merged in order through a heap. Many patterns are compiled into one
+trie-shaped regular expression (the Aho-Corasick idea, run by the C regex
+engine) and matched in a single pass, so the cost of a scan barely grows
+with the number of patterns. Large files are memory-mapped instead of read,
+and lines and columns are computed only for the matches, from newline counts
+between consecutive matches, so memory stays flat on multi-gigabyte files.
+
+    markers = PatternSet(["'''", "TODO", "# noqa"])
+    for match in search_project(Path("vendor"), markers):
+        print(f"{match.file}:{match.line}:{match.column}: {match.pattern}")
+"""
+
+import argparse
+import codecs
+import heapq
+import mmap
+import os
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from auto_sdlc.spans import Position
+
+# Files at least this large are memory-mapped rather than read into memory.
+MMAP_THRESHOLD = 1 << 20
+# Newlines and columns are counted in slices of this many bytes, so a large
+# gap between matches is never copied out of a memory map whole.
+COUNT_WINDOW = 1 << 20
+# Up to this many patterns, one find cursor per pattern beats a single regex pass.
+FIND_CURSORS_LIMIT = 12
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    """A pattern found in a file: 1-based line, 0-based (character) column, and byte offset."""
+    file: Path
+    line: int
+    column: int
+    offset: int
+    pattern: str
+
+    def to_position(self) -> Position:
+        """Position of the start of the match."""
+        return Position(self.file, self.line, self.column)
+
+
+def _count_newlines(data: bytes | mmap.mmap, start: int, end: int) -> int:
+    """Newlines in `data[start:end]`, counted window by window."""
+    if isinstance(data, bytes):
+        return data.count(b"\n", start, end)
+    newlines = 0
+    for window in range(start, end, COUNT_WINDOW):
+        newlines += data[window:min(window + COUNT_WINDOW, end)].count(b"\n")
+    return newlines
+
+
+def _count_characters(data: bytes | mmap.mmap, start: int, end: int) -> int:
+    """Characters UTF-8 decodes `data[start:end]` to, decoded window by window."""
+    if end - start <= COUNT_WINDOW:
+        return len(data[start:end].decode("utf-8", errors="replace"))
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    characters = 0
+    for window in range(start, end, COUNT_WINDOW):
+        characters += len(decoder.decode(data[window:min(window + COUNT_WINDOW, end)]))
+    return characters + len(decoder.decode(b"", final=True))
+
+
+def _trie_regex(patterns: Iterable[bytes]) -> bytes:
+    """Regular expression matching any of the patterns, shaped as a trie of their bytes.
+
+    At each offset the longest pattern matching there wins.
+    """
+    trie: dict = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+
+    def build(node: dict) -> bytes:
+        terminal = None in node
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted(node.items(), key=str) if byte is not None]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        if terminal:
+            return (body if len(branches) > 1 else b"(?:" + body + b")") + b"?"
+        return body
+
+    return build(trie)
+
+
+class PatternSet:
+    """Literal patterns compiled for searching all at once.
+
+    Matches do not overlap: scanning from the start, the longest pattern at
+    the first offset where any pattern matches wins, and scanning resumes
+    after it.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = tuple(dict.fromkeys(patterns))
+        if not self.patterns or not all(self.patterns):
+            raise ValueError("Patterns must be a non-empty collection of non-empty strings.")
+        self._by_bytes = {pattern.encode(): pattern for pattern in self.patterns}
+        self.regex = re.compile(_trie_regex(self._by_bytes))
+
+    def __reduce__(self):
+        return _compiled, (self.patterns,)
+
+    def _scan_with_regex(self, data: bytes | mmap.mmap) -> Iterator[tuple[int, bytes]]:
+        for found in self.regex.finditer(data):
+            yield found.start(), found.group()
+
+    def _scan_with_cursors(self, data: bytes | mmap.mmap) -> Iterator[tuple[int, bytes]]:
+        encoded = list(self._by_bytes)
+        heap = [(offset, -len(pattern), pattern) for pattern in encoded if (offset := data.find(pattern)) >= 0]
+        heapq.heapify(heap)
+        end = 0
+        while heap:
+            offset, _, pattern = heap[0]
+            if offset >= end:
+                yield offset, pattern
+                end = offset + len(pattern)
+            next_offset = data.find(pattern, max(offset + 1, end))
+            if next_offset >= 0:
+                heapq.heapreplace(heap, (next_offset, -len(pattern), pattern))
+            else:
+                heapq.heappop(heap)
+
+    def finditer(self, file: Path, data: bytes | mmap.mmap) -> Iterator[Match]:
+        """Matches in a file's bytes, in order."""
+        scan = self._scan_with_cursors if len(self.patterns) <= FIND_CURSORS_LIMIT else self._scan_with_regex
+        line = 1
+        line_start = 0
+        counted = 0
+        for offset, pattern in scan(data):
+            newlines = _count_newlines(data, counted, offset)
+            if newlines:
+                line += newlines
+                line_start = data.rfind(b"\n", counted, offset) + 1
+            counted = offset
+            column = _count_characters(data, line_start, offset)
+            yield Match(file, line, column, offset, self._by_bytes[pattern])
+
+
+@lru_cache(maxsize=32)
+def _compiled(patterns: tuple[str, ...]) -> PatternSet:
+    return PatternSet(patterns)
+
+
+def _pattern_set(patterns: PatternSet | Iterable[str] | str) -> PatternSet:
+    if isinstance(patterns, PatternSet):
+        return patterns
+    if isinstance(patterns, str):
+        patterns = (patterns,)
+    return _compiled(tuple(patterns))
+
+
+def iter_file_matches(
+    file_path: Path,
+    patterns: PatternSet | Iterable[str] | str,
+    *,
+    mmap_threshold: int = MMAP_THRESHOLD,
+) -> Iterator[Match]:
+    """Matches of the patterns in a file, in order, as they are found."""
+    file_path = Path(file_path)
+    pattern_set = _pattern_set(patterns)
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < mmap_threshold or size == 0:
+            yield from pattern_set.finditer(file_path, file.read())
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from pattern_set.finditer(file_path, data)
+
+
+def search_file(
+    file_path: Path,
+    patterns: PatternSet | Iterable[str] | str,
+    *,
+    mmap_threshold: int = MMAP_THRESHOLD,
+) -> list[Match]:
+    """Matches of the patterns in a file, in order."""
+    return list(iter_file_matches(file_path, patterns, mmap_threshold=mmap_threshold))
+
+
+def find_first(file_path: Path, pattern: str) -> Match | None:
+    """First match of a pattern in a file, or None; stops reading at the match."""
+    return next(iter_file_matches(file_path, pattern), None)
+
+
+def _search_file_or_nothing(file_path: Path, patterns: PatternSet) -> list[Match]:
+    try:
+        return search_file(file_path, patterns)
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        return []
+
+
+def search_files(
+    files: Iterable[Path],
+    patterns: PatternSet | Iterable[str] | str,
+    *,
+    workers: int | None = None,
+) -> Iterator[Match]:
+    """Matches of the patterns in many files, searched in a pool of `workers` processes.
+
+    Matches stream back file by file, in the order of `files`. Files that
+    cannot be read are skipped. `workers=0` searches in-process.
+    """
+    pattern_set = _pattern_set(patterns)
+    if workers == 0:
+        for file_path in files:
+            yield from _search_file_or_nothing(file_path, pattern_set)
+        return
+    files = list(files)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(files) // (4 * workers)))
+    with ProcessPoolExecutor(workers) as pool:
+        for matches in pool.map(_search_file_or_nothing, files, [pattern_set] * len(files), chunksize=chunksize):
+            yield from matches
+
+
+def search_project(
+    root: Path,
+    patterns: PatternSet | Iterable[str] | str,
+    *,
+    suffixes: Iterable[str] = (".py",),
+    workers: int | None = None,
+) -> Iterator[Match]:
+    """Matches of the patterns in the files under a directory with the given suffixes."""
+    from auto_sdlc.project_reviewer import DEFAULT_EXCLUDED_DIRS
+
+    suffixes = tuple(suffixes)
+
+    def files() -> Iterator[Path]:
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names[:] = sorted(name for name in dir_names if name not in DEFAULT_EXCLUDED_DIRS)
+            for name in sorted(file_names):
+                if name.endswith(suffixes):
+                    yield Path(dir_path) / name
+
+    return search_files(files(), patterns, workers=workers)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Print every match of literal patterns in a project tree, as file:line:column: pattern."""
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.search", description=main.__doc__)
+    parser.add_argument("patterns", nargs="+", help="Literal patterns to search for.")
+    parser.add_argument("--root", default=".", help="Directory to search (default: the current directory).")
+    parser.add_argument("--suffix", action="append", dest="suffixes", help="File suffix to search (repeatable; default: .py).")
+    parser.add_argument("--workers", type=int, help="Processes to search with (default: CPUs; 0 for in-process).")
+    args = parser.parse_args(argv)
+
+    for match in search_project(Path(args.root), args.patterns, suffixes=args.suffixes or (".py",), workers=args.workers):
+        print(f"{match.file}:{match.line}:{match.column}: {match.pattern}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Approximate (near-duplicate) tier of the LLM response cache.
+
+The exact cache only hits on byte-identical prompts. This tier finds cached
+answers to prompts that differ by whitespace or a few lines: prompts are
+normalized and turned into MinHash signatures of their token 3-shingles, and
+a locality-sensitive hashing (LSH) index of signature bands, in SQLite, finds
+candidates without comparing against every stored prompt. A candidate is a
+hit if the estimated Jaccard similarity of the prompts reaches the
+threshold.
+
+Answers themselves stay in the exact cache; the index only maps prompts to
+their exact cache keys. It is off unless a threshold is set:
+
+- `AUTO_SDLC_APPROXIMATE_CACHE_THRESHOLD`: minimum similarity of a hit, such as `0.9`.
+- `AUTO_SDLC_APPROXIMATE_CACHE_PATH`: index file (defaults to `.cache/llm-similarity.sqlite3`).
+
+Measure how often answers at a given similarity agree, to pick a threshold:
+
+    python -m auto_sdlc.similarity_cache precision --thresholds 0.7,0.8,0.9
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from diskcache.core import ENOVAL
+
+THRESHOLD_ENV_VAR = "AUTO_SDLC_APPROXIMATE_CACHE_THRESHOLD"
+PATH_ENV_VAR = "AUTO_SDLC_APPROXIMATE_CACHE_PATH"
+DEFAULT_PATH = ".cache/llm-similarity.sqlite3"
+DEFAULT_THRESHOLD = 0.9
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SHINGLE_TOKENS = 3
+MAX_CANDIDATES = 16
+# Answers at least this similar count as the same answer when measuring precision.
+ANSWER_AGREEMENT = 0.8
+
+_ROWS = NUM_PERMUTATIONS // BANDS
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+
+
+def _permutations(count: int) -> list[int]:
+    # Fixed seed: signatures are stored, so every process must use the same permutations.
+    generator = random.Random(0x5EED)
+    return [generator.getrandbits(64) for _ in range(count)]
+
+
+_PERMUTATIONS = _permutations(NUM_PERMUTATIONS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    identity TEXT NOT NULL,
+    cache_key TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    identity TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS bands_lookup ON bands (identity, band, bucket);
+CREATE INDEX IF NOT EXISTS bands_by_entry ON bands (entry_id);
+"""
+
+
+class ApproximateAnswer(str):
+    """A cached answer to a similar, not identical, prompt."""
+
+    approximate = True
+    similarity: float
+    cache_key: str
+
+    def __new__(cls, answer: str, *, similarity: float, cache_key: str) -> "ApproximateAnswer":
+        text = super().__new__(cls, answer)
+        text.similarity = similarity
+        text.cache_key = cache_key
+        return text
+
+    def __getnewargs_ex__(self) -> tuple[tuple[str], dict[str, object]]:
+        # Lets pickle and copy call `__new__` with its keyword-only arguments.
+        return (str(self),), {"similarity": self.similarity, "cache_key": self.cache_key}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt with runs of whitespace collapsed, so reformatting does not change it."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def _shingle_hashes(prompt: str) -> set[int]:
+    tokens = _TOKEN.findall(normalize_prompt(prompt))
+    if len(tokens) < SHINGLE_TOKENS:
+        tokens = [" ".join(tokens)]
+    width = min(SHINGLE_TOKENS, len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[index:index + width]).encode(), digest_size=8).digest(), "little")
+        for index in range(len(tokens) - width + 1)
+    }
+
+
+def signature(prompt: str) -> array:
+    """MinHash signature of a prompt's token shingles."""
+    hashes = _shingle_hashes(prompt)
+    return array("Q", (min(map(permutation.__xor__, hashes)) for permutation in _PERMUTATIONS))
+
+
+def similarity(first: array, second: array) -> float:
+    """Estimated Jaccard similarity of the prompts of two signatures."""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def _buckets(sig: array) -> list[tuple[int, int]]:
+    """(band, bucket) of each band of a signature."""
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(sig[band * _ROWS:(band + 1) * _ROWS].tobytes(), digest_size=8).digest(), "little", signed=True
+        ))
+        for band in range(BANDS)
+    ]
+
+
+class SimilarityIndex:
+    """LSH index of cached prompts' MinHash signatures, in SQLite."""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH, *, threshold: float = DEFAULT_THRESHOLD) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError("The similarity threshold must be in (0, 1].")
+        self.path = Path(path)
+        self.threshold = threshold
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=60)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        with self._lock:
+            self._connection.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "SimilarityIndex | None":
+        """Index configured by the AUTO_SDLC_APPROXIMATE_CACHE_* environment variables; None if not enabled."""
+        threshold = os.environ.get(THRESHOLD_ENV_VAR)
+        if not threshold:
+            return None
+        return cls(os.environ.get(PATH_ENV_VAR) or DEFAULT_PATH, threshold=float(threshold))
+
+    def add(self, prompt: str, cache_key: str, *, identity: str) -> None:
+        """Index the prompt whose answer is cached under `cache_key`."""
+        sig = signature(prompt)
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,))
+                entry_id = self._connection.execute(
+                    "INSERT INTO entries (identity, cache_key, signature, created) VALUES (?, ?, ?, ?)",
+                    (identity, cache_key, sig.tobytes(), time.time()),
+                ).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO bands (identity, band, bucket, entry_id) VALUES (?, ?, ?, ?)",
+                    [(identity, band, bucket, entry_id) for band, bucket in _buckets(sig)],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def lookup(self, prompt: str, *, identity: str, threshold: float | None = None) -> list[tuple[str, float]]:
+        """Cache keys of indexed prompts at least `threshold` similar to a prompt, most similar first."""
+        threshold = self.threshold if threshold is None else threshold
+        sig = signature(prompt)
+        buckets = _buckets(sig)
+        placeholders = ", ".join("(?, ?)" for _ in buckets)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT entries.cache_key, entries.signature FROM entries JOIN ("
+                f"  SELECT entry_id, COUNT(*) AS shared FROM bands"
+                f"  WHERE identity = ? AND (band, bucket) IN (VALUES {placeholders})"
+                f"  GROUP BY entry_id ORDER BY shared DESC LIMIT ?"
+                f") AS candidates ON entries.id = candidates.entry_id",
+                (identity, *(value for bucket in buckets for value in bucket), MAX_CANDIDATES),
+            ).fetchall()
+        matches = [(cache_key, similarity(sig, array("Q", stored))) for cache_key, stored in rows]
+        return sorted((match for match in matches if match[1] >= threshold), key=lambda match: -match[1])
+
+    def remove(self, cache_key: str) -> None:
+        """Forget a prompt, such as one whose answer was evicted from the cache."""
+        with self._lock:
+            self._connection.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,))
+
+    def pairs(self, *, min_similarity: float = 0.0) -> Iterator[tuple[str, str, float]]:
+        """Pairs of indexed prompts sharing an LSH bucket, with their estimated similarity."""
+        with self._lock:
+            signatures = {
+                entry_id: (cache_key, array("Q", stored))
+                for entry_id, cache_key, stored in self._connection.execute("SELECT id, cache_key, signature FROM entries")
+            }
+            candidate_pairs = self._connection.execute(
+                "SELECT DISTINCT first.entry_id, second.entry_id FROM bands AS first JOIN bands AS second"
+                " ON first.identity = second.identity AND first.band = second.band AND first.bucket = second.bucket"
+                " AND first.entry_id < second.entry_id"
+            ).fetchall()
+        for first, second in candidate_pairs:
+            (first_key, first_sig), (second_key, second_sig) = signatures[first], signatures[second]
+            score = similarity(first_sig, second_sig)
+            if score >= min_similarity:
+                yield first_key, second_key, score
+
+    def clear(self) -> int:
+        """Forget every prompt; return the count removed."""
+        with self._lock:
+            return self._connection.execute("DELETE FROM entries").rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._connection.close()
+
+
+@dataclass
+class PrecisionReport:
+    """How often cached answers agree for indexed prompt pairs at or above a similarity threshold."""
+    threshold: float
+    pairs: int
+    agreeing: int
+
+    @property
+    def precision(self) -> float:
+        """Fraction of pairs whose answers agree (1.0 if there are no pairs)."""
+        return self.agreeing / self.pairs if self.pairs else 1.0
+
+
+def answers_agree(first: str, second: str) -> bool:
+    """Whether two answers say the same thing, up to formatting and small wording changes."""
+    first_tokens = set(_WORD.findall(first.lower()))
+    second_tokens = set(_WORD.findall(second.lower()))
+    if not first_tokens or not second_tokens:
+        return first_tokens == second_tokens
+    return len(first_tokens & second_tokens) / len(first_tokens | second_tokens) >= ANSWER_AGREEMENT
+
+
+def measure_precision(
+    index: SimilarityIndex,
+    cache: Any,
+    thresholds: Iterable[float],
+) -> list[PrecisionReport]:
+    """Precision of each threshold: among indexed prompt pairs at least that similar, how many have agreeing answers.
+
+    Uses the answers in the exact cache as labels; pairs whose answers were evicted are skipped.
+    """
+    thresholds = sorted(thresholds)
+    reports = [PrecisionReport(threshold, 0, 0) for threshold in thresholds]
+    for first_key, second_key, score in index.pairs(min_similarity=thresholds[0] if thresholds else 1.0):
+        first, second = cache.get(first_key), cache.get(second_key)
+        if first is ENOVAL or second is ENOVAL:
+            continue
+        agree = answers_agree(str(first), str(second))
+        for report in reports:
+            if score >= report.threshold:
+                report.pairs += 1
+                report.agreeing += agree
+    return reports
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Inspect the approximate LLM cache index and measure the precision of similarity thresholds."""
+    from auto_sdlc.llm_cache import ResponseCache
+
+    parser = argparse.ArgumentParser(prog="python -m auto_sdlc.similarity_cache", description=main.__doc__)
+    parser.add_argument("--path", default=os.environ.get(PATH_ENV_VAR) or DEFAULT_PATH, help="Index file.")
+    parser.add_argument("--cache-directory", default=None, help="Exact cache directory (default: as configured).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show the number of indexed prompts.")
+    precision = commands.add_parser("precision", help="Measure answer agreement of prompt pairs by similarity.")
+    precision.add_argument("--thresholds", default="0.6,0.7,0.8,0.9,0.95", help="Comma-separated thresholds.")
+    commands.add_parser("clear", help="Forget every indexed prompt.")
+    args = parser.parse_args(argv)
+
+    index = SimilarityIndex(args.path)
+    try:
+        if args.command == "stats":
+            print(json.dumps({"prompts": len(index)}, indent=2))
+        elif args.command == "precision":
+            if args.cache_directory:
+                cache = ResponseCache(args.cache_directory, size_limit=None, eviction_policy=None)
+            else:
+                cache = ResponseCache.from_env()
+            try:
+                thresholds = [float(value) for value in args.thresholds.split(",")]
+                reports = measure_precision(index, cache, thresholds)
+            finally:
+                cache.close()
+            print(json.dumps(
+                [{**asdict(report), "precision": round(report.precision, 4)} for report in reports], indent=2
+            ))
+        elif args.command == "clear":
+            print(f"Removed {index.clear()} prompts.")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
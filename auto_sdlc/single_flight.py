@@ -0,0 +1,73 @@
+"""Coalesce concurrent calls that share a key into one in-flight call."""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for the leader's result instead of repeating
+    the call. Waiting works across threads and asyncio tasks alike, since both
+    wait on the same `concurrent.futures.Future`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """Get the in-flight future for a key, and whether the caller leads it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call for the key is in flight."""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Call `fn`, or wait for the in-flight call with the same key."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as ex:
+            self._forget(key)
+            future.set_exception(ex)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()`, or wait for the in-flight call with the same key."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn()
+        except BaseException as ex:
+            self._forget(key)
+            future.set_exception(ex)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
@@ -0,0 +1,149 @@
+"""Compact position and span types for hot loops.
+
+`Position` and `LineSpan` are slotted, frozen dataclasses: no validation,
+and a fraction of the memory of the pydantic `FilePosition` and `FileRange`
+models. `SpanArray` stores large batches of line spans column by column, in
+typed arrays, with file paths interned once; `reviewer.preview_diffs`
+gathers the context lines of a batch of suggestions in one, and reads them
+with `file_ops.read_spans`.
+
+Use these internally, and convert to the pydantic models (with
+`FilePosition.from_position` and `FileRange.from_span`) only at API and
+serialization boundaries.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class Position:
+    """A 1-based line and 0-based column in a file."""
+    file: Path
+    line: int
+    column: int
+
+    def line_start(self) -> "Position":
+        """Position of the start of the line."""
+        return Position(self.file, self.line, 0)
+
+    def current_line(self) -> "LineSpan":
+        """Span of the position's line."""
+        return LineSpan(self.file, self.line, self.line)
+
+    def previous_lines(self, lines: int) -> "LineSpan":
+        """Span of up to `lines` lines before the position's line (empty on the first line)."""
+        return LineSpan(self.file, max(1, self.line - lines), self.line - 1)
+
+    def next_lines(self, lines: int, line_count: int) -> "LineSpan":
+        """Span of up to `lines` lines after the position's line (empty on the last line)."""
+        return LineSpan(self.file, self.line + 1, min(self.line + lines, line_count))
+
+
+@dataclass(frozen=True, slots=True)
+class LineSpan:
+    """Lines `start` to `end` of a file, 1-based and inclusive. Empty if `end < start`."""
+    file: Path
+    start: int
+    end: int
+
+    def __len__(self) -> int:
+        return max(0, self.end - self.start + 1)
+
+    def start_position(self) -> Position:
+        """Position of the start of the first line."""
+        return Position(self.file, self.start, 0)
+
+    def previous_lines(self, lines: int) -> "LineSpan":
+        """Span of up to `lines` lines before this span."""
+        return LineSpan(self.file, max(1, self.start - lines), self.start - 1)
+
+    def next_lines(self, lines: int, line_count: int) -> "LineSpan":
+        """Span of up to `lines` lines after this span."""
+        return LineSpan(self.file, self.end + 1, min(self.end + lines, line_count))
+
+    def text(self, lines: Sequence[str]) -> str:
+        """Text of the span, given the file's lines without line endings. Empty for an empty span."""
+        if self.end < self.start:
+            return ""
+        return "\n".join(lines[self.start - 1:self.end]) + "\n"
+
+
+class SpanArray:
+    """Columnar container of line spans.
+
+    Each span costs three machine integers (file id, start, end) instead of
+    a Python object; the file of every span is stored once in `files`.
+    """
+
+    __slots__ = ("files", "_file_ids", "file_ids", "starts", "ends")
+
+    def __init__(self, spans: Iterable[LineSpan] = ()) -> None:
+        self.files: list[Path] = []
+        self._file_ids: dict[Path, int] = {}
+        self.file_ids = array("I")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.extend(spans)
+
+    def _file_id(self, file: Path) -> int:
+        file_id = self._file_ids.get(file)
+        if file_id is None:
+            file_id = self._file_ids[file] = len(self.files)
+            self.files.append(file)
+        return file_id
+
+    def append(self, file: Path, start: int, end: int) -> None:
+        """Add a span."""
+        self.file_ids.append(self._file_id(file))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def extend(self, spans: Iterable[LineSpan]) -> None:
+        """Add spans."""
+        for span in spans:
+            self.append(span.file, span.start, span.end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> LineSpan:
+        return LineSpan(self.files[self.file_ids[index]], self.starts[index], self.ends[index])
+
+    def __iter__(self) -> Iterator[LineSpan]:
+        files = self.files
+        for file_id, start, end in zip(self.file_ids, self.starts, self.ends):
+            yield LineSpan(files[file_id], start, end)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the span columns (not counting the interned paths)."""
+        return sum(column.itemsize * len(column) for column in (self.file_ids, self.starts, self.ends))
+
+    def for_file(self, file: Path) -> "SpanArray":
+        """Spans of one file."""
+        selected = SpanArray()
+        file_id = self._file_ids.get(file)
+        if file_id is None:
+            return selected
+        new_id = selected._file_id(file)
+        for index, span_file_id in enumerate(self.file_ids):
+            if span_file_id == file_id:
+                selected.file_ids.append(new_id)
+                selected.starts.append(self.starts[index])
+                selected.ends.append(self.ends[index])
+        return selected
+
+    def sorted(self) -> "SpanArray":
+        """Spans sorted by file, start and end."""
+        files, starts, ends, file_ids = self.files, self.starts, self.ends, self.file_ids
+        order = sorted(range(len(self)), key=lambda index: (files[file_ids[index]], starts[index], ends[index]))
+        result = SpanArray()
+        result.files = list(files)
+        result._file_ids = dict(self._file_ids)
+        result.file_ids = array("I", (file_ids[index] for index in order))
+        result.starts = array("q", (starts[index] for index in order))
+        result.ends = array("q", (ends[index] for index in order))
+        return result
@@ -0,0 +1,317 @@
+"""Persistent SQLite index of a project's modules, classes and functions.
+
+For every indexed file the index stores its mtime, size and content hash,
+and every symbol defined in it: kind, qualified name, line span, whether it
+is public and whether it has a docstring. `update` re-parses only files whose
+content changed, so keeping the index current is cheap, and project-wide
+questions become single queries:
+
+    index = SymbolIndex()
+    index.update_project(Path("."))
+    for symbol in index.missing_docstrings(kinds=("function",)):
+        print(symbol.path, symbol.qualname)
+"""
+
+import ast
+import hashlib
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_PATH = ".cache/symbol-index.sqlite3"
+# Bump when the schema or what `extract_symbols` finds changes, to rebuild existing indexes.
+INDEX_VERSION = 1
+SYMBOL_KINDS = ("module", "class", "function", "method")
+_MAX_QUERY_PARAMETERS = 500
+PARALLEL_PARSE_THRESHOLD = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    is_public INTEGER NOT NULL,
+    has_docstring INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_path ON symbols (path);
+CREATE INDEX IF NOT EXISTS symbols_missing_docstrings ON symbols (has_docstring, kind, is_public);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Symbol:
+    """A module, class, function or method, as stored in the index."""
+    path: str
+    kind: str
+    name: str
+    qualname: str
+    start_line: int
+    end_line: int
+    is_public: bool
+    has_docstring: bool
+
+
+def _is_public_name(name: str) -> bool:
+    return not name.startswith("_") or (name.startswith("__") and name.endswith("__"))
+
+
+def _has_docstring(node: ast.AST) -> bool:
+    body = getattr(node, "body", None)
+    return bool(
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    )
+
+
+def extract_symbols(path: str, source: str) -> list[Symbol]:
+    """Symbols defined in Python source; the module itself comes first.
+
+    Returns an empty list if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    line_count = source.count("\n") + (not source.endswith("\n") and bool(source))
+    symbols = [Symbol(path, "module", Path(path).stem, "", 1, max(line_count, 1), True, _has_docstring(tree))]
+
+    def visit(node: ast.AST, prefix: str, public: bool, in_class: bool) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = f"{prefix}{child.name}"
+                is_public = public and _is_public_name(child.name)
+                if isinstance(child, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if in_class else "function"
+                decorators = [decorator.lineno for decorator in child.decorator_list]
+                symbols.append(Symbol(
+                    path,
+                    kind,
+                    child.name,
+                    qualname,
+                    min([child.lineno, *decorators]),
+                    child.end_lineno or child.lineno,
+                    is_public,
+                    _has_docstring(child),
+                ))
+                # Functions nested in functions are not part of the public API.
+                nested_public = is_public and isinstance(child, ast.ClassDef)
+                visit(child, f"{qualname}.", nested_public, isinstance(child, ast.ClassDef))
+            elif not isinstance(child, ast.expr):
+                visit(child, prefix, public, in_class)
+
+    visit(tree, "", True, False)
+    return symbols
+
+
+def _read_file(key: str, previous_hash: str | None) -> tuple[str, int, int, str, list[Symbol] | None] | None:
+    """Hash and parse a file; symbols are None if its content hash is `previous_hash`.
+
+    Returns None if the file is gone.
+    """
+    try:
+        stat = os.stat(key)
+        data = Path(key).read_bytes()
+    except FileNotFoundError:
+        return None
+    content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if content_hash == previous_hash:
+        return key, stat.st_mtime_ns, stat.st_size, content_hash, None
+    try:
+        symbols = extract_symbols(key, data.decode("utf-8"))
+    except UnicodeDecodeError:
+        symbols = []
+    return key, stat.st_mtime_ns, stat.st_size, content_hash, symbols
+
+
+class SymbolIndex:
+    """SQLite index of the symbols of Python files, updated incrementally."""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH) -> None:
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._connection.executescript(_SCHEMA)
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or int(row[0]) != INDEX_VERSION:
+                self._connection.executescript("DELETE FROM symbols; DELETE FROM files;")
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(INDEX_VERSION),)
+                )
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return os.path.abspath(file_path)
+
+    def _stored(self, keys: list[str]) -> dict[str, tuple[int, int, str]]:
+        """Stored (mtime, size, hash) of files, reading the whole table only for large batches."""
+        query = "SELECT path, mtime_ns, size, content_hash FROM files"
+        with self._lock:
+            if len(keys) > _MAX_QUERY_PARAMETERS:
+                rows = self._connection.execute(query)
+            else:
+                rows = self._connection.execute(f"{query} WHERE path IN ({', '.join('?' * len(keys))})", keys)
+            return {path: (mtime_ns, size, content_hash) for path, mtime_ns, size, content_hash in rows}
+
+    def update(self, files: Iterable[Path], *, workers: int | None = None) -> int:
+        """Bring the index up to date for files; return the number of files re-parsed.
+
+        Files whose mtime and size are unchanged are skipped without reading
+        them; files whose content hash is unchanged are not re-parsed. Files
+        that no longer exist are dropped. Large batches are parsed in a pool
+        of `workers` processes (default: the number of CPUs).
+        """
+        keys = list(dict.fromkeys(self._key(file_path) for file_path in files))
+        stored = self._stored(keys)
+        changed: list[tuple[str, str | None]] = []
+        removed: list[str] = []
+        for key in keys:
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                if key in stored:
+                    removed.append(key)
+                continue
+            previous = stored.get(key)
+            if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            changed.append((key, previous[2] if previous is not None else None))
+
+        if len(changed) >= PARALLEL_PARSE_THRESHOLD and workers != 0:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_read_file, *zip(*changed), chunksize=16))
+        else:
+            results = [_read_file(key, previous_hash) for key, previous_hash in changed]
+        removed.extend(key for (key, previous_hash), result in zip(changed, results) if result is None and previous_hash)
+        results = [result for result in results if result is not None]
+        touched = [(mtime_ns, size, key) for key, mtime_ns, size, _, symbols in results if symbols is None]
+        parsed = [result for result in results if result[4] is not None]
+
+        if not (touched or parsed or removed):
+            return 0
+        with self._lock, self._transaction():
+            self._connection.executemany("DELETE FROM files WHERE path = ?", [(key,) for key in removed])
+            self._connection.executemany("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", touched)
+            for key, mtime_ns, size, content_hash, symbols in parsed:
+                self._connection.execute("DELETE FROM files WHERE path = ?", (key,))
+                self._connection.execute(
+                    "INSERT INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+                    (key, mtime_ns, size, content_hash),
+                )
+                self._connection.executemany(
+                    "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (s.path, s.kind, s.name, s.qualname, s.start_line, s.end_line, s.is_public, s.has_docstring)
+                        for s in symbols
+                    ],
+                )
+        return len(parsed)
+
+    def update_project(self, root: Path, *, workers: int | None = None) -> int:
+        """Index every Python file under a directory, dropping files that are gone; return the count re-parsed."""
+        from auto_sdlc.project_reviewer import find_python_files
+
+        files = find_python_files(root)
+        prefix = os.path.join(os.path.abspath(root), "")
+        with self._lock:
+            indexed = [
+                Path(path)
+                for (path,) in self._connection.execute(
+                    "SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+                )
+            ]
+        seen = {self._key(file) for file in files}
+        return self.update([*files, *(path for path in indexed if str(path) not in seen)], workers=workers)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _symbols(self, where: str, parameters: tuple = ()) -> list[Symbol]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT path, kind, name, qualname, start_line, end_line, is_public, has_docstring "
+                f"FROM symbols WHERE {where} ORDER BY path, start_line",
+                parameters,
+            ).fetchall()
+        return [
+            Symbol(path, kind, name, qualname, start, end, bool(is_public), bool(has_docstring))
+            for path, kind, name, qualname, start, end, is_public, has_docstring in rows
+        ]
+
+    def symbols(self, file_path: Path) -> list[Symbol]:
+        """Symbols of an indexed file, in source order."""
+        return self._symbols("path = ?", (self._key(file_path),))
+
+    def missing_docstrings(
+        self,
+        *,
+        kinds: Iterable[str] = SYMBOL_KINDS,
+        public_only: bool = True,
+    ) -> list[Symbol]:
+        """Symbols without a docstring, across every indexed file."""
+        kinds = tuple(kinds)
+        placeholders = ", ".join("?" * len(kinds))
+        where = f"has_docstring = 0 AND kind IN ({placeholders})"
+        if public_only:
+            where += " AND is_public = 1"
+        return self._symbols(where, kinds)
+
+    def has_module_docstring(self, file_path: Path) -> bool | None:
+        """Whether a file has a module docstring, updating its entry first if it changed.
+
+        Returns None for files that do not parse.
+        """
+        self.update([file_path])
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT has_docstring FROM symbols WHERE path = ? AND kind = 'module'", (self._key(file_path),)
+            ).fetchone()
+        return bool(row[0]) if row is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            paths = [path for (path,) in self._connection.execute("SELECT path FROM files ORDER BY path")]
+        return iter(paths)
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,46 @@
+"""Compare two JSON reports of `python -m benchmarks.run`.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 1.25]
+
+Exits with status 1 if any benchmark got slower by more than the threshold
+factor.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: str) -> dict[tuple[str, int], dict]:
+    """Results of a report, keyed by (name, size)."""
+    report = json.loads(Path(path).read_text())
+    return {(result["name"], result["size"]): result for result in report["results"]}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown factor that counts as a regression.")
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    print(f"{'benchmark':<32} {'size':>9} {'before':>12} {'after':>12} {'ratio':>7}")
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]["seconds_per_call"]
+        after = current[key]["seconds_per_call"]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:<32} {key[1]:>9} {before * 1000:>10.3f}ms {after * 1000:>10.3f}ms {ratio:>7.2f}{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
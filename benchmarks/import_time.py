@@ -0,0 +1,55 @@
+"""Benchmark cold-start import time of the auto_sdlc modules.
+
+Each module is imported in a fresh interpreter, several times, and the median
+wall-clock time is reported.
+
+Usage:
+    python -m benchmarks.import_time [--repeat N] [--json PATH]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = [
+    "auto_sdlc.file_ops",
+    "auto_sdlc.python_developer",
+    "auto_sdlc.ask",
+    "auto_sdlc.reviewer",
+]
+
+
+def time_import(module: str, repeat: int) -> float:
+    """Median seconds to start an interpreter and import a module."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path.")
+    args = parser.parse_args()
+
+    baseline = time_import("sys", args.repeat)
+    results = {"interpreter": baseline}
+    print(f"{'interpreter startup':<30} {baseline * 1000:8.1f} ms")
+    for module in MODULES:
+        seconds = time_import(module, args.repeat)
+        results[module] = seconds
+        print(f"{module:<30} {seconds * 1000:8.1f} ms  (+{(seconds - baseline) * 1000:.1f} ms)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump({"import_time_seconds": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Benchmark file_ops, python_developer and reviewer on large synthetic files.
+
+Every operation is timed on synthetic modules of increasing size, and on a
+synthetic many-file repository. Throughput and peak memory are reported, and
+results can be saved as JSON and compared between commits with
+`python -m benchmarks.compare`.
+
+Usage:
+    python -m benchmarks.run [--sizes 1000,10000,100000,1000000] [--repo-files 500] [--spans 100000] [--json PATH]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from auto_sdlc import file_ops
+from auto_sdlc.file_ops import FilePosition, FileRange, insert_lines
+from auto_sdlc.python_developer import get_docstring, set_docstring
+from auto_sdlc.reviewer import EditSuggestion, _generate_diff, preview_diffs
+from auto_sdlc.search import search_file, search_project
+from auto_sdlc.spans import LineSpan, Position, SpanArray
+from benchmarks.synthetic import write_synthetic_module, write_synthetic_repo
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_REPO_FILES = 500
+DEFAULT_SPANS = 100_000
+MIN_TIME_SECONDS = 0.2
+MAX_CALLS = 10_000
+SEARCH_MARKERS = ('"""', "TODO", "# noqa", "# type: ignore")
+
+
+@dataclass
+class Result:
+    """Timing of one benchmark."""
+    name: str
+    size: int
+    calls: int
+    seconds_per_call: float
+    calls_per_second: float
+    lines_per_second: float
+    peak_memory_bytes: int
+
+
+def _nothing() -> None:
+    pass
+
+
+def measure(
+    name: str,
+    size: int,
+    fn: Callable[[], object],
+    *,
+    lines: int | None = None,
+    min_time: float = MIN_TIME_SECONDS,
+    setup: Callable[[], object] | None = None,
+) -> Result:
+    """Time `fn` until it has run for `min_time` seconds, then measure its peak memory once.
+
+    `setup` runs, untimed, before every call of `fn`, for example to undo what
+    the previous call changed.
+    """
+    if setup is None:
+        setup = _nothing
+    setup()
+    fn()  # Warm up.
+    gc.collect()
+    calls = 0
+    elapsed = 0.0
+    while calls == 0 or (elapsed < min_time and calls < MAX_CALLS):
+        setup()
+        start = time.perf_counter()
+        fn()
+        elapsed += time.perf_counter() - start
+        calls += 1
+
+    setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds_per_call = elapsed / calls
+    return Result(
+        name=name,
+        size=size,
+        calls=calls,
+        seconds_per_call=seconds_per_call,
+        calls_per_second=1 / seconds_per_call,
+        lines_per_second=(lines if lines is not None else size) / seconds_per_call,
+        peak_memory_bytes=peak,
+    )
+
+
+def bench_file(directory: Path, size: int, *, min_time: float = MIN_TIME_SECONDS) -> list[Result]:
+    """Benchmark single-file operations on a synthetic module of `size` lines."""
+    path = write_synthetic_module(directory / f"module_{size}.py", size)
+    file_ops.clear_documents()
+    text = path.read_text()
+    line_count = len(text.splitlines())
+    middle = line_count // 2
+    middle_index = FilePosition(file=path, line=middle, column=4).index
+    position = FilePosition(file=path, line=middle, column=4)
+    file_range = FileRange(file=path, start=middle, end=middle + 9)
+    range_text = file_range.text
+    docstring = get_docstring(path)
+    changed_text = text.replace("function_1(", "function_one(", 1)
+    edit = EditSuggestion(target=file_range, suggested_text="pass\n", description="Replace lines.")
+    edits = [
+        EditSuggestion(target=FileRange(file=path, start=line, end=line), suggested_text="pass\n", description="")
+        for line in range(1, line_count + 1, max(1, line_count // 100))
+    ]
+
+    def set_range_text() -> None:
+        file_range.text = range_text
+
+    def restore() -> None:
+        # Through the shared buffer, so the next call does not re-read the file.
+        if file_ops.get_document(path).text != text:
+            file_ops.get_document(path).write_text(text)
+
+    # Benchmarks that change the file restore it before every call, so each
+    # benchmark measures the same file.
+    benchmarks: list[tuple[str, Callable[[], object], Callable[[], object] | None]] = [
+        ("FilePosition.from_index", lambda: FilePosition.from_index(path, middle_index), None),
+        ("FilePosition.index", lambda: position.index, None),
+        ("FilePosition.find_next", lambda: position.find_next("return"), None),
+        ("FileRange.text (get)", lambda: file_range.text, None),
+        ("FileRange.text (set)", set_range_text, restore),
+        ("insert_lines", lambda: insert_lines(path, "# inserted", at_line=middle), restore),
+        ("get_docstring", lambda: get_docstring(path), None),
+        ("set_docstring", lambda: set_docstring(path, docstring), restore),
+        ("reviewer._generate_diff", lambda: _generate_diff(text, changed_text), None),
+        ("EditSuggestion.diff", lambda: edit.diff, None),
+        ("EditSuggestion.diff (100 edits)", lambda: [edit.diff for edit in edits], None),
+        ("preview_diffs (100 edits)", lambda: preview_diffs(edits), None),
+        ("search_file (markers)", lambda: search_file(path, SEARCH_MARKERS), None),
+        ("search_file (markers, mmap)", lambda: search_file(path, SEARCH_MARKERS, mmap_threshold=0), None),
+    ]
+    results = []
+    for name, fn, setup in benchmarks:
+        results.append(measure(name, size, fn, min_time=min_time, setup=setup))
+        if setup is not None:
+            setup()
+    return results
+
+
+def bench_repo(directory: Path, files: int, *, min_time: float = MIN_TIME_SECONDS) -> list[Result]:
+    """Benchmark scanning a synthetic repository of `files` modules."""
+    lines_per_file = 200
+    paths = write_synthetic_repo(directory / "repo", files, lines_per_file=lines_per_file)
+
+    def scan_docstrings() -> None:
+        file_ops.clear_documents()
+        for path in paths:
+            get_docstring(path)
+
+    return [
+        measure(
+            "repo: get_docstring per file",
+            files,
+            scan_docstrings,
+            lines=files * lines_per_file,
+            min_time=min_time,
+        ),
+        measure(
+            "repo: search_project (markers)",
+            files,
+            lambda: list(search_project(directory / "repo", SEARCH_MARKERS, workers=0)),
+            lines=files * lines_per_file,
+            min_time=min_time,
+        ),
+    ]
+
+
+def bench_spans(count: int, *, min_time: float = MIN_TIME_SECONDS) -> list[Result]:
+    """Benchmark creating `count` positions and spans as pydantic models and as lightweight types."""
+    files = [Path(f"package/module_{index}.py") for index in range(100)]
+
+    def file_ranges() -> list[FileRange]:
+        return [FileRange(file=files[index % 100], start=index, end=index + 9) for index in range(count)]
+
+    def line_spans() -> list[LineSpan]:
+        return [LineSpan(files[index % 100], index, index + 9) for index in range(count)]
+
+    def span_array() -> SpanArray:
+        spans = SpanArray()
+        for index in range(count):
+            spans.append(files[index % 100], index, index + 9)
+        return spans
+
+    benchmarks: list[tuple[str, Callable[[], object]]] = [
+        ("spans: FilePosition", lambda: [FilePosition(file=files[0], line=index, column=4) for index in range(count)]),
+        ("spans: Position", lambda: [Position(files[0], index, 4) for index in range(count)]),
+        ("spans: FileRange", file_ranges),
+        ("spans: LineSpan", line_spans),
+        ("spans: SpanArray", span_array),
+    ]
+    return [measure(name, count, fn, min_time=min_time) for name, fn in benchmarks]
+
+
+def git_commit() -> str | None:
+    """Current git commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated file sizes, in lines.",
+    )
+    parser.add_argument("--repo-files", type=int, default=DEFAULT_REPO_FILES)
+    parser.add_argument("--spans", type=int, default=DEFAULT_SPANS, help="Number of positions and spans to create.")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME_SECONDS, help="Seconds to run each benchmark.")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            results.extend(bench_file(Path(directory), size, min_time=args.min_time))
+        if args.repo_files:
+            results.extend(bench_repo(Path(directory), args.repo_files, min_time=args.min_time))
+        if args.spans:
+            results.extend(bench_spans(args.spans, min_time=args.min_time))
+
+    print(f"{'benchmark':<32} {'size':>9} {'calls/s':>12} {'lines/s':>14} {'peak MiB':>9}")
+    for result in results:
+        print(
+            f"{result.name:<32} {result.size:>9} {result.calls_per_second:>12.1f} "
+            f"{result.lines_per_second:>14.0f} {result.peak_memory_bytes / 2 ** 20:>9.2f}"
+        )
+
+    if args.json_path:
+        report = {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": [asdict(result) for result in results],
+        }
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Generators of synthetic Python files and repositories for benchmarks."""
+
+import random
+from pathlib import Path
+
+FUNCTION_TEMPLATE = '''\
+def function_{index}(value, *, scale={scale}):
+    """Return the value scaled by {scale}.
+
+    Generated for benchmarking.
+    """
+    result = value * scale
+    if result > {threshold}:
+        return result - {threshold}
+    return result
+
+'''
+MODULE_DOCSTRING = '"""Synthetic module for benchmarks."""\n\n'
+
+
+def synthetic_module(lines: int, *, seed: int = 0, docstring: bool = True) -> str:
+    """Python source of about `lines` lines, made of small documented functions."""
+    rng = random.Random(seed)
+    parts = [MODULE_DOCSTRING] if docstring else []
+    line_count = 2 if docstring else 0
+    index = 0
+    while line_count < lines:
+        function = FUNCTION_TEMPLATE.format(
+            index=index,
+            scale=rng.randint(2, 9),
+            threshold=rng.randint(10, 1000),
+        )
+        parts.append(function)
+        line_count += function.count("\n")
+        index += 1
+    return "".join(parts)
+
+
+def write_synthetic_module(path: Path, lines: int, *, seed: int = 0, docstring: bool = True) -> Path:
+    """Write a synthetic module of about `lines` lines."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(synthetic_module(lines, seed=seed, docstring=docstring))
+    return path
+
+
+def write_synthetic_repo(root: Path, files: int, *, lines_per_file: int = 200, packages: int = 10) -> list[Path]:
+    """Write a repository of `files` synthetic modules spread over `packages` packages.
+
+    Every third module has no module docstring.
+    """
+    paths = []
+    for index in range(files):
+        path = root / f"package_{index % packages}" / f"module_{index}.py"
+        paths.append(write_synthetic_module(path, lines_per_file, seed=index, docstring=index % 3 != 0))
+    return paths
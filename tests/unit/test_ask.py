@@ -0,0 +1,333 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auto_sdlc import ask, llm_backends
+from auto_sdlc.llm_cache import ResponseCache
+from auto_sdlc.similarity_cache import ApproximateAnswer, SimilarityIndex
+
+
+class FakeLLM:
+    """Stand-in LLM that echoes prompts and tracks concurrent requests."""
+
+    def __init__(self, reply: str = "yes") -> None:
+        self.reply = reply
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def invoke(self, prompt: str) -> str:
+        self.calls.append(prompt)
+        return self.reply
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.reply
+
+
+@pytest.fixture(autouse=True)
+def llm_cache(tmp_path, monkeypatch) -> ResponseCache:
+    cache = ResponseCache(tmp_path / "llm")
+    monkeypatch.setattr(ask, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch) -> FakeLLM:
+    llm = FakeLLM()
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    return llm
+
+
+def _unique_prompt() -> str:
+    return f"Is {uuid.uuid4()} a UUID?"
+
+
+def test_aget_answer_shares_memoized_answers(fake_llm: FakeLLM):
+    prompt = _unique_prompt()
+    assert asyncio.run(ask.aget_answer(prompt)) == "yes"
+    assert ask.get_answer(prompt) == "yes"
+    assert len(fake_llm.calls) == 1
+
+
+def test_get_answers_limits_concurrency(fake_llm: FakeLLM):
+    prompts = [_unique_prompt() for _ in range(10)]
+    assert ask.get_answers(prompts, max_concurrency=3) == ["yes"] * 10
+    assert fake_llm.max_in_flight == 3
+
+    fake_llm.calls.clear()
+    ask.get_answers(prompts)
+    assert fake_llm.calls == []
+
+
+def test_ayes_or_no(fake_llm: FakeLLM):
+    assert asyncio.run(ask.ayes_or_no(_unique_prompt())).answer is True
+
+
+class StreamingFakeLLM(FakeLLM):
+    """Stand-in LLM that streams its reply word by word."""
+
+    def __init__(self, reply: str) -> None:
+        super().__init__(reply)
+        self.chunks_sent = 0
+
+    def _chunks(self) -> list[str]:
+        return [word + " " for word in self.reply.split(" ")]
+
+    def stream(self, prompt: str):
+        self.calls.append(prompt)
+        for chunk in self._chunks():
+            self.chunks_sent += 1
+            yield chunk
+
+    async def astream(self, prompt: str):
+        self.calls.append(prompt)
+        for chunk in self._chunks():
+            self.chunks_sent += 1
+            yield chunk
+
+
+@pytest.mark.parametrize(
+    "text, complete, verdict",
+    [
+        ("Yes, because the docstring is valid.", True, True),
+        ("no.", True, False),
+        ('"Y"', True, True),
+        ("Ye", False, None),
+        ("Yes", False, None),
+        ("Yes,", False, True),
+        ("No ", False, False),
+        ("The", False, None),
+        ("The answer is yes", False, False),
+        ("The answer is yes", True, False),
+        ("...", False, None),
+        ("42 is", False, False),
+    ],
+)
+def test_parse_verdict(text: str, complete: bool, verdict: bool | None):
+    assert ask.parse_verdict(text, complete=complete) is verdict
+
+
+def test_yes_or_no_stream_stops_early(monkeypatch):
+    llm = StreamingFakeLLM("Yes, and here is a long explanation of why.")
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    prompt = _unique_prompt()
+    response = ask.yes_or_no(prompt, stream=True)
+    assert response.answer is True
+    assert response.truncated is True
+    assert response.full_response == "Yes, "
+    assert llm.chunks_sent == 1
+
+    assert ask.yes_or_no(prompt, stream=True) == response
+    assert len(llm.calls) == 1
+
+
+def test_yes_or_no_stream_stops_after_a_first_word_that_is_not_a_verdict(monkeypatch):
+    llm = StreamingFakeLLM("Perhaps, it depends on the docstring style.")
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    response = ask.yes_or_no(_unique_prompt(), stream=True)
+    assert response.answer is False
+    assert response.truncated is True
+    assert response.full_response == "Perhaps, "
+    assert llm.chunks_sent == 1
+
+
+def test_ayes_or_no_stream_stops_early(monkeypatch):
+    llm = StreamingFakeLLM("No. It is missing the closing quotes.")
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    response = asyncio.run(ask.ayes_or_no(_unique_prompt(), stream=True))
+    assert response.answer is False
+    assert response.full_response == "No. "
+    assert llm.chunks_sent == 1
+
+
+class SlowFakeLLM(FakeLLM):
+    """Stand-in LLM that takes a while to answer."""
+
+    def invoke(self, prompt: str) -> str:
+        time.sleep(0.05)
+        return super().invoke(prompt)
+
+
+def test_get_answer_coalesces_concurrent_threads(monkeypatch):
+    llm = SlowFakeLLM()
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    prompt = _unique_prompt()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        answers = list(executor.map(ask.get_answer, [prompt] * 5))
+    assert answers == ["yes"] * 5
+    assert len(llm.calls) == 1
+
+
+def test_aget_answer_coalesces_concurrent_tasks(fake_llm: FakeLLM):
+    prompt = _unique_prompt()
+
+    async def ask_many() -> list[str]:
+        return await asyncio.gather(*(ask.aget_answer(prompt) for _ in range(5)))
+
+    assert asyncio.run(ask_many()) == ["yes"] * 5
+    assert len(fake_llm.calls) == 1
+
+
+def test_cancelling_while_waiting_for_the_process_lock_does_not_keep_it(fake_llm: FakeLLM):
+    prompt = _unique_prompt()
+    holder = ask._process_lock(ask._cache_key(prompt))
+    holder.acquire()
+
+    async def cancel_while_waiting() -> None:
+        task = asyncio.create_task(ask.aget_answer(prompt))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        holder.release()
+        # The waiting thread gets the lock now, and hands it back.
+        await asyncio.sleep(0.2)
+
+    asyncio.run(cancel_while_waiting())
+    assert not ask._process_lock(ask._cache_key(prompt)).locked()
+    assert fake_llm.calls == []
+
+
+def test_formatting_variants_share_one_flight(fake_llm: FakeLLM):
+    prompt = _unique_prompt()
+    variants = [prompt, f"  {prompt}\n", prompt.replace(" ", "\n  "), f"{prompt}\n\n"]
+
+    async def ask_many() -> list[str]:
+        return await asyncio.gather(*(ask.aget_answer(variant) for variant in variants))
+
+    assert asyncio.run(ask_many()) == ["yes"] * 4
+    assert len(fake_llm.calls) == 1
+
+    # Processes lock and cache the same key, so every variant reads the cached answer.
+    assert len({ask._cache_key(variant) for variant in variants}) == 1
+    assert [ask.get_answer(variant) for variant in variants] == ["yes"] * 4
+    assert len(fake_llm.calls) == 1
+
+
+def test_answers_are_cached_per_model(fake_llm: FakeLLM):
+    prompt = _unique_prompt()
+    try:
+        llm_backends.use_backend("ollama", model="llama-2")
+        ask.get_answer(prompt)
+        ask.get_answer(prompt)
+        llm_backends.use_backend("ollama", model="mistral")
+        ask.get_answer(prompt)
+    finally:
+        llm_backends.reset()
+    assert len(fake_llm.calls) == 2
+
+
+class BatchFakeLLM(FakeLLM):
+    """Stand-in LLM that answers numbered batch prompts, skipping some questions."""
+
+    def __init__(self, skip: frozenset[int] = frozenset()) -> None:
+        super().__init__("yes")
+        self.skip = skip
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls.append(prompt)
+        if not prompt.startswith("Answer each"):
+            return "No."
+        count = int(prompt.split()[5])
+        return "\n".join(f"{number}. {'yes' if number % 2 else 'no'}" for number in range(1, count + 1) if number not in self.skip)
+
+
+def test_parse_batch_verdicts():
+    text = "1. Yes\n2) no, it is not\n3. maybe\n4. yes\n4. no\nAnswer 5: YES"
+    assert ask.parse_batch_verdicts(text, 6) == ["Yes", "no, it is not", None, None, "YES", None]
+
+
+def test_yes_or_no_batch_packs_questions_and_caches_each_answer(monkeypatch):
+    llm = BatchFakeLLM()
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    questions = [_unique_prompt() for _ in range(25)]
+    responses = ask.yes_or_no_batch(questions + questions[:2], batch_size=10)
+    assert len(llm.calls) == 3
+    assert [response.answer for response in responses] == [index % 10 % 2 == 0 for index in range(25)] + [True, False]
+
+    llm.calls.clear()
+    assert ask.yes_or_no(questions[1]).answer is False
+    assert llm.calls == []
+
+
+def test_yes_or_no_batch_falls_back_to_single_questions(monkeypatch):
+    llm = BatchFakeLLM(skip=frozenset({2}))
+    monkeypatch.setattr(ask, "get_llm", lambda: llm)
+    questions = [_unique_prompt() for _ in range(3)]
+    responses = ask.yes_or_no_batch(questions)
+    assert [response.answer for response in responses] == [True, False, True]
+    assert len(llm.calls) == 2
+    assert responses[1].full_response == "No."
+
+
+def test_suggest_docstring_sends_small_files_whole(tmp_path, fake_llm: FakeLLM):
+    fake_llm.reply = 'Here it is:\n"""Adds numbers.\n\nWith detail.\n"""'
+    file = tmp_path / "small.py"
+    file.write_text(f"def add(a, b):\n    return a + b  # {uuid.uuid4()}\n")
+    assert ask.suggest_docstring(file) == '"""Adds numbers.\n\nWith detail.\n"""\n'
+    assert len(fake_llm.calls) == 1
+    assert "return a + b" in fake_llm.calls[0]
+
+
+def test_suggest_docstring_map_reduces_large_files(tmp_path, fake_llm: FakeLLM):
+    fake_llm.reply = "Does things."
+    marker = uuid.uuid4()
+    functions = [f"def function_{index}():\n    return '{marker}' * {index}\n\n\n" for index in range(12)]
+    file = tmp_path / "large.py"
+    file.write_text("".join(functions))
+    assert ask.suggest_docstring(file, max_chunk_tokens=30) == '"""Does things."""\n'
+    summaries = [call for call in fake_llm.calls if call.startswith("Answer the following question: Summarize")]
+    assert len(summaries) == 12
+    assert not any("def function_" in call for call in fake_llm.calls if call not in summaries)
+
+    fake_llm.calls.clear()
+    functions[3] = f"def function_3():\n    return '{marker}' * 333\n\n\n"
+    file.write_text("".join(functions))
+    ask.suggest_docstring(file, max_chunk_tokens=30)
+    summaries = [call for call in fake_llm.calls if call.startswith("Answer the following question: Summarize")]
+    assert len(summaries) == 1
+    assert "* 333" in summaries[0]
+
+
+@pytest.fixture
+def similarity_index(tmp_path, monkeypatch) -> SimilarityIndex:
+    index = SimilarityIndex(tmp_path / "similarity.sqlite3", threshold=0.8)
+    monkeypatch.setattr(ask, "_similarity_index", index)
+    yield index
+    index.close()
+
+
+def test_similar_questions_get_approximate_answers(fake_llm: FakeLLM, similarity_index: SimilarityIndex):
+    source = "\n".join(f"def function_{index}(value):\n    return value * {index}\n" for index in range(40))
+    question = f"Write a docstring for this module:\n{source}"
+    answer = ask.get_answer(question)
+    assert answer == "yes" and not isinstance(answer, ApproximateAnswer)
+    assert len(similarity_index) == 1
+
+    reformatted = question.replace("\n", "\n\n").replace("value * 7", "value * 70")
+    approximate = ask.get_answer(reformatted)
+    assert isinstance(approximate, ApproximateAnswer)
+    assert approximate == "yes"
+    assert 0.8 <= approximate.similarity < 1
+    assert asyncio.run(ask.aget_answer(reformatted)).approximate
+    assert len(fake_llm.calls) == 1
+
+    assert not isinstance(ask.get_answer("An unrelated question about something else entirely?"), ApproximateAnswer)
+    assert len(fake_llm.calls) == 2
+
+
+def test_approximate_tier_skips_evicted_answers(fake_llm: FakeLLM, similarity_index: SimilarityIndex, llm_cache):
+    question = "Is this a long enough question to shingle into several parts, or not really?"
+    ask.get_answer(question)
+    llm_cache.clear()
+    assert not isinstance(ask.get_answer(question + " "), ApproximateAnswer)
+    assert len(fake_llm.calls) == 2
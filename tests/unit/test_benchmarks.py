@@ -0,0 +1,29 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks import compare, run
+
+
+def test_benchmark_suite_smoke(tmp_path: Path, capsys):
+    report_path = tmp_path / "report.json"
+    run.main(["--sizes", "50", "--repo-files", "3", "--spans", "100", "--min-time", "0", "--json", str(report_path)])
+    report = json.loads(report_path.read_text())
+    names = {result["name"] for result in report["results"]}
+    assert "FilePosition.from_index" in names
+    assert "repo: get_docstring per file" in names
+    assert "spans: SpanArray" in names
+    assert all(result["calls_per_second"] > 0 for result in report["results"])
+
+    with pytest.raises(SystemExit) as info:
+        compare.main([str(report_path), str(report_path)])
+    assert info.value.code == 0
+
+
+def test_mutating_benchmarks_leave_the_file_unchanged(tmp_path: Path):
+    path = tmp_path / "module_50.py"
+    run.write_synthetic_module(path, 50)
+    text = path.read_text()
+    run.bench_file(tmp_path, 50, min_time=0.05)
+    assert path.read_text() == text
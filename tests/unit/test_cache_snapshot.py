@@ -0,0 +1,131 @@
+import json
+import lzma
+import time
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import ask, llm_backends
+from auto_sdlc.cache_snapshot import export_snapshot, import_snapshot, iter_snapshot, merge_snapshots
+from auto_sdlc.llm_cache import ResponseCache, main
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResponseCache:
+    cache = ResponseCache(tmp_path / "llm")
+    yield cache
+    cache.close()
+
+
+def _fill(cache: ResponseCache) -> None:
+    cache.set("b-key", "Yes.", tag="ollama/llama3")
+    cache.set("a-key", "Yes.", tag="ollama/llama3")
+    cache.set("c-key", "No.", tag="openai/gpt-4o")
+    cache.set("untagged", "Maybe.")
+    cache.set("expired", "Gone.", ttl=0.01, tag="ollama/llama3")
+    time.sleep(0.02)
+
+
+def test_export_stores_each_text_once_in_key_order(cache: ResponseCache, tmp_path: Path):
+    _fill(cache)
+    hits = cache.stats().hits
+    stats = export_snapshot(cache, tmp_path / "llm.snapshot")
+
+    assert (stats.entries, stats.blobs, stats.skipped) == (4, 3, 1)
+    assert cache.stats().hits == hits
+    entries = list(iter_snapshot(tmp_path / "llm.snapshot"))
+    assert [(entry.key, entry.tag, text) for entry, text in entries] == [
+        ("a-key", "ollama/llama3", "Yes."),
+        ("b-key", "ollama/llama3", "Yes."),
+        ("c-key", "openai/gpt-4o", "No."),
+        ("untagged", None, "Maybe."),
+    ]
+    with lzma.open(tmp_path / "llm.snapshot", "rt") as snapshot:
+        assert sum('"text"' in line for line in snapshot) == 3
+
+    # Same contents, same snapshot.
+    assert export_snapshot(cache, tmp_path / "again.snapshot").digest == stats.digest
+
+
+def test_import_filters_by_model_and_age_and_keeps_existing_entries(cache: ResponseCache, tmp_path: Path):
+    _fill(cache)
+    export_snapshot(cache, tmp_path / "llm.snapshot")
+
+    runner = ResponseCache(tmp_path / "runner")
+    try:
+        runner.set("a-key", "Local answer.")
+        stats = import_snapshot(runner, tmp_path / "llm.snapshot", models=["llama3"])
+        assert (stats.entries, stats.skipped) == (1, 3)
+        assert runner.get("a-key") == "Local answer."
+        assert runner.get("b-key") == "Yes."
+        assert "c-key" not in runner
+
+        assert import_snapshot(runner, tmp_path / "llm.snapshot", max_age=0).entries == 0
+        stats = import_snapshot(runner, tmp_path / "llm.snapshot", overwrite=True)
+        assert stats.entries == 4
+        assert runner.get("a-key") == "Yes."
+    finally:
+        runner.close()
+
+
+def test_import_keeps_the_original_store_time(cache: ResponseCache, tmp_path: Path):
+    cache.set("old", "Yes.", tag="ollama/llama3")
+    export_snapshot(cache, tmp_path / "llm.snapshot")
+    [(exported, _)] = iter_snapshot(tmp_path / "llm.snapshot")
+    time.sleep(0.05)
+
+    runner = ResponseCache(tmp_path / "runner")
+    try:
+        import_snapshot(runner, tmp_path / "llm.snapshot")
+        export_snapshot(runner, tmp_path / "again.snapshot")
+        [(reexported, _)] = iter_snapshot(tmp_path / "again.snapshot")
+        assert reexported.stored_at == exported.stored_at
+        assert runner.get("old") == "Yes."
+    finally:
+        runner.close()
+
+
+def test_merge_keeps_the_newest_entry_of_each_key(cache: ResponseCache, tmp_path: Path):
+    cache.set("shared", "Old.", tag="ollama/llama3")
+    cache.set("first", "One.", tag="ollama/llama3")
+    export_snapshot(cache, tmp_path / "first.snapshot")
+    cache.clear()
+    cache.set("shared", "New.", tag="ollama/llama3")
+    cache.set("second", "Two.", tag="ollama/llama3")
+    export_snapshot(cache, tmp_path / "second.snapshot")
+
+    stats = merge_snapshots([tmp_path / "first.snapshot", tmp_path / "second.snapshot"], tmp_path / "merged.snapshot")
+    assert (stats.entries, stats.skipped) == (3, 1)
+    merged = {entry.key: text for entry, text in iter_snapshot(tmp_path / "merged.snapshot")}
+    assert merged == {"first": "One.", "second": "Two.", "shared": "New."}
+
+
+def test_answers_are_tagged_with_their_model(cache: ResponseCache, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(ask, "_cache", cache)
+    monkeypatch.setattr(ask, "_invoke_llm", lambda input: "Yes.")
+    try:
+        llm_backends.use_backend("ollama", model="llama-2")
+        ask.get_answer("Is this tagged?")
+    finally:
+        llm_backends.reset()
+    export_snapshot(cache, tmp_path / "llm.snapshot")
+    [(entry, text)] = iter_snapshot(tmp_path / "llm.snapshot")
+    assert (entry.tag, text) == ("ollama/llama-2", "Yes.")
+
+
+def test_cli_exports_and_imports(cache: ResponseCache, tmp_path: Path, capsys):
+    _fill(cache)
+    cache.close()
+    main(["--directory", str(tmp_path / "llm"), "export", str(tmp_path / "llm.snapshot"), "--model", "openai/gpt-4o"])
+    assert json.loads(capsys.readouterr().out)["entries"] == 1
+    main(["--directory", str(tmp_path / "runner"), "import", str(tmp_path / "llm.snapshot")])
+    assert json.loads(capsys.readouterr().out)["entries"] == 1
+    main(["--directory", str(tmp_path / "merged"), "merge", str(tmp_path / "merged.snapshot"), str(tmp_path / "llm.snapshot")])
+    assert json.loads(capsys.readouterr().out)["entries"] == 1
+
+
+def test_import_rejects_other_files(cache: ResponseCache, tmp_path: Path):
+    with lzma.open(tmp_path / "other.xz", "wt") as other:
+        other.write('{"hello": "world"}\n')
+    with pytest.raises(ValueError, match="not a cache snapshot"):
+        import_snapshot(cache, tmp_path / "other.xz")
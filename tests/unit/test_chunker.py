@@ -0,0 +1,51 @@
+from textwrap import dedent
+
+from auto_sdlc.chunker import chunk_python_source
+
+
+def _function(name: str, lines: int) -> str:
+    body = "".join(f"    value_{index} = {index}\n" for index in range(lines))
+    return f"def {name}():\n{body}    return value_0\n\n\n"
+
+
+def test_chunks_cover_source_and_respect_budget():
+    source = "import os\n\n\n" + "".join(_function(f"function_{index}", 10) for index in range(30))
+    chunks = chunk_python_source(source, max_tokens=200)
+    assert "".join(chunk.text for chunk in chunks) == source
+    assert all(chunk.tokens <= 200 for chunk in chunks)
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_line == previous.end_line + 1
+        # Chunks start at function boundaries, with blank lines going to the next function.
+        assert chunk.text.lstrip("\n").startswith("def ")
+
+
+def test_large_class_is_split_along_its_methods():
+    methods = "".join("    " + line if line.strip() else line for line in _function("method", 40).splitlines(True))
+    source = "@decorator\nclass Big:\n" + methods * 5
+    chunks = chunk_python_source(source, max_tokens=300)
+    assert "".join(chunk.text for chunk in chunks) == source
+    assert chunks[0].text == "@decorator\nclass Big:\n" + methods.rstrip("\n") + "\n"
+    assert len(chunks) == 5
+    assert all(chunk.tokens <= 300 for chunk in chunks)
+
+
+def test_unparsable_source_is_split_by_lines():
+    source = "def broken(:\n" + "x = 1\n" * 100
+    chunks = chunk_python_source(source, max_tokens=20)
+    assert "".join(chunk.text for chunk in chunks) == source
+    assert all(chunk.tokens <= 20 for chunk in chunks)
+
+
+def test_editing_one_function_changes_one_chunk():
+    source = "".join(_function(f"function_{index}", 10) for index in range(10))
+    edited = source.replace("def function_4():\n    value_0 = 0", "def function_4():\n    value_0 = 42")
+    before = chunk_python_source(source, max_tokens=100)
+    after = chunk_python_source(edited, max_tokens=100)
+    changed = {chunk.content_hash for chunk in after} - {chunk.content_hash for chunk in before}
+    assert len(changed) == 1
+
+
+def test_empty_source():
+    assert chunk_python_source("") == []
+    assert [chunk.text for chunk in chunk_python_source(dedent("x = 1\n"))] == ["x = 1\n"]
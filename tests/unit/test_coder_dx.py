@@ -1,5 +1,7 @@
 from pathlib import Path
-from auto_sdlc.python_developer import FilePosition, FileRange
+from textwrap import dedent
+from auto_sdlc.file_ops import get_document
+from auto_sdlc.python_developer import FilePosition, FileRange, get_docstring, get_docstrings
 
 def test_file_range_str(tmp_path):
     file_path = tmp_path / "test_file.txt"
@@ -91,3 +93,75 @@ def test_file_position_find_next(tmp_path: Path):
     assert next_position.file == file_path
     assert next_position.line == 3
     assert next_position.column == 3
+
+def test_context_lines_around_positions_and_ranges(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("one\ntwo\nthree\nfour\nfive\n")
+    position = FilePosition(file=file_path, line=2, column=1)
+    assert position.previous_lines(3).text == "one\n"
+    assert position.next_lines(2).text == "three\nfour\n"
+    assert FilePosition(file=file_path, line=1, column=0).previous_lines(3).text == ""
+    file_range = FileRange(file=file_path, start=3, end=4)
+    assert file_range.previous_lines(1).text == "two\n"
+    assert file_range.next_lines(3).text == "five\n"
+
+def test_document_buffer_is_shared_and_refreshed(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\n")
+    document = get_document(file_path)
+    assert get_document(file_path) is document
+    assert document.lines == ["Hello", "World"]
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    assert get_document(file_path).line_count == 3
+
+def test_document_buffer_index_round_trip(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    document = get_document(file_path)
+    for index in range(len(document.text)):
+        line, column = document.line_and_column_of(index)
+        assert document.index_of(line, column) == index
+    assert document.line_and_column_of(len(document.text)) == (None, None)
+
+def test_get_docstrings(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    file_path.write_text(dedent(
+        '''\
+        #!/usr/bin/env python
+        r\'\'\'Module docstring with """ inside.\'\'\'
+
+        x = """not a docstring"""
+
+        class Greeter:
+            """Greet people."""
+
+            def greet(self, name):
+                """Say hello.
+
+                Politely.
+                """
+                return f"Hello, {name}"
+
+        if True:
+            def helper():
+                u"""Help."""
+        '''
+    ))
+    spans = {span.name: span for span in get_docstrings(file_path)}
+    assert sorted(spans) == ["", "Greeter", "Greeter.greet", "helper"]
+    assert spans[""].kind == "module"
+    assert (spans[""].start_line, spans[""].end_line) == (2, 2)
+    assert spans["Greeter.greet"].kind == "function"
+    assert (spans["Greeter.greet"].start_line, spans["Greeter.greet"].end_line) == (10, 13)
+    assert (spans["Greeter.greet"].start_column, spans["Greeter.greet"].end_column) == (8, 11)
+    assert get_docstring(file_path) == "r'''Module docstring with \"\"\" inside.'''\n"
+
+def test_get_docstring_ignores_triple_quotes_in_code(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    file_path.write_text('import os\n\nx = """not a docstring"""\n')
+    assert get_docstring(file_path) is None
+
+def test_get_docstring_of_unparsable_file(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    file_path.write_text('"""Still a docstring."""\n\ndef broken(:\n')
+    assert get_docstring(file_path) == '"""Still a docstring."""\n'
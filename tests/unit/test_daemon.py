@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import ask, daemon_client
+from auto_sdlc.daemon import ReviewDaemon
+from auto_sdlc.daemon_client import DaemonError
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch) -> Path:
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "documented.py").write_text('"""Has a docstring."""\nx = 1\n')
+    (root / "undocumented.py").write_text("x = 1\n")
+    monkeypatch.setattr(
+        ask, "suggest_docstring", lambda file: f'"""Docstring for {file.name}."""\n', raising=False
+    )
+    return root
+
+
+@pytest.fixture
+def daemon(project: Path, tmp_path: Path):
+    with ReviewDaemon(
+        project,
+        socket_path=str(tmp_path / "d.sock"),
+        state_directory=tmp_path / "state",
+        poll_interval=0.05,
+    ) as daemon:
+        yield daemon
+
+
+def test_review_and_diff_over_the_socket(daemon: ReviewDaemon, project: Path):
+    reviews = daemon_client.request("review", socket_path=daemon.socket_path)
+    assert [review["file"] for review in reviews] == [str(project / "documented.py"), str(project / "undocumented.py")]
+    assert reviews[0]["suggestions"] == []
+    [suggestion] = reviews[1]["suggestions"]
+    assert suggestion["kind"] == "MissingDocstringSuggestion"
+    assert suggestion["suggested_text"] == '"""Docstring for undocumented.py."""\n'
+
+    [review] = daemon_client.request(
+        "diff", socket_path=daemon.socket_path, files=[str(project / "undocumented.py")]
+    )
+    assert review["cached"]
+    assert '+"""Docstring for undocumented.py."""' in review["diffs"][0]
+
+
+def test_apply_and_status(daemon: ReviewDaemon, project: Path):
+    applied = daemon_client.request("apply", socket_path=daemon.socket_path)
+    assert applied == [str(project / "undocumented.py")]
+    assert (project / "undocumented.py").read_text().startswith('"""Docstring for undocumented.py."""')
+
+    status = daemon_client.request("status", socket_path=daemon.socket_path)
+    assert status["root"] == str(project)
+    assert status["requests"] == 2
+    assert status["indexed_files"] == 2
+
+
+def test_errors_are_reported_to_the_client(daemon: ReviewDaemon):
+    with pytest.raises(DaemonError, match="Unknown command"):
+        daemon_client.request("frobnicate", socket_path=daemon.socket_path)
+
+
+def test_stop_releases_the_socket(daemon: ReviewDaemon):
+    assert daemon_client.request("stop", socket_path=daemon.socket_path) is None
+    daemon.wait()
+    assert not Path(daemon.socket_path).exists()
+    with pytest.raises(DaemonError, match="No review daemon"):
+        daemon_client.request("status", socket_path=daemon.socket_path, timeout=5)
+
+
+def test_stale_socket_is_replaced(project: Path, tmp_path: Path):
+    socket_path = tmp_path / "stale.sock"
+    socket_path.write_text("")
+    with ReviewDaemon(project, socket_path=str(socket_path), state_directory=tmp_path / "state") as daemon:
+        assert daemon_client.request("status", socket_path=daemon.socket_path)["requests"] == 1
+        assert socket_path.stat().st_mode & 0o077 == 0
+        with pytest.raises(RuntimeError, match="already listening"):
+            ReviewDaemon(project, socket_path=str(socket_path), state_directory=tmp_path / "other").start()
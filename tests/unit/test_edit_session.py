@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc.edit_session import EditConflictError, EditSession
+from auto_sdlc.file_ops import FilePosition, FileRange
+
+
+def test_edit_session_uses_original_line_numbers(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("one\ntwo\nthree\nfour\n")
+    with EditSession(file_path) as session:
+        session.replace_lines(1, 1, "ONE\nONE AND A HALF\n")
+        session.insert_string(3, 0, ">")
+        session.replace_lines(4, 4, "")
+        session.insert_lines(0, "zero")
+    assert file_path.read_text() == "zero\nONE\nONE AND A HALF\ntwo\n>three\n"
+
+
+def test_edit_session_matches_sequential_edits(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    with EditSession(file_path) as session:
+        session.insert_at(FilePosition(file=file_path, line=2, column=3), "!")
+        session.replace_range(FileRange(file=file_path, start=3, end=3), "Replaced\n")
+    batched = file_path.read_text()
+
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    FilePosition(file=file_path, line=2, column=3).insert_string("!")
+    FileRange(file=file_path, start=3, end=3).text = "Replaced\n"
+    assert batched == file_path.read_text()
+
+
+def test_edit_session_rejects_conflicts(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("a\nb\nc\nd\n")
+    session = EditSession(file_path)
+    session.replace_lines(2, 3, "x\n")
+    with pytest.raises(EditConflictError):
+        session.replace_lines(3, 4, "y\n")
+    with pytest.raises(EditConflictError):
+        session.insert_string(2, 0, "z")
+    with pytest.raises(EditConflictError):
+        session.insert_lines(2, "z")
+    session.insert_lines(3, "after")
+    session.commit()
+    assert file_path.read_text() == "a\nx\nafter\nd\n"
+
+
+def test_edit_session_rejects_stale_snapshot(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("a\nb\n")
+    session = EditSession(file_path)
+    session.insert_string(1, 0, "!")
+    file_path.write_text("changed on disk\n")
+    with pytest.raises(EditConflictError):
+        session.commit()
+
+
+def test_edit_session_map_line(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("a\nb\nc\nd\n")
+    session = EditSession(file_path)
+    session.insert_lines(0, "top")
+    session.replace_lines(2, 2, "b1\nb2\nb3\n")
+    assert session.map_line(1) == 2
+    assert session.map_line(2) == 3
+    assert session.map_line(3) == 6
@@ -0,0 +1,147 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import file_writer
+from auto_sdlc.edit_session import EditSession
+from auto_sdlc.file_ops import FilePosition, FileRange, get_document
+from auto_sdlc.file_writer import Journal, JournalError, atomic_write_text, write_behind
+from auto_sdlc.reviewer import MissingDocstringSuggestion, apply_suggestions
+
+
+def test_atomic_write_keeps_permissions_and_leaves_no_temporary_files(tmp_path: Path):
+    file_path = tmp_path / "script.sh"
+    file_path.write_text("echo one\n")
+    file_path.chmod(0o750)
+    atomic_write_text(file_path, "echo two\n", durable=True)
+    assert file_path.read_text() == "echo two\n"
+    assert file_path.stat().st_mode & 0o777 == 0o750
+    assert os.listdir(tmp_path) == ["script.sh"]
+
+
+def test_atomic_write_through_a_symlink_replaces_the_target(tmp_path: Path):
+    target = tmp_path / "target.txt"
+    target.write_text("old\n")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+    atomic_write_text(link, "new\n")
+    assert link.is_symlink()
+    assert target.read_text() == "new\n"
+
+
+def test_write_behind_coalesces_writes_to_a_file(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\n")
+    with write_behind(flush_window=60) as writer:
+        FilePosition(file=file_path, line=1, column=5).insert_string(",")
+        FilePosition(file=file_path, line=2, column=5).insert_string("!")
+        FileRange(file=file_path, start=2, end=2).text = "There\n"
+        # Queued, not written, but visible to file_ops.
+        assert file_path.read_text() == "Hello\nWorld\n"
+        assert get_document(file_path).text == "Hello,\nThere\n"
+        assert FilePosition.from_search("There", file_path=file_path) is not None
+    assert writer.writes == 3
+    assert writer.flushed == 1
+    assert file_path.read_text() == "Hello,\nThere\n"
+    assert get_document(file_path).signature[0] >= 0
+
+
+def test_write_behind_flushes_files_in_parallel(tmp_path: Path):
+    files = [tmp_path / f"file_{number}.txt" for number in range(20)]
+    for file_path in files:
+        file_path.write_text("line\n")
+    with write_behind(flush_window=0.01, max_workers=4):
+        for file_path in files:
+            FilePosition(file=file_path, line=1, column=0).insert_string(">")
+    assert all(file_path.read_text() == ">line\n" for file_path in files)
+
+
+def test_edit_session_commits_into_write_behind(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("one\ntwo\n")
+    with write_behind(flush_window=60) as writer:
+        with EditSession(file_path) as session:
+            session.insert_lines(0, "zero")
+        writer.flush()
+        # The flushed buffer tracks the file again, so a new session sees no conflict.
+        with EditSession(file_path) as session:
+            session.replace_lines(3, 3, "three\n")
+    assert file_path.read_text() == "zero\none\nthree\n"
+
+
+def test_journal_rolls_back_and_resumes_an_interrupted_batch(tmp_path: Path):
+    journal_directory = tmp_path / "journal"
+    existing = tmp_path / "existing.txt"
+    existing.write_text("original\n")
+    created = tmp_path / "created.txt"
+
+    # A batch that dies after writing the first file.
+    journal = Journal(journal_directory)
+    journal.begin()
+    target = journal.record(existing, "changed\n")
+    atomic_write_text(existing, "changed\n")
+    journal.done(existing, target)
+    journal.record(created, "new\n")
+
+    with pytest.raises(JournalError, match="unfinished batch"):
+        with write_behind(journal=journal_directory):
+            pass
+
+    entries = Journal(journal_directory).entries()
+    assert [(entry.path, entry.done) for entry in entries] == [(existing, True), (created, False)]
+    assert Journal(journal_directory).resume() == [created]
+    assert created.read_text() == "new\n"
+    assert Journal(journal_directory).entries() == []
+
+    journal.begin()
+    journal.record(existing, "changed again\n")
+    atomic_write_text(existing, "changed again\n")
+    journal.record(created, "newer\n")
+    assert Journal(journal_directory).rollback() == [existing, created]
+    assert existing.read_text() == "changed\n"
+    assert created.read_text() == "new\n"
+
+
+def test_failed_batch_keeps_its_journal(tmp_path: Path):
+    journal_directory = tmp_path / "journal"
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("one\n")
+    with pytest.raises(ValueError):
+        with write_behind(journal=journal_directory):
+            FilePosition(file=file_path, line=1, column=0).insert_string(">")
+            raise ValueError("interrupted")
+    assert file_path.read_text() == ">one\n"
+    assert Journal(journal_directory).rollback() == [file_path.resolve()]
+    assert file_path.read_text() == "one\n"
+    assert os.listdir(journal_directory) == []
+
+
+def test_journal_only_deletes_its_own_files(tmp_path: Path):
+    cache = tmp_path / ".cache"
+    cache.mkdir()
+    (cache / "symbol-index.sqlite3").write_text("index")
+    (cache / "7.orig.bak").write_text("keep")
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("one\n")
+    with write_behind(journal=cache):
+        FilePosition(file=file_path, line=1, column=0).insert_string(">")
+    assert file_path.read_text() == ">one\n"
+    assert sorted(os.listdir(cache)) == ["7.orig.bak", "symbol-index.sqlite3"]
+
+
+def test_apply_suggestions_writes_behind_with_a_journal(tmp_path: Path, monkeypatch):
+    files = [tmp_path / f"module_{number}.py" for number in range(3)]
+    for file_path in files:
+        file_path.write_text("x = 1\n")
+    written = []
+    monkeypatch.setattr(file_writer, "atomic_write_text", lambda path, text, **options: written.append(path) or Path(path).write_text(text))
+
+    suggestions = [MissingDocstringSuggestion.for_file(file_path) for file_path in files]
+    for suggestion in suggestions:
+        suggestion.suggested_text = '"""Docstring."""\n'
+    apply_suggestions(suggestions, journal=tmp_path / "journal")
+
+    assert sorted(written) == files
+    assert all(file_path.read_text().startswith('"""Docstring."""') for file_path in files)
+    assert Journal(tmp_path / "journal").entries() == []
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["auto_sdlc.ask", "auto_sdlc.file_ops", "auto_sdlc.python_developer", "auto_sdlc.reviewer"],
+)
+def test_import_does_not_load_langchain(module: str):
+    code = (
+        f"import sys, {module}; "
+        "loaded = sorted(name for name in sys.modules if name.split('.')[0].startswith('langchain')); "
+        "print(loaded); sys.exit(1 if loaded else 0)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, f"Importing {module} loaded {result.stdout.strip()}"
+
+
+def test_llm_backend_is_created_on_first_use(monkeypatch):
+    from auto_sdlc import llm_backends
+
+    created = []
+
+    @llm_backends.register_backend("test-backend")
+    def _test_backend(**options):
+        created.append(options)
+        return object()
+
+    monkeypatch.setenv(llm_backends.BACKEND_ENV_VAR, "test-backend")
+    llm_backends.reset()
+    try:
+        assert created == []
+        llm = llm_backends.get_llm()
+        assert llm_backends.get_llm() is llm
+        assert created == [{}]
+    finally:
+        llm_backends.reset()
+        del llm_backends._factories["test-backend"]
@@ -0,0 +1,75 @@
+import json
+import time
+from pathlib import Path
+
+from auto_sdlc.llm_cache import ResponseCache, main, make_key
+
+
+def test_make_key_depends_on_identity():
+    key = make_key("prompt", backend="ollama", model="llama-2", template_version=1, params={})
+    assert key == make_key("prompt", backend="ollama", model="llama-2", template_version=1, params={})
+    assert key != make_key("prompt", backend="openai", model="llama-2", template_version=1, params={})
+    assert key != make_key("prompt", backend="ollama", model="llama-2", template_version=2, params={})
+    assert key != make_key("prompt", backend="ollama", model="llama-2", template_version=1, params={"temperature": 0})
+
+
+def test_response_cache_ttl_and_stats(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    cache.set("short", "gone soon", ttl=0.01)
+    cache.set("long", "still here")
+    time.sleep(0.05)
+    assert cache.get("short", None) is None
+    assert cache.get("long") == "still here"
+    assert cache.prune() == 1
+    assert "short" not in cache.raw
+
+    stats = cache.stats()
+    assert stats.hits >= 1
+    assert stats.misses >= 1
+    assert stats.bytes_written == len("gone soon") + len("still here")
+    assert stats.entries == 1
+
+
+def test_response_cache_size_limit(tmp_path: Path):
+    cache = ResponseCache(tmp_path, size_limit=0)
+    for index in range(20):
+        cache.set(f"key-{index}", "x" * 1000)
+    cache.prune()
+    assert cache.stats().entries == 0
+
+
+def test_locks_are_kept_apart_from_responses(tmp_path: Path):
+    cache = ResponseCache(tmp_path / "llm", size_limit=0)
+    with cache.lock("key"):
+        for index in range(20):
+            cache.set(f"key-{index}", "x" * 1000)
+        cache.prune()
+        assert cache.stats().entries == 0
+        assert cache.lock("key").locked()
+        assert cache.raw.get("lock:key") is None
+    cache.close()
+
+
+def test_lock_store_is_created_inside_the_cache_on_first_lock(tmp_path: Path, monkeypatch):
+    cache = ResponseCache(tmp_path / "llm")
+    cache.stats()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["llm"]
+    assert not (tmp_path / "llm" / "locks").exists()
+    with cache.lock("key"):
+        assert (tmp_path / "llm" / "locks").is_dir()
+    cache.close()
+
+    monkeypatch.chdir(tmp_path / "llm")
+    ResponseCache(".").close()
+    main(["--directory", ".", "stats"])
+
+
+def test_cli_stats(tmp_path: Path, capsys):
+    cache = ResponseCache(tmp_path)
+    cache.set("key", "value")
+    cache.close()
+    main(["--directory", str(tmp_path), "stats"])
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["entries"] == 1
+    assert stats["eviction_policy"] == "least-recently-used"
+    main(["--directory", str(tmp_path), "compact"])
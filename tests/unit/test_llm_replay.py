@@ -0,0 +1,81 @@
+import asyncio
+import json
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import llm_backends
+from auto_sdlc.llm_replay import CassetteLLM, CassetteMissError, DeterministicLLM
+from auto_sdlc.ollama_server import OllamaStandInServer
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    llm_backends.reset()
+    yield
+    llm_backends.reset()
+
+
+def _post(url: str, body: dict) -> bytes:
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read()
+
+
+def test_deterministic_llm_depends_only_on_prompt():
+    llm = DeterministicLLM()
+    assert llm.invoke("a") == DeterministicLLM().invoke("a")
+    assert llm.invoke("a") != llm.invoke("b")
+    assert "".join(llm.stream("a")) == llm.invoke("a")
+    assert asyncio.run(llm.ainvoke("a")) == llm.invoke("a")
+    assert DeterministicLLM(reply="Yes").invoke("anything") == "Yes"
+
+
+def test_cassette_records_then_replays(tmp_path: Path):
+    cassette = tmp_path / "cassette.jsonl"
+    recorder = CassetteLLM(cassette, mode="record", record_from="deterministic", record_options={"reply": "No, never"})
+    assert recorder.invoke("Is it?") == "No, never"
+    assert "".join(recorder.stream("Really?")) == "No, never"
+
+    player = CassetteLLM(cassette)
+    assert len(player.cassette) == 2
+    assert player.invoke("Is it?") == "No, never"
+    assert asyncio.run(player.ainvoke("Really?")) == "No, never"
+    with pytest.raises(CassetteMissError):
+        player.invoke("Unknown prompt")
+
+
+def test_cassette_auto_mode_records_only_misses(tmp_path: Path):
+    cassette = tmp_path / "cassette.jsonl"
+    cassette.write_text(json.dumps({"prompt": "known", "response": "recorded"}) + "\n")
+    llm = CassetteLLM(cassette, mode="auto", record_from="deterministic")
+    assert llm.invoke("known") == "recorded"
+    assert llm.invoke("new") == DeterministicLLM().invoke("new")
+    assert len(cassette.read_text().splitlines()) == 2
+
+
+def test_replay_backend_is_selectable(tmp_path: Path):
+    cassette = tmp_path / "cassette.jsonl"
+    cassette.write_text(json.dumps({"prompt": "hi", "response": "hello"}) + "\n")
+    llm_backends.use_backend("replay", cassette=str(cassette), latency=0.01)
+    assert llm_backends.get_llm().invoke("hi") == "hello"
+    assert llm_backends.backend_identity()["params"] == {"cassette": str(cassette)}
+
+
+def test_stand_in_server_speaks_ollama_api():
+    with OllamaStandInServer(DeterministicLLM(reply="Yes it does")) as server:
+        body = json.loads(_post(f"{server.url}/api/generate", {"model": "m", "prompt": "Q?", "stream": False}))
+        assert body["response"] == "Yes it does"
+        assert body["done"] is True
+
+        lines = [json.loads(line) for line in _post(f"{server.url}/api/generate", {"prompt": "Q?"}).splitlines()]
+        assert "".join(line["response"] for line in lines) == "Yes it does"
+        assert lines[-1]["done"] is True
+
+        chat = json.loads(_post(
+            f"{server.url}/api/chat",
+            {"messages": [{"role": "user", "content": "Q?"}], "stream": False},
+        ))
+        assert chat["message"]["content"] == "Yes it does"
+        assert server.request_count == 3
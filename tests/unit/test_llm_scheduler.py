@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auto_sdlc import llm_backends
+from auto_sdlc.llm_replay import DeterministicLLM
+from auto_sdlc.llm_scheduler import (
+    AdaptiveConcurrencyLimit,
+    Priority,
+    RequestScheduler,
+    RetryPolicy,
+    TokenBucket,
+    is_throttled,
+    priority,
+)
+from auto_sdlc.ollama_server import OllamaStandInServer
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    llm_backends.reset()
+    yield
+    llm_backends.reset()
+
+
+def test_token_bucket_reservations_wait_out_debt():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    bucket.adjust(-5)
+    assert bucket.reserve() == 0
+
+
+def test_concurrency_limit_is_aimd():
+    limit = AdaptiveConcurrencyLimit(4, maximum=8, target_latency=1.0)
+    for _ in range(5):  # About one window of `limit` requests.
+        limit.on_success(0.1)
+    assert limit.limit == 5
+    limit.on_throttle()
+    assert limit.limit == 2
+    limit.on_throttle()  # Same congestion event: no second decrease.
+    assert limit.limit == 2
+    limit.on_success(5.0)  # Too slow counts as congestion too, once the event is over.
+    assert limit.limit == 2
+
+
+def test_is_throttled():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    assert is_throttled(RateLimitError())
+    assert is_throttled(TimeoutError())
+    assert is_throttled(ValueError("Ollama call failed with status code 429."))
+    assert not is_throttled(ValueError("Ollama call failed with status code 400."))
+
+
+def test_priority_lanes_jump_the_queue():
+    scheduler = RequestScheduler(concurrency=AdaptiveConcurrencyLimit(1, maximum=1))
+    release = threading.Event()
+    order = []
+
+    def request(name: str, lane: Priority) -> None:
+        with priority(lane):
+            scheduler.run("prompt", lambda: order.append(name))
+
+    with ThreadPoolExecutor(4) as pool:
+        blocker = pool.submit(scheduler.run, "prompt", release.wait)
+        while scheduler.in_flight == 0:
+            time.sleep(0.001)
+        pool.submit(request, "bulk", Priority.BULK)
+        while scheduler.queued < 1:
+            time.sleep(0.001)
+        pool.submit(request, "interactive", Priority.INTERACTIVE)
+        while scheduler.queued < 2:
+            time.sleep(0.001)
+        release.set()
+        blocker.result()
+    assert order == ["interactive", "bulk"]
+
+
+def test_retries_throttled_requests_against_stand_in_server():
+    llm = DeterministicLLM(latency=0.02)
+    scheduler = RequestScheduler(
+        concurrency=AdaptiveConcurrencyLimit(8, maximum=8),
+        retry=RetryPolicy(max_attempts=50, base_delay=0.01, max_delay=0.05),
+    )
+    with OllamaStandInServer(llm, max_concurrency=2) as server:
+        llm_backends.use_backend("ollama", base_url=server.url)
+        llm_backends.use_scheduler(scheduler)
+        client = llm_backends.get_llm()
+        prompts = [f"Question {index}?" for index in range(20)]
+        with ThreadPoolExecutor(8) as pool:
+            answers = list(pool.map(client.invoke, prompts))
+
+    assert answers == [llm.invoke(prompt) for prompt in prompts]
+    assert server.throttled_count > 0
+    assert server.max_in_flight <= 2
+    assert scheduler.concurrency.limit < 8
+
+
+def test_cancelling_during_the_rate_delay_frees_the_slot():
+    scheduler = RequestScheduler(requests_per_second=5, concurrency=AdaptiveConcurrencyLimit(1, maximum=1))
+    # No burst: every request after the first waits for the rate limit.
+    scheduler.requests = TokenBucket(rate=5, capacity=1)
+
+    async def answer() -> str:
+        return "yes"
+
+    async def scenario() -> str:
+        await scheduler.arun("first", answer)
+        delayed = asyncio.ensure_future(scheduler.arun("second", answer))
+        await asyncio.sleep(0.05)
+        delayed.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await delayed
+        return await asyncio.wait_for(scheduler.arun("third", answer), timeout=5)
+
+    assert asyncio.run(scenario()) == "yes"
+    assert scheduler._in_flight == 0
+
+
+class WordStreamLLM:
+    """Stand-in LLM that streams words, and records whether its streams were closed."""
+
+    def __init__(self) -> None:
+        self.closed: list[bool] = []
+
+    def stream(self, prompt: str):
+        self.closed.append(False)
+        try:
+            for word in ["Yes", " it", " does", "."] * 100:
+                yield word
+        finally:
+            self.closed[-1] = True
+
+    async def astream(self, prompt: str):
+        for word in self.stream(prompt):
+            yield word
+
+
+def test_closing_a_stream_early_records_and_charges_it(monkeypatch):
+    llm = WordStreamLLM()
+    scheduler = RequestScheduler(tokens_per_minute=6000)
+    client = scheduler.wrap(llm)
+    samples = []
+    monkeypatch.setattr(scheduler.concurrency, "on_success", samples.append)
+    charged = []
+    monkeypatch.setattr(scheduler.tokens, "adjust", charged.append)
+    closed_on_release = []
+    release = scheduler._release
+
+    def record_release() -> None:
+        closed_on_release.append(llm.closed[-1])
+        release()
+
+    monkeypatch.setattr(scheduler, "_release", record_release)
+
+    stream = client.stream("Does it?")
+    assert next(stream) == "Yes"
+    stream.close()
+
+    async def first_chunk() -> str:
+        stream = client.astream("Does it?")
+        chunk = await anext(stream)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(first_chunk()) == "Yes"
+    assert llm.closed == [True, True]
+    # The backend's stream is closed before its slot is handed back.
+    assert closed_on_release == [True, True]
+    assert len(samples) == 2
+    assert charged == [-scheduler.response_tokens] * 2
+    assert scheduler.in_flight == 0
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import ask, metrics
+from auto_sdlc.file_ops import FilePosition, clear_documents
+from auto_sdlc.llm_cache import ResponseCache
+from auto_sdlc.metrics import MetricsRegistry, profile_stage
+
+
+class FakeLLM:
+    def invoke(self, prompt: str) -> str:
+        return "Yes, it is."
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def test_counter_and_histogram_export():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.")
+    requests.inc(mode="a")
+    requests.inc(2, mode="a")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert requests.value(mode="a") == 3
+    summary = registry.to_json()
+    assert summary["latency_seconds"]["values"][0]["count"] == 3
+    assert summary["latency_seconds"]["values"][0]["buckets"] == {"0.1": 1, "1.0": 1, "+Inf": 1}
+    json.dumps(summary)
+
+    text = registry.to_prometheus()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{mode="a"} 3' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.counter("requests_total").inc()
+    registry.histogram("latency_seconds").observe(1)
+    assert registry.counter("requests_total").value() == 0
+    assert registry.histogram("latency_seconds").count() == 0
+
+
+def test_metric_kind_conflict():
+    registry = MetricsRegistry()
+    registry.counter("things")
+    with pytest.raises(ValueError):
+        registry.histogram("things")
+
+
+def test_llm_and_cache_metrics(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(ask, "_cache", ResponseCache(tmp_path / "cache"))
+    monkeypatch.setattr(ask, "get_llm", lambda: FakeLLM())
+    ask.get_answer("Is it?")
+    ask.get_answer("Is it?")
+
+    assert metrics.counter("auto_sdlc_llm_requests_total").value(mode="invoke") == 1
+    assert metrics.histogram("auto_sdlc_llm_request_seconds").count(mode="invoke") == 1
+    assert metrics.counter("auto_sdlc_llm_chars_total").value(kind="response") == len("Yes, it is.")
+    assert metrics.counter("auto_sdlc_llm_tokens_total").value(kind="response", source="estimated") == 5
+    lookups = metrics.counter("auto_sdlc_llm_cache_lookups_total")
+    assert lookups.value(result="hit") == 1
+    assert lookups.value(result="miss") >= 1
+
+
+def test_file_metrics(tmp_path: Path):
+    clear_documents()
+    file = tmp_path / "module.py"
+    file.write_text("x = 1\n")
+    FilePosition(file=file, line=1, column=0).insert_string("# comment\n")
+    operations = metrics.counter("auto_sdlc_file_operations_total")
+    assert operations.value(operation="read") == 1
+    assert operations.value(operation="write") == 1
+    assert metrics.counter("auto_sdlc_file_bytes_total").value(operation="write") == file.stat().st_size
+
+
+def test_profile_stage_dumps_profiles(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(metrics.PROFILE_DIR_ENV_VAR, str(tmp_path))
+    with profile_stage("outer"):
+        with profile_stage("inner"):
+            sum(range(1000))
+    profiles = list(tmp_path.glob("*.prof"))
+    assert [profile.name.split("-")[0] for profile in profiles] == ["outer"]
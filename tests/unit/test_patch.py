@@ -0,0 +1,109 @@
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import ask, patch
+from auto_sdlc.file_ops import FilePosition, FileRange, clear_documents, get_document
+from auto_sdlc.patch import FilePatch, build_file_patch, iter_file_patches, project_patch, write_patch
+from auto_sdlc.project_reviewer import FileReview
+from auto_sdlc.reviewer import EditSuggestion, InsertSuggestion, MissingDocstringSuggestion
+
+
+def _docstring(file_path: Path) -> MissingDocstringSuggestion:
+    suggestion = MissingDocstringSuggestion.for_file(file_path)
+    suggestion.suggested_text = f'"""Docstring for {file_path.name}."""\n'
+    return suggestion
+
+
+def test_file_patch_merges_every_suggestion_without_writing(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    text = "".join(f"x{number} = {number}\n" for number in range(1, 21))
+    file_path.write_text(text)
+    suggestions = [
+        _docstring(file_path),
+        EditSuggestion(target=FileRange(file=file_path, start=10, end=10), suggested_text="x10 = 'ten'\n", description=""),
+        InsertSuggestion(target=FilePosition(file=file_path, line=20, column=0), suggested_text="# ", description=""),
+    ]
+    file_patch = build_file_patch(file_path, suggestions, root=tmp_path)
+
+    assert file_patch.error is None
+    assert file_patch.patch.startswith("--- a/module.py\n+++ b/module.py\n")
+    assert file_patch.patch.count("@@ ") == 3
+    assert '+"""Docstring for module.py."""\n' in file_patch.patch
+    assert "-x10 = 10\n+x10 = 'ten'\n" in file_patch.patch
+    assert "+# x20 = 20\n" in file_patch.patch
+    assert file_path.read_text() == text
+
+
+def test_file_patch_marks_a_missing_final_newline(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1")
+    file_patch = build_file_patch(file_path, [_docstring(file_path)], root=tmp_path)
+    assert file_patch.patch.endswith('-x = 1\n\\ No newline at end of file\n+"""Docstring for module.py."""\n+\n+x = 1\n')
+
+
+def test_file_patches_stream_in_review_order(tmp_path: Path):
+    files = [tmp_path / f"module_{number}.py" for number in range(5)]
+    for file_path in files:
+        file_path.write_text("x = 1\n")
+    reviews = [FileReview(file=file_path, suggestions=[_docstring(file_path)]) for file_path in files]
+    reviews[1].suggestions = []
+    reviews[3].error = "SyntaxError: boom"
+
+    patches = list(iter_file_patches(iter(reviews), root=tmp_path, workers=0))
+    assert [file_patch.file for file_patch in patches] == [files[0], files[2], files[3], files[4]]
+    assert patches[2] == FilePatch(files[3], error="SyntaxError: boom")
+
+    output, errors = io.StringIO(), io.StringIO()
+    assert write_patch(patches, output, errors=errors) == 3
+    assert output.getvalue() == project_patch(reviews, root=tmp_path, workers=0)
+    assert errors.getvalue() == f"{files[3]}: SyntaxError: boom\n"
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+def test_project_patch_applies_with_git(tmp_path: Path, monkeypatch):
+    root = tmp_path / "project"
+    (root / "package").mkdir(parents=True)
+    (root / "package" / "first.py").write_text("x = 1\n")
+    (root / "second.py").write_text('"""Has a docstring."""\n')
+    (root / "third.py").write_text("y = 2\n")
+    monkeypatch.setattr(ask, "suggest_docstring", lambda file: f'"""Docstring for {file.name}."""\n', raising=False)
+    clear_documents()
+
+    output = tmp_path / "review.patch"
+    patch.main([str(root), "-o", str(output), "--process-workers", "0"])
+    assert (root / "package" / "first.py").read_text() == "x = 1\n"
+
+    subprocess.run(["git", "apply", str(output)], cwd=root, check=True)
+    assert (root / "package" / "first.py").read_text() == '"""Docstring for first.py."""\n\nx = 1\n'
+    assert (root / "second.py").read_text() == '"""Has a docstring."""\n'
+    assert (root / "third.py").read_text() == '"""Docstring for third.py."""\n\ny = 2\n'
+
+
+def test_dry_run_reads_each_file_once_with_worker_processes(tmp_path: Path, monkeypatch):
+    root = tmp_path / "project"
+    root.mkdir()
+    for name in ("first.py", "second.py"):
+        (root / name).write_text("x = 1\n")
+    reads = tmp_path / "reads.log"
+    read_text = Path.read_text
+
+    def logged_read_text(path: Path, *args, **kwargs) -> str:
+        # Inherited by the forked workers, which log their reads to the same file.
+        with open(reads, "a") as log:
+            log.write(f"{path.name}\n")
+        return read_text(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", logged_read_text)
+    monkeypatch.setattr(
+        ask, "suggest_docstring", lambda file: f'"""{get_document(file).text.strip()}"""\n', raising=False
+    )
+    clear_documents()
+
+    output = tmp_path / "review.patch"
+    patch.main([str(root), "-o", str(output), "--process-workers", "2"])
+    assert read_text(output).count('+"""x = 1"""\n') == 2
+    assert sorted(read_text(reads).splitlines()) == ["first.py", "second.py"]
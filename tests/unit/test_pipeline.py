@@ -0,0 +1,99 @@
+import io
+import json
+from pathlib import Path
+
+from auto_sdlc import ask, pipeline
+from auto_sdlc.pipeline import stream_reviews, write_jsonl
+from auto_sdlc.project_reviewer import find_python_files
+
+
+def _make_project(root: Path, count: int = 6) -> None:
+    for index in range(count):
+        docstring = '"""Has a docstring."""\n' if index % 2 else ""
+        (root / f"module{index}.py").write_text(docstring + "x = 1\n")
+
+
+def _fake_docstrings(monkeypatch, calls: list | None = None) -> None:
+    async def asuggest_docstring(file):
+        if calls is not None:
+            calls.append(file)
+        return f'"""Docstring for {file.name}."""\n'
+
+    monkeypatch.setattr(ask, "asuggest_docstring", asuggest_docstring)
+
+
+def test_stream_reviews_generates_and_diffs(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    _fake_docstrings(monkeypatch)
+    reviews = list(stream_reviews(tmp_path, process_workers=0, llm_workers=2, queue_size=1))
+    assert sorted(review.file for review in reviews) == find_python_files(tmp_path)
+    assert all(review.error is None and not review.applied for review in reviews)
+
+    missing = [review for review in reviews if review.suggestions]
+    assert len(missing) == 3
+    for review in missing:
+        assert f'+"""Docstring for {review.file.name}."""' in review.diffs[0]
+    assert (tmp_path / "module0.py").read_text() == "x = 1\n"
+
+
+def test_stream_reviews_applies(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    _fake_docstrings(monkeypatch)
+    reviews = list(stream_reviews(tmp_path, process_workers=0, apply=True))
+    assert sorted(str(review.file.name) for review in reviews if review.applied) == [
+        "module0.py", "module2.py", "module4.py"
+    ]
+    assert (tmp_path / "module0.py").read_text().startswith('"""Docstring for module0.py."""\n')
+
+
+def test_stream_reviews_without_generation(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    calls: list = []
+    _fake_docstrings(monkeypatch, calls)
+    reviews = list(stream_reviews(tmp_path, process_workers=0, generate=False, apply=True))
+    assert sum(1 for review in reviews if review.suggestions) == 3
+    assert not calls
+    assert all(not review.diffs and not review.applied for review in reviews)
+
+
+def test_backpressure_bounds_files_in_flight(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path, count=200)
+    _fake_docstrings(monkeypatch)
+    scanned = []
+
+    def files():
+        for file in find_python_files(tmp_path):
+            scanned.append(file)
+            yield file
+
+    reviews = stream_reviews(tmp_path, files=files(), process_workers=0, llm_workers=1, queue_size=2)
+    first = next(reviews)
+    # Only the queues and the workers hold files: the scan is nowhere near done.
+    assert first.file == scanned[0]
+    assert len(scanned) < 30
+    reviews.close()
+    assert len(scanned) < 30
+
+
+def test_write_jsonl_streams_one_line_per_review(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    _fake_docstrings(monkeypatch)
+    output = io.StringIO()
+    flagged = write_jsonl(stream_reviews(tmp_path, process_workers=0), output)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert flagged == 3
+    assert len(lines) == 6
+    assert {line["file"] for line in lines} == {str(file) for file in find_python_files(tmp_path)}
+    assert sum(1 for line in lines if line["suggestions"]) == 3
+
+
+def test_errors_are_reported_per_file(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path, count=2)
+
+    async def fail(file):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(ask, "asuggest_docstring", fail)
+    reviews = {review.file.name: review for review in pipeline.stream_reviews(tmp_path, process_workers=0)}
+    assert reviews["module0.py"].error == "RuntimeError: model unavailable"
+    assert reviews["module1.py"].error is None
@@ -0,0 +1,97 @@
+import logging
+from pathlib import Path
+
+from auto_sdlc import ask
+from auto_sdlc.project_reviewer import find_python_files, review_project
+from auto_sdlc.review_manifest import ReviewManifest
+
+
+def _make_project(root: Path) -> None:
+    for index in range(6):
+        package = root / f"pkg{index % 2}"
+        package.mkdir(exist_ok=True)
+        docstring = '"""Has a docstring."""\n' if index % 2 else ""
+        (package / f"module{index}.py").write_text(docstring + "x = 1\n")
+    (root / ".venv").mkdir()
+    (root / ".venv" / "ignored.py").write_text("x = 1\n")
+
+
+def test_find_python_files_is_sorted_and_skips_excluded_dirs(tmp_path: Path):
+    _make_project(tmp_path)
+    files = find_python_files(tmp_path)
+    assert files == sorted(files)
+    assert len(files) == 6
+    assert not any(".venv" in file.parts for file in files)
+
+
+def test_review_project_streams_ordered_reviews(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.setattr(
+        ask, "suggest_docstring", lambda file: f'"""Docstring for {file.name}."""\n', raising=False
+    )
+    reviews = list(review_project(tmp_path, process_workers=0, llm_workers=2))
+    assert [review.file for review in reviews] == find_python_files(tmp_path)
+    assert all(review.error is None for review in reviews)
+
+    missing = [review for review in reviews if review.suggestions]
+    assert len(missing) == 3
+    for review in missing:
+        assert review.suggestions[0].suggested_text == f'"""Docstring for {review.file.name}."""\n'
+        assert f'+"""Docstring for {review.file.name}."""' in review.diffs[0]
+
+
+def test_review_project_in_worker_processes(tmp_path: Path, monkeypatch):
+    _make_project(tmp_path)
+    monkeypatch.setattr(
+        ask, "suggest_docstring", lambda file: f'"""Docstring for {file.name}."""\n', raising=False
+    )
+    reviews = list(review_project(tmp_path, process_workers=2, llm_workers=2))
+    assert [review.file for review in reviews] == find_python_files(tmp_path)
+    missing = [review for review in reviews if review.suggestions]
+    assert len(missing) == 3
+    for review in missing:
+        assert f'+"""Docstring for {review.file.name}."""' in review.diffs[0]
+
+
+def test_closing_a_review_early_stops_cleanly(tmp_path: Path, caplog):
+    for index in range(40):
+        (tmp_path / f"module{index}.py").write_text("x = 1\n")
+    reviews = review_project(tmp_path, process_workers=2, generate=False)
+    with caplog.at_level(logging.ERROR):
+        assert next(reviews).suggestions
+        reviews.close()
+    assert caplog.records == []
+
+
+def test_review_project_without_generation(tmp_path: Path):
+    _make_project(tmp_path)
+    reviews = list(review_project(tmp_path, process_workers=0, generate=False, ordered=False))
+    assert len(reviews) == 6
+    assert sum(1 for review in reviews if review.suggestions) == 3
+    assert all(not review.diffs for review in reviews)
+
+
+def test_review_project_reuses_stored_reviews(tmp_path: Path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    _make_project(project)
+    calls = []
+
+    def suggest_docstring(file):
+        calls.append(file)
+        return f'"""Docstring for {file.name}."""\n'
+
+    monkeypatch.setattr(ask, "suggest_docstring", suggest_docstring, raising=False)
+    manifest = ReviewManifest(tmp_path / "manifest")
+    first = list(review_project(project, process_workers=0, manifest=manifest))
+    assert len(calls) == 3
+    assert not any(review.cached for review in first)
+
+    changed = project / "pkg0" / "module0.py"
+    changed.write_text("y = 2\n")
+    second = list(review_project(project, process_workers=0, manifest=manifest))
+    assert len(calls) == 4
+    assert [review.file for review in second if not review.cached] == [changed]
+    assert [review.diffs for review in second if review.cached] == [
+        review.diffs for review in first if review.file != changed
+    ]
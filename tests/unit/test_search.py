@@ -0,0 +1,114 @@
+import random
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc import search
+from auto_sdlc.file_ops import FilePosition
+from auto_sdlc.search import Match, PatternSet, search_file, search_files, search_project
+
+SOURCE = 'def f():\n    """Doc."""\n    return 1  # TODO: more é TODO\n# noqa\n'
+
+
+def test_search_file_reports_lines_and_columns(tmp_path: Path):
+    file_path = tmp_path / "module.py"
+    file_path.write_text(SOURCE)
+    matches = search_file(file_path, ['"""', "TODO", "# noqa"])
+    assert [(match.line, match.column, match.pattern) for match in matches] == [
+        (2, 4, '"""'),
+        (2, 11, '"""'),
+        (3, 16, "TODO"),
+        (3, 29, "TODO"),
+        (4, 0, "# noqa"),
+    ]
+    lines = SOURCE.splitlines()
+    for match in matches:
+        assert lines[match.line - 1][match.column:].startswith(match.pattern)
+    assert matches[0].to_position().line == 2
+
+
+@pytest.mark.parametrize("patterns", [["a", "ab", "abc"], [f"p{index}" for index in range(search.FIND_CURSORS_LIMIT)] + ["ab", "b"]])
+def test_longest_match_wins_and_matches_do_not_overlap(tmp_path: Path, patterns):
+    file_path = tmp_path / "text.txt"
+    file_path.write_text("abcab b\n")
+    found = [(match.offset, match.pattern) for match in search_file(file_path, patterns)]
+    expected = {"a": [(0, "abc"), (3, "ab")], "p0": [(0, "ab"), (3, "ab"), (6, "b")]}[patterns[0]]
+    assert found == expected
+
+
+def test_cursor_and_regex_scans_agree():
+    random.seed(0)
+    for _ in range(200):
+        patterns = {"".join(random.choices('ab\n"', k=random.randint(1, 4))) for _ in range(random.randint(1, 6))}
+        data = "".join(random.choices('ab\n"', k=200)).encode()
+        pattern_set = PatternSet(patterns)
+        assert list(pattern_set._scan_with_cursors(data)) == list(pattern_set._scan_with_regex(data))
+
+
+def test_memory_mapped_search_matches_in_memory_search(tmp_path: Path):
+    file_path = tmp_path / "big.py"
+    file_path.write_text(SOURCE * 50)
+    in_memory = search_file(file_path, ["TODO", '"""'])
+    mapped = search_file(file_path, ["TODO", '"""'], mmap_threshold=1)
+    assert mapped == in_memory
+    assert len(mapped) == 200
+    assert mapped[-1] == Match(file_path, 199, 29, mapped[-1].offset, "TODO")
+
+
+def test_search_project_in_parallel(tmp_path: Path):
+    for index in range(5):
+        (tmp_path / f"module{index}.py").write_text(SOURCE)
+    (tmp_path / "notes.txt").write_text("TODO\n")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "ignored.py").write_text("TODO\n")
+    parallel = list(search_project(tmp_path, ["TODO"], workers=2))
+    assert parallel == list(search_project(tmp_path, ["TODO"], workers=0))
+    assert [match.file.name for match in parallel] == [f"module{index}.py" for index in range(5) for _ in range(2)]
+    assert list(search_files([tmp_path / "missing.py"], "TODO", workers=0)) == []
+
+
+def test_empty_patterns_are_rejected():
+    with pytest.raises(ValueError):
+        PatternSet([""])
+
+
+def test_file_position_search_on_large_files(tmp_path: Path, monkeypatch):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    expected = FilePosition.from_search("test", file_path=file_path)
+    monkeypatch.setattr(search, "MMAP_THRESHOLD", 1)
+    assert FilePosition.from_search("test", file_path=file_path) == expected
+    assert FilePosition.from_search("missing", file_path=file_path) is None
+
+
+def test_file_position_search_does_not_depend_on_file_size(tmp_path: Path, monkeypatch):
+    file_path = tmp_path / "crlf.txt"
+    file_path.write_bytes(b"first\r\na\r\nb\r\nlast\r\n")
+    expected = [FilePosition.from_search(text, file_path=file_path) for text in ("a\nb", "b", "\nlast")]
+    assert all(expected)
+    monkeypatch.setattr(search, "MMAP_THRESHOLD", 1)
+    assert [FilePosition.from_search(text, file_path=file_path) for text in ("a\nb", "b", "\nlast")] == expected
+
+
+def test_memory_mapped_search_copies_bounded_windows(tmp_path: Path, monkeypatch):
+    file_path = tmp_path / "big.txt"
+    with open(file_path, "w") as file:
+        for _ in range(64):
+            file.write("x" * 1023 + "\n")
+        file.write("é" * 2000 + "TODO\n")
+    monkeypatch.setattr(search, "COUNT_WINDOW", 1000)
+    [match] = search_file(file_path, "TODO", mmap_threshold=0)
+    assert (match.line, match.column) == (65, 2000)
+
+    tracemalloc.start()
+    search_file(file_path, "TODO", mmap_threshold=0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 20_000
+
+
+def test_find_next_returns_none_when_only_found_before(tmp_path: Path):
+    file_path = tmp_path / "test_file.txt"
+    file_path.write_text("Hello\nWorld\nThis is a test\n")
+    assert FilePosition(file=file_path, line=3, column=5).find_next("Hello") is None
@@ -0,0 +1,97 @@
+import copy
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from auto_sdlc.llm_cache import ResponseCache
+from auto_sdlc.similarity_cache import (
+    ApproximateAnswer,
+    SimilarityIndex,
+    answers_agree,
+    main,
+    measure_precision,
+    normalize_prompt,
+    signature,
+    similarity,
+)
+
+SOURCE = "\n".join(f"def function_{index}(value):\n    return value * {index}\n" for index in range(50))
+
+
+def test_normalize_prompt_ignores_whitespace():
+    assert normalize_prompt("  a\n\n b\tc  ") == "a b c"
+    assert signature("a\n\n b\tc") == signature("a b c")
+
+
+def test_similarity_estimates_jaccard():
+    edited = SOURCE.replace("value * 7\n", "value * 70\n")
+    assert similarity(signature(SOURCE), signature(SOURCE)) == 1.0
+    assert similarity(signature(SOURCE), signature(edited)) > 0.85
+    assert similarity(signature(SOURCE), signature("Something else entirely, with other words.")) < 0.2
+
+
+def test_lookup_finds_similar_prompts_of_the_same_identity(tmp_path: Path):
+    index = SimilarityIndex(tmp_path / "index.sqlite3", threshold=0.8)
+    index.add(SOURCE, "key-1", identity="model-a")
+    index.add("Something else entirely, with other words.", "key-2", identity="model-a")
+    edited = SOURCE.replace("value * 7\n", "value * 70\n")
+
+    [(key, score)] = index.lookup(edited, identity="model-a")
+    assert key == "key-1" and 0.8 <= score < 1
+    assert index.lookup(edited, identity="model-b") == []
+    assert index.lookup(edited, identity="model-a", threshold=1.0) == []
+
+    index.add(SOURCE + "\n# more", "key-1", identity="model-a")
+    assert len(index) == 2
+    index.remove("key-1")
+    assert index.lookup(edited, identity="model-a") == []
+    index.close()
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        SimilarityIndex(":memory:", threshold=0)
+
+
+@pytest.mark.parametrize("duplicate", [copy.copy, copy.deepcopy, lambda answer: pickle.loads(pickle.dumps(answer))])
+def test_approximate_answers_survive_pickle_and_copy(duplicate):
+    answer = ApproximateAnswer("Yes.", similarity=0.9, cache_key="key")
+    duplicated = duplicate(answer)
+    assert type(duplicated) is ApproximateAnswer
+    assert (duplicated, duplicated.similarity, duplicated.cache_key) == ("Yes.", 0.9, "key")
+
+
+def test_answers_agree():
+    assert answers_agree("Yes, it does.", "yes it does")
+    assert not answers_agree("Yes, it does.", "No, it does not.")
+
+
+def test_measure_precision(tmp_path: Path):
+    index = SimilarityIndex(tmp_path / "index.sqlite3")
+    cache = ResponseCache(tmp_path / "cache")
+    variants = [SOURCE, SOURCE.replace("value * 7\n", "value * 70\n"), SOURCE.replace("value * 9\n", "value + 9\n")]
+    answers = ["Multiplies values.", "Multiplies values.", "Adds and multiplies values, depending on the function."]
+    for number, (prompt, answer) in enumerate(zip(variants, answers)):
+        index.add(prompt, f"key-{number}", identity="model")
+        cache.set(f"key-{number}", answer)
+
+    loose, strict = measure_precision(index, cache, [0.5, 0.99])
+    assert loose.pairs == 3 and loose.agreeing == 1
+    assert loose.precision == pytest.approx(1 / 3)
+    assert strict.pairs == 0 and strict.precision == 1.0
+    cache.close()
+    index.close()
+
+
+def test_cli(tmp_path: Path, capsys):
+    index = SimilarityIndex(tmp_path / "index.sqlite3")
+    index.add(SOURCE, "key", identity="model")
+    index.close()
+    main(["--path", str(tmp_path / "index.sqlite3"), "stats"])
+    assert json.loads(capsys.readouterr().out) == {"prompts": 1}
+    main(["--path", str(tmp_path / "index.sqlite3"), "--cache-directory", str(tmp_path / "cache"), "precision"])
+    assert [report["pairs"] for report in json.loads(capsys.readouterr().out)] == [0, 0, 0, 0, 0]
+    main(["--path", str(tmp_path / "index.sqlite3"), "clear"])
+    assert "Removed 1 prompts." in capsys.readouterr().out
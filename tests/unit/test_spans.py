@@ -0,0 +1,74 @@
+import pickle
+from pathlib import Path
+
+from auto_sdlc.file_ops import FilePosition, FileRange, read_spans
+from auto_sdlc.reviewer import EditSuggestion, InsertSuggestion, MissingDocstringSuggestion, preview_diffs
+from auto_sdlc.spans import LineSpan, Position, SpanArray
+
+
+def test_line_span_context_and_text():
+    lines = ["one", "two", "three", "four"]
+    span = LineSpan(Path("f.py"), 2, 3)
+    assert span.text(lines) == "two\nthree\n"
+    assert span.previous_lines(3) == LineSpan(Path("f.py"), 1, 1)
+    assert span.next_lines(3, len(lines)) == LineSpan(Path("f.py"), 4, 4)
+    assert LineSpan(Path("f.py"), 1, 1).previous_lines(3).text(lines) == ""
+    assert len(LineSpan(Path("f.py"), 4, 3)) == 0
+    assert Position(Path("f.py"), 4, 2).next_lines(3, len(lines)).text(lines) == ""
+
+
+def test_conversion_to_and_from_models():
+    position = FilePosition(file=Path("f.py"), line=3, column=2)
+    assert FilePosition.from_position(position.to_position()) == position
+    file_range = FileRange(file=Path("f.py"), start=3, end=5)
+    assert FileRange.from_span(file_range.to_span()) == file_range
+
+
+def test_span_array_is_columnar():
+    spans = [LineSpan(Path(f"{index % 3}.py"), index, index + 1) for index in range(10, 0, -1)]
+    array = SpanArray(spans)
+    assert len(array) == 10
+    assert list(array) == spans
+    assert array[2] == spans[2]
+    assert len(array.files) == 3
+    assert array.nbytes == 10 * (4 + 8 + 8)
+    assert list(array.for_file(Path("1.py"))) == [span for span in spans if span.file == Path("1.py")]
+    assert list(array.sorted()) == sorted(spans, key=lambda span: (span.file, span.start, span.end))
+    assert list(pickle.loads(pickle.dumps(array))) == spans
+
+
+def test_suggestion_diffs_show_context(tmp_path: Path):
+    file = tmp_path / "module.py"
+    file.write_text("".join(f"line_{index} = {index}\n" for index in range(1, 11)))
+    edit = EditSuggestion(
+        target=FileRange(file=file, start=5, end=6), suggested_text="replaced = True\n", description="Edit."
+    )
+    assert edit.diff.splitlines()[3:] == [
+        " line_2 = 2", " line_3 = 3", " line_4 = 4",
+        "-line_5 = 5", "-line_6 = 6", "+replaced = True",
+        " line_7 = 7", " line_8 = 8", " line_9 = 9",
+    ]
+    insert = InsertSuggestion(
+        target=FilePosition(file=file, line=1, column=0), suggested_text="# comment\n", description="Insert."
+    )
+    assert "+# comment" in insert.diff
+    assert insert.diff.splitlines()[3:] == ["+# comment", " line_1 = 1", " line_2 = 2", " line_3 = 3"]
+
+
+def test_batch_previews_read_spans_per_file(tmp_path: Path):
+    files = [tmp_path / f"module{index}.py" for index in range(2)]
+    for file in files:
+        file.write_text("".join(f"line_{index} = {index}\n" for index in range(1, 11)))
+    assert read_spans(SpanArray([LineSpan(files[0], 2, 3), LineSpan(files[1], 11, 10), LineSpan(files[0], 10, 12)])) == [
+        "line_2 = 2\nline_3 = 3\n", "", "line_10 = 10\n",
+    ]
+
+    docstring = MissingDocstringSuggestion.for_file(files[1])
+    docstring.suggested_text = '"""Docstring."""\n'
+    suggestions = [
+        EditSuggestion(target=FileRange(file=files[0], start=9, end=10), suggested_text="x = 1\n", description=""),
+        docstring,
+        InsertSuggestion(target=FilePosition(file=files[1], line=5, column=4), suggested_text="_", description=""),
+        EditSuggestion(target=FileRange(file=files[1], start=1, end=1), suggested_text="", description=""),
+    ]
+    assert preview_diffs(suggestions) == [suggestion.diff for suggestion in suggestions]
@@ -0,0 +1,98 @@
+import os
+from pathlib import Path
+from textwrap import dedent
+
+from auto_sdlc.project_reviewer import review_project
+from auto_sdlc.reviewer import get_file_suggestions
+from auto_sdlc.symbol_index import SymbolIndex, extract_symbols
+
+SOURCE = dedent('''
+    import os
+
+
+    class Public:
+        """Documented."""
+
+        def method(self):
+            pass
+
+        def _private(self):
+            pass
+
+        def __repr__(self):
+            """Documented."""
+
+
+    def function():
+        def nested():
+            pass
+
+
+    if os.name:
+        def conditional():
+            """Documented."""
+''').lstrip()
+
+
+def test_extract_symbols():
+    symbols = {symbol.qualname: symbol for symbol in extract_symbols("module.py", SOURCE)}
+    assert symbols[""].kind == "module" and not symbols[""].has_docstring
+    assert symbols["Public"].kind == "class" and symbols["Public"].has_docstring
+    assert symbols["Public.method"].kind == "method" and symbols["Public.method"].is_public
+    assert not symbols["Public._private"].is_public
+    assert symbols["Public.__repr__"].is_public
+    assert not symbols["function.nested"].is_public
+    assert symbols["conditional"].kind == "function"
+    assert (symbols["function"].start_line, symbols["function"].end_line) == (17, 19)
+    assert extract_symbols("broken.py", "def broken(:\n") == []
+
+
+def test_missing_docstrings_query(tmp_path: Path):
+    (tmp_path / "module.py").write_text(SOURCE)
+    (tmp_path / "documented.py").write_text('"""Documented."""\n')
+    index = SymbolIndex(tmp_path / "index.sqlite3")
+    assert index.update_project(tmp_path) == 2
+    missing = {(Path(symbol.path).name, symbol.qualname) for symbol in index.missing_docstrings()}
+    assert missing == {("module.py", ""), ("module.py", "Public.method"), ("module.py", "function")}
+    functions = index.missing_docstrings(kinds=("function",), public_only=False)
+    assert [symbol.qualname for symbol in functions] == ["function", "function.nested"]
+    index.close()
+
+
+def test_updates_are_incremental(tmp_path: Path):
+    first, second = tmp_path / "first.py", tmp_path / "second.py"
+    first.write_text("def a():\n    pass\n")
+    second.write_text("def b():\n    pass\n")
+    index = SymbolIndex(tmp_path / "index.sqlite3")
+    assert index.update_project(tmp_path) == 2
+    assert index.update_project(tmp_path) == 0
+
+    # Same content, new mtime: rehashed but not re-parsed.
+    os.utime(first, ns=(1, 1))
+    assert index.update_project(tmp_path) == 0
+
+    first.write_text('"""Now documented."""\ndef a():\n    pass\n')
+    assert index.update_project(tmp_path) == 1
+    assert index.has_module_docstring(first) is True
+
+    second.unlink()
+    index.update_project(tmp_path)
+    assert list(index) == [str(first)]
+    index.close()
+
+    reopened = SymbolIndex(tmp_path / "index.sqlite3")
+    assert [symbol.qualname for symbol in reopened.symbols(first)] == ["", "a"]
+    reopened.close()
+
+
+def test_suggestions_from_index(tmp_path: Path):
+    file = tmp_path / "module.py"
+    file.write_text("x = 1\n")
+    index = SymbolIndex(tmp_path / "index.sqlite3")
+    assert len(list(get_file_suggestions(file, index=index))) == 1
+    file.write_text('"""Documented."""\nx = 1\n')
+    assert list(get_file_suggestions(file, index=index)) == []
+
+    reviews = list(review_project(tmp_path, process_workers=0, generate=False, symbol_index=index))
+    assert [review.suggestions for review in reviews] == [[]]
+    index.close()